@@ -13,6 +13,7 @@ example::
 from __future__ import absolute_import
 
 from .add_userfcn import add_userfcn
+from .brjac import brjac
 from .bustypes import bustypes
 from .case118 import case118
 from .case14 import case14
@@ -40,14 +41,17 @@ from .d2Sbr_dV2 import d2Sbr_dV2
 from .d2Sbus_dV2 import d2Sbus_dV2
 from .dAbr_dV import dAbr_dV
 from .dcopf import dcopf
+from .dcopf_qp import dcopf_qp
 from .dcopf_solver import dcopf_solver
 from .dcpf import dcpf
+from .dcscreen import dcscreen
 from .dIbr_dV import dIbr_dV
 from .dSbr_dV import dSbr_dV
 from .dSbus_dV import dSbus_dV
 from .ext2int import ext2int
 from .fairmax import fairmax
 from .fdpf import fdpf
+from .fdpf_factors import fdpf_factors
 from .gausspf import gausspf
 from .get_reorder import get_reorder
 from .hasPQcap import hasPQcap
@@ -56,6 +60,7 @@ from .ipoptopf_solver import ipoptopf_solver
 from .ipopt_options import ipopt_options
 from .isload import isload
 from .loadcase import loadcase
+from .lodf import lodf
 from .makeAang import makeAang
 from .makeApq import makeApq
 from .makeAvl import makeAvl
@@ -69,6 +74,7 @@ from .makeYbus import makeYbus
 from .modcost import modcost
 from .mosek_options import mosek_options
 from .newtonpf import newtonpf
+from .newtonpf_I_cart import newtonpf_I_cart
 from .opf_args import opf_args
 from .opf_consfcn import opf_consfcn
 from .opf_costfcn import opf_costfcn
@@ -76,39 +82,51 @@ from .opf_execute import opf_execute
 from .opf_hessfcn import opf_hessfcn
 from .opf_model import opf_model
 from .opf import opf
+from .opf_problem import opf_problem
 from .opf_setup import opf_setup
+from .pfjac import pfjac
 from .pfsoln import pfsoln
 from .pipsopf_solver import pipsopf_solver
 from .pips import pips
+from .pipskkt import pipskkt
 from .pipsver import pipsver
 from .poly2pwl import poly2pwl
 from .polycost import polycost
 from .ppoption import ppoption
 from .ppver import ppver
+from .pplinsolve import pplinsolve, splu_solver, krylov_solver
 from .pqcost import pqcost
 from .printpf import printpf
+from .ptdf import ptdf
 from .qps_cplex import qps_cplex
 from .qps_ipopt import qps_ipopt
 from .qps_mosek import qps_mosek
 from .qps_pips import qps_pips
 from .qps_pypower import qps_pypower
 from .remove_userfcn import remove_userfcn
+from .results_reader import results_reader
+from .results_writer import results_writer
 from .runcpf import runcpf
 from .rundcopf import rundcopf
 from .rundcpf import rundcpf
 from .runduopf import runduopf
+from .runmpdcopf import runmpdcopf
 from .runopf import runopf
 from .runopf_w_res import runopf_w_res
 from .runpf import runpf
+from .runpf_batch import runpf_batch
+from .runpf_contingency import runpf_contingency
 from .runuopf import runuopf
 from .run_userfcn import run_userfcn
 from .savecase import savecase
 from .scale_load import scale_load
 from .set_reorder import set_reorder
+from .smwsolve import smwsolve
 from .toggle_iflims import toggle_iflims
 from .toggle_reserves import toggle_reserves
 from .total_load import total_load
 from .totcost import totcost
+from .updateYbus import updateYbus
 from .uopf import uopf
 from .update_mupq import update_mupq
 
@@ -0,0 +1,94 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Branch flow derivatives with a fixed sparsity pattern.
+"""
+
+from numpy import arange, zeros, r_
+from scipy.sparse import coo_matrix, csr_matrix
+
+from pypower.idx_brch import F_BUS, T_BUS
+
+from pypower.opf_consfcn import flow_partials
+
+
+class brjac(object):
+    """Branch flow derivatives with a fixed sparsity pattern.
+
+    Builds, once for given C{Yf} and C{Yt}, the sparsity pattern of the
+    partial derivatives of the complex power flows and currents at the
+    "from" and "to" ends of the branches w.r.t. voltage angles and
+    magnitudes, i.e. that of C{Yf} (C{Yt}) with an explicit element for
+    the "from" ("to") bus of each branch. L{dSbr} and L{dIbr} then evaluate
+    the partials element-wise over these patterns, as L{opf_consfcn} does,
+    and refill the C{data} arrays of cached CSR matrices in place, without
+    forming any diagonal or intermediate sparse matrix.
+
+    The rows of C{branch} are those of C{Yf} and C{Yt}, e.g. only the
+    branches with flow limits.
+
+    Example::
+
+        jac = brjac(branch, Yf, Yt)
+        dSf_dVa, dSf_dVm, dSt_dVa, dSt_dVm, Sf, St = jac.dSbr(V)
+
+    The returned matrices are the same objects on each call, so they must
+    be copied to keep the values of a previous call.
+
+    @see: L{dSbr_dV}, L{dIbr_dV}, L{pfjac}
+    """
+
+    def __init__(self, branch, Yf, Yt):
+        #: patterns of the "from" and "to" sides, as in L{opf_consjac}
+        self.sides = []
+        #: partials of the complex power flows and of the currents
+        self.dS, self.dI = [], []
+
+        for Ybr, idx in [(Yf, F_BUS), (Yt, T_BUS)]:
+            Fbr = branch[:, idx].astype(int)
+            A = coo_matrix(Ybr)
+            n = A.shape[0]
+            A = coo_matrix((r_[A.data, zeros(n, complex)],
+                            (r_[A.row, arange(n)], r_[A.col, Fbr])),
+                           A.shape).tocsr()
+            A.sum_duplicates()
+            A.sort_indices()
+            row = arange(n).repeat(A.indptr[1:] - A.indptr[:-1])
+            col = A.indices
+            self.sides.append({'Y': A, 'bus': Fbr, 'row': row, 'col': col,
+                               'k': (col == Fbr[row]).nonzero()[0]})
+
+            for d in [self.dS, self.dI]:
+                d.extend([csr_matrix((zeros(A.nnz, complex), col, A.indptr),
+                                     A.shape) for _ in range(2)])
+
+    def dSbr(self, V):
+        """Evaluates the partials of the power flows at the voltages C{V}.
+
+        Returns C{dSf_dVa, dSf_dVm, dSt_dVa, dSt_dVm, Sf, St} as
+        L{dSbr_dV} does.
+        """
+        return self._update(V, 0, self.dS)
+
+    def dIbr(self, V):
+        """Evaluates the partials of the currents at the voltages C{V}.
+
+        Returns C{dIf_dVa, dIf_dVm, dIt_dVa, dIt_dVm, If, It} as
+        L{dIbr_dV} does.
+        """
+        return self._update(V, 2, self.dI)
+
+    def _update(self, V, lim, mats):
+        """Refills C{mats} with the partials of the flows given by C{lim}
+        (see L{flow_partials}).
+        """
+        Vm = abs(V)
+        flows = []
+        for i, side in enumerate(self.sides):
+            F, dF_dVa, dF_dVm = flow_partials(side, V, Vm, lim)
+            mats[2 * i].data[:] = dF_dVa
+            mats[2 * i + 1].data[:] = dF_dVm
+            flows.append(F)
+
+        return mats[0], mats[1], mats[2], mats[3], flows[0], flows[1]
@@ -5,8 +5,10 @@
 """Computes partial derivatives of branch currents w.r.t. voltage.
 """
 
-from numpy import diag, asmatrix, asarray
-from scipy.sparse import issparse, csr_matrix as sparse
+from numpy import asmatrix, asarray
+from scipy.sparse import issparse
+
+from pypower.brjac import brjac
 
 
 def dIbr_dV(branch, Yf, Yt, V):
@@ -33,30 +35,26 @@ def dIbr_dV(branch, Yf, Yt, V):
 
     Derivations for "to" bus are similar.
 
+    The sparse matrices are computed element-wise over the nonzeros of
+    C{Yf} and C{Yt} by L{brjac}.
+
     @author: Ray Zimmerman (PSERC Cornell)
     """
-    i = range(len(V))
+    if issparse(Yf):
+        ## element-wise over the nonzeros of Yf and Yt
+        return brjac(branch, Yf, Yt).dIbr(V)
 
+    ## dense version, scaling the columns of Yf and Yt
+    Yf, Yt = asarray(Yf), asarray(Yt)
     Vnorm = V / abs(V)
 
-    if issparse(Yf):
-        diagV = sparse((V, (i, i)))
-        diagVnorm = sparse((Vnorm, (i, i)))
-    else:
-        diagV       = asmatrix( diag(V) )
-        diagVnorm   = asmatrix( diag(Vnorm) )
-
-    dIf_dVa = Yf * 1j * diagV
-    dIf_dVm = Yf * diagVnorm
-    dIt_dVa = Yt * 1j * diagV
-    dIt_dVm = Yt * diagVnorm
+    dIf_dVa = asmatrix(Yf * (1j * V))
+    dIf_dVm = asmatrix(Yf * Vnorm)
+    dIt_dVa = asmatrix(Yt * (1j * V))
+    dIt_dVm = asmatrix(Yt * Vnorm)
 
     # Compute currents.
-    if issparse(Yf):
-        If = Yf * V
-        It = Yt * V
-    else:
-        If = asarray( Yf * asmatrix(V).T ).flatten()
-        It = asarray( Yt * asmatrix(V).T ).flatten()
+    If = Yf.dot(V)
+    It = Yt.dot(V)
 
     return dIf_dVa, dIf_dVm, dIt_dVa, dIt_dVm, If, It
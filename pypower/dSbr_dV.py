@@ -5,11 +5,14 @@
 """Computes partial derivatives of power flows w.r.t. voltage.
 """
 
-from numpy import conj, arange, diag, zeros, asmatrix, asarray, ndarray
-from scipy.sparse import issparse, csr_matrix as sparse
+from numpy import conj, arange, asmatrix, asarray
+from scipy.sparse import issparse
 
 from pypower.idx_brch import F_BUS, T_BUS
 
+from pypower.brjac import brjac
+
+
 def dSbr_dV(branch, Yf, Yt, V):
     """Computes partial derivatives of power flows w.r.t. voltage.
 
@@ -51,6 +54,10 @@ def dSbr_dV(branch, Yf, Yt, V):
 
     Derivations for "to" bus are similar.
 
+    The sparse matrices are computed element-wise over the nonzeros of
+    C{Yf} and C{Yt} by L{brjac}, which can also be kept to evaluate them
+    repeatedly on the same sparsity pattern.
+
     For more details on the derivations behind the derivative code used
     in PYPOWER information, see:
 
@@ -61,71 +68,37 @@ def dSbr_dV(branch, Yf, Yt, V):
 
     @author: Ray Zimmerman (PSERC Cornell)
     """
-    ## define
+    if issparse(Yf):
+        ## element-wise over the nonzeros of Yf and Yt
+        return brjac(branch, Yf, Yt).dSbr(V)
+
+    ## dense version
     f = branch[:, F_BUS].astype(int)       ## list of "from" buses
     t = branch[:, T_BUS].astype(int)       ## list of "to" buses
-    nl = len(f)
-    nb = len(V)
-    il = arange(nl)
-    ib = arange(nb)
-
-    Vnorm = V / abs(V)
-
-    if issparse(Yf):
-        ## compute currents
-        If = Yf * V
-        It = Yt * V
-
-        diagVf = sparse((V[f], (il, il)))
-        diagIf = sparse((If, (il, il)))
-        diagVt = sparse((V[t], (il, il)))
-        diagIt = sparse((It, (il, il)))
-        diagV  = sparse((V, (ib, ib)))
-        diagVnorm = sparse((Vnorm, (ib, ib)))
-
-        shape = (nl, nb)
-        # Partial derivative of S w.r.t voltage phase angle.
-        dSf_dVa = 1j * (conj(diagIf) *
-            sparse((V[f], (il, f)), shape) - diagVf * conj(Yf * diagV))
-
-        dSt_dVa = 1j * (conj(diagIt) *
-            sparse((V[t], (il, t)), shape) - diagVt * conj(Yt * diagV))
-
-        # Partial derivative of S w.r.t. voltage amplitude.
-        dSf_dVm = diagVf * conj(Yf * diagVnorm) + conj(diagIf) * \
-            sparse((Vnorm[f], (il, f)), shape)
-
-        dSt_dVm = diagVt * conj(Yt * diagVnorm) + conj(diagIt) * \
-            sparse((Vnorm[t], (il, t)), shape)
-    else:  ## dense version
-        ## compute currents
-        If = asarray( Yf * asmatrix(V).T ).flatten()
-        It = asarray( Yt * asmatrix(V).T ).flatten()
-
-        diagVf      = asmatrix( diag(V[f]) )
-        diagIf      = asmatrix( diag(If) )
-        diagVt      = asmatrix( diag(V[t]) )
-        diagIt      = asmatrix( diag(It) )
-        diagV       = asmatrix( diag(V) )
-        diagVnorm   = asmatrix( diag(Vnorm) )
-        temp1       = asmatrix( zeros((nl, nb), complex) )
-        temp2       = asmatrix( zeros((nl, nb), complex) )
-        temp3       = asmatrix( zeros((nl, nb), complex) )
-        temp4       = asmatrix( zeros((nl, nb), complex) )
-        for i in range(nl):
-            fi, ti = f[i], t[i]
-            temp1[i, fi] = V[fi]
-            temp2[i, fi] = Vnorm[fi]
-            temp3[i, ti] = V[ti]
-            temp4[i, ti] = Vnorm[ti]
-
-        dSf_dVa = 1j * (conj(diagIf) * temp1 - diagVf * conj(Yf * diagV))
-        dSf_dVm = diagVf * conj(Yf * diagVnorm) + conj(diagIf) * temp2
-        dSt_dVa = 1j * (conj(diagIt) * temp3 - diagVt * conj(Yt * diagV))
-        dSt_dVm = diagVt * conj(Yt * diagVnorm) + conj(diagIt) * temp4
+    il = arange(len(f))
+    Vm = abs(V)
+
+    ## compute currents
+    Yf, Yt = asarray(Yf), asarray(Yt)
+    If = Yf.dot(V)
+    It = Yt.dot(V)
+
+    ## V_i * conj(Y_ik * V_k) terms, plus the "from" ("to") bus elements
+    YVf = V[f][:, None] * conj(Yf * V)
+    YVt = V[t][:, None] * conj(Yt * V)
+
+    dSf_dVa = -1j * YVf
+    dSf_dVa[il, f] += 1j * V[f] * conj(If)
+    dSf_dVm = YVf / Vm
+    dSf_dVm[il, f] += conj(If) * V[f] / Vm[f]
+    dSt_dVa = -1j * YVt
+    dSt_dVa[il, t] += 1j * V[t] * conj(It)
+    dSt_dVm = YVt / Vm
+    dSt_dVm[il, t] += conj(It) * V[t] / Vm[t]
 
     # Compute power flow vectors.
     Sf = V[f] * conj(If)
     St = V[t] * conj(It)
 
-    return dSf_dVa, dSf_dVm, dSt_dVa, dSt_dVm, Sf, St
+    return asmatrix(dSf_dVa), asmatrix(dSf_dVm), asmatrix(dSt_dVa), \
+        asmatrix(dSt_dVm), Sf, St
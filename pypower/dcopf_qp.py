@@ -0,0 +1,189 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Builds the quadratic program of a DC optimal power flow.
+"""
+
+from sys import stderr
+
+from math import inf
+from numpy import array, zeros, ones, any, diag, r_, pi, arange, c_, dot
+
+from numpy import flatnonzero as find
+
+from scipy.sparse import vstack, hstack, csr_matrix as sparse
+
+from pypower.idx_bus import BUS_TYPE, REF, VA
+from pypower.idx_cost import MODEL, POLYNOMIAL, PW_LINEAR, NCOST, COST
+
+from pypower.util import sub2ind, have_fcn
+from pypower.ipopt_options import ipopt_options
+from pypower.cplex_options import cplex_options
+from pypower.mosek_options import mosek_options
+from pypower.gurobi_options import gurobi_options
+
+
+def dcopf_qp(om, ppopt):
+    """Builds the quadratic program of a DC optimal power flow.
+
+    Returns the data of the QP::
+
+        min 1/2 x'*HH*x + CC'*x + C0
+        s.t. l <= A*x <= u, xmin <= x <= xmax
+
+    for the OPF model object C{om}, as
+    C{HH, CC, C0, A, l, u, xmin, xmax, x0, opt}, where C{x0} is the initial
+    point and C{opt} the options dict for L{qps_pypower}, with the solver
+    selected by the C{OPF_ALG_DC} option in C{ppopt}.
+
+    @see: L{dcopf_solver}, L{qps_pypower}
+    """
+    ## options
+    verbose = ppopt['VERBOSE']
+    alg     = ppopt['OPF_ALG_DC']
+
+    if alg == 0:
+        if have_fcn('cplex'):        ## use CPLEX by default, if available
+            alg = 500
+        elif have_fcn('mosek'):      ## if not, then MOSEK, if available
+            alg = 600
+        elif have_fcn('gurobi'):     ## if not, then Gurobi, if available
+            alg = 700
+        else:                        ## otherwise PIPS
+            alg = 200
+
+    ## unpack data
+    ppc = om.get_ppc()
+    baseMVA, bus, gencost = ppc["baseMVA"], ppc["bus"], ppc["gencost"]
+    cp = om.get_cost_params()
+    N, H, Cw = cp["N"], cp["H"], cp["Cw"]
+    fparm = array(c_[cp["dd"], cp["rh"], cp["kk"], cp["mm"]])
+    vv, _, _, _ = om.get_idx()
+
+    ## problem dimensions
+    ipol = find(gencost[:, MODEL] == POLYNOMIAL) ## polynomial costs
+    nw = N.shape[0]                ## number of general cost vars, w
+    ny = om.getN('var', 'y')       ## number of piece-wise linear costs
+    nxyz = om.getN('var')          ## total number of control vars of all types
+
+    ## linear constraints & variable bounds
+    A, l, u = om.linear_constraints()
+    x0, xmin, xmax = om.getv()
+
+    ## set up objective function of the form: f = 1/2 * X'*HH*X + CC'*X
+    ## where X = [x;y;z]. First set up as quadratic function of w,
+    ## f = 1/2 * w'*HHw*w + CCw'*w, where w = diag(M) * (N*X - Rhat). We
+    ## will be building on the (optionally present) user supplied parameters.
+
+    ## piece-wise linear costs
+    any_pwl = int(ny > 0)
+    if any_pwl:
+        # Sum of y vars.
+        Npwl = sparse((ones(ny), (zeros(ny), arange(vv["i1"]["y"], vv["iN"]["y"]))), (1, nxyz))
+        Hpwl = sparse((1, 1))
+        Cpwl = array([1])
+        fparm_pwl = array([[1, 0, 0, 1]])
+    else:
+        Npwl = None#zeros((0, nxyz))
+        Hpwl = None#array([])
+        Cpwl = array([])
+        fparm_pwl = zeros((0, 4))
+
+    ## quadratic costs
+    npol = len(ipol)
+    if any(find(gencost[ipol, NCOST] > 3)):
+        stderr.write('DC opf cannot handle polynomial costs with higher '
+                     'than quadratic order.\n')
+    iqdr = find(gencost[ipol, NCOST] == 3)
+    ilin = find(gencost[ipol, NCOST] == 2)
+    polycf = zeros((npol, 3))         ## quadratic coeffs for Pg
+    if len(iqdr) > 0:
+        polycf[iqdr, :] = gencost[ipol[iqdr], COST:COST + 3]
+    if npol:
+        polycf[ilin, 1:3] = gencost[ipol[ilin], COST:COST + 2]
+    polycf = dot(polycf, diag([ baseMVA**2, baseMVA, 1]))     ## convert to p.u.
+    if npol:
+        Npol = sparse((ones(npol), (arange(npol), vv["i1"]["Pg"] + ipol)),
+                      (npol, nxyz))  # Pg vars
+        Hpol = sparse((2 * polycf[:, 0], (arange(npol), arange(npol))),
+                      (npol, npol))
+    else:
+        Npol = None
+        Hpol = None
+    Cpol = polycf[:, 1]
+    fparm_pol = ones((npol, 1)) * array([[1, 0, 0, 1]])
+
+    ## combine with user costs
+    NN = vstack([n for n in [Npwl, Npol, N] if n is not None and n.shape[0] > 0], "csr")
+    # FIXME: Zero dimension sparse matrices.
+    if (Hpwl is not None) and any_pwl and (npol + nw):
+        Hpwl = hstack([Hpwl, sparse((any_pwl, npol + nw))])
+    if Hpol is not None:
+        if any_pwl and npol:
+            Hpol = hstack([sparse((npol, any_pwl)), Hpol])
+        if npol and nw:
+            Hpol = hstack([Hpol, sparse((npol, nw))])
+    if (H is not None) and nw and (any_pwl + npol):
+        H = hstack([sparse((nw, any_pwl + npol)), H])
+    HHw = vstack([h for h in [Hpwl, Hpol, H] if h is not None and h.shape[0] > 0], "csr")
+    CCw = r_[Cpwl, Cpol, Cw]
+    ffparm = r_[fparm_pwl, fparm_pol, fparm]
+
+    ## transform quadratic coefficients for w into coefficients for X
+    nnw = any_pwl + npol + nw
+    M = sparse((ffparm[:, 3], (range(nnw), range(nnw))))
+    MR = M * ffparm[:, 1]
+    HMR = HHw * MR
+    MN = M * NN
+    HH = MN.T * HHw * MN
+    CC = MN.T * (CCw - HMR)
+    C0 = 0.5 * dot(MR, HMR) + sum(polycf[:, 2])  # Constant term of cost.
+
+    ## set up input for QP solver
+    opt = {'alg': alg, 'verbose': verbose}
+    if (alg == 200) or (alg == 250):
+        ## try to select an interior initial point
+        Varefs = bus[bus[:, BUS_TYPE] == REF, VA] * (pi / 180.0)
+
+        lb, ub = xmin.copy(), xmax.copy()
+        lb[xmin == -inf] = -1e10   ## replace inf with numerical proxies
+        ub[xmax ==  inf] =  1e10
+        x0 = (lb + ub) / 2;
+        # angles set to first reference angle
+        x0[vv["i1"]["Va"]:vv["iN"]["Va"]] = Varefs[0]
+        if ny > 0:
+            ipwl = find(gencost[:, MODEL] == PW_LINEAR)
+            # largest y-value in CCV data
+            c = gencost.flatten('F')[sub2ind(gencost.shape, ipwl,
+                                NCOST + 2 * gencost[ipwl, NCOST])]
+            x0[vv["i1"]["y"]:vv["iN"]["y"]] = max(c) + 0.1 * abs(max(c))
+
+        ## set up options
+        feastol = ppopt['PDIPM_FEASTOL']
+        gradtol = ppopt['PDIPM_GRADTOL']
+        comptol = ppopt['PDIPM_COMPTOL']
+        costtol = ppopt['PDIPM_COSTTOL']
+        max_it  = ppopt['PDIPM_MAX_IT']
+        max_red = ppopt['SCPDIPM_RED_IT']
+        if feastol == 0:
+            feastol = ppopt['OPF_VIOLATION']    ## = OPF_VIOLATION by default
+        opt["pips_opt"] = {  'feastol': feastol,
+                             'gradtol': gradtol,
+                             'comptol': comptol,
+                             'costtol': costtol,
+                             'max_it':  max_it,
+                             'max_red': max_red,
+                             'cost_mult': 1  }
+    elif alg == 400:
+        opt['ipopt_opt'] = ipopt_options([], ppopt)
+    elif alg == 500:
+        opt['cplex_opt'] = cplex_options([], ppopt)
+    elif alg == 600:
+        opt['mosek_opt'] = mosek_options([], ppopt)
+    elif alg == 700:
+        opt['grb_opt'] = gurobi_options([], ppopt)
+    else:
+        raise ValueError("Unrecognised solver [%d]." % alg)
+
+    return HH, CC, C0, A, l, u, xmin, xmax, x0, opt
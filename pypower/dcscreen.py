@@ -0,0 +1,144 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Screens DC branch outages for overloads using LODFs.
+"""
+
+from sys import stdout
+
+from time import time
+
+from os import cpu_count
+
+from concurrent.futures import ThreadPoolExecutor
+
+from numpy import array, arange, asarray, ones, zeros, argpartition, \
+    take_along_axis, lexsort
+
+from pypower.ext2int import ext2int
+from pypower.ppoption import ppoption
+from pypower.rundcpf import rundcpf
+from pypower.lodf import lodf
+
+from pypower.idx_brch import PF, RATE_A
+
+
+#: dtype of the rows of the overload table returned by L{dcscreen}
+OVERLOAD = [
+    ('outage', int),    ## row of the outaged branch in the branch matrix
+    ('branch', int),    ## row of the overloaded branch in the branch matrix
+    ('flow', float),    ## post-contingency flow (MW)
+    ('rating', float),  ## RATE_A (MW)
+    ('loading', float)  ## abs(flow) / rating
+]
+
+
+def dcscreen(casedata, outages=None, monitored=None, topk=5, ppopt=None,
+             chunksize=256, nthreads=None):
+    """Screens DC branch outages for overloads using LODFs.
+
+    Solves the base case DC power flow once and computes the
+    post-contingency flows on the C{monitored} branches for each branch
+    in C{outages} (both given as rows of the C{branch} matrix of
+    C{casedata}, default all in-service branches, others are ignored) as::
+
+        F[:, k] = F0 + LODF[:, k] * F0[k]
+
+    using the columns of the LODF matrix computed from a single sparse
+    factorization (see L{lodf}). The outages are processed in blocks of
+    C{chunksize} columns, split over C{nthreads} threads (default is the
+    number of CPUs), so the full LODF matrix is never formed.
+
+    For each outage, up to C{topk} of the most heavily loaded branches
+    with C{RATE_A} > 0 whose flow exceeds C{RATE_A} are reported. Outages
+    which island part of the network (zero LODF denominator) are not
+    screened and are flagged in C{islanded}.
+
+    Returns a dict with the following keys:
+        - C{outages} - the outaged branches
+        - C{islanded} - C{True} for outages which create islands
+        - C{overloads} - record array of overloads, with fields given by
+        L{OVERLOAD}, sorted by outage and decreasing loading
+        - C{F0} - base case flows (MW) on all branches
+        - C{et} - elapsed time in seconds
+
+    @see: L{lodf}, L{runpf_contingency}
+    """
+    ppopt = ppoption(ppopt)
+    verbose = ppopt['VERBOSE']
+    if nthreads is None:
+        nthreads = cpu_count() or 1
+
+    t0 = time()
+
+    ## base case flows
+    r, _ = rundcpf(casedata, ppoption(ppopt, VERBOSE=0, OUT_ALL=0))
+    F0 = r['branch'][:, PF]
+    rate = r['branch'][:, RATE_A]
+    ppc = ext2int(r, copy=False)
+    ibr = ppc['order']['branch']['status']['on']
+    br_e2i = -ones(len(F0), int)
+    br_e2i[ibr] = arange(len(ibr))
+
+    outages = ibr if outages is None else asarray(outages, int)
+    monitored = ibr if monitored is None else asarray(monitored, int)
+    outages = outages[br_e2i[outages] >= 0]     ## in-service only
+    monitored = monitored[br_e2i[monitored] >= 0]
+    F0m = F0[monitored]
+    ratem = rate[monitored]
+    limited = ratem > 0
+
+    L = lodf(ppc['baseMVA'], ppc['bus'], ppc['branch'])
+    kint = br_e2i[outages]
+    islanded = zeros(len(outages), bool)
+
+    def screen(i):
+        """Screens the outages C{outages[i:i + chunksize]}."""
+        k = kint[i:i + chunksize]
+        Lk, island = L.columns_islanding(k, br_e2i[monitored])
+        F = F0m[:, None] + Lk * F0[outages[i:i + chunksize]][None, :]
+        load = zeros(F.shape)
+        load[limited] = abs(F[limited]) / ratem[limited][:, None]
+        load[:, island] = 0
+
+        ## top K loadings for each outage
+        K = min(topk, len(monitored))
+        if K == 0:
+            return island, []
+        j = argpartition(-load, K - 1, axis=0)[:K] if K < len(monitored) \
+            else arange(len(monitored))[:, None].repeat(load.shape[1], 1)
+        lj = take_along_axis(load, j, axis=0)
+        rows, cols = (lj > 1).nonzero()
+        jj = j[rows, cols]
+        return island, list(zip(outages[i + cols], monitored[jj],
+                                F[jj, cols], ratem[jj], lj[rows, cols]))
+
+    starts = range(0, len(outages), chunksize)
+    if nthreads > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=nthreads) as ex:
+            res = list(ex.map(screen, starts))
+    else:
+        res = [screen(i) for i in starts]
+
+    overloads = []
+    for i, (island, over) in zip(starts, res):
+        islanded[i:i + chunksize] = island
+        overloads.extend(over)
+    overloads = array(overloads, dtype=OVERLOAD)
+
+    ## sort by outage, then by decreasing loading
+    pos = zeros(len(F0), int)
+    pos[outages] = arange(len(outages))
+    overloads = overloads[lexsort((-overloads['loading'],
+                                   pos[overloads['outage']]))]
+
+    et = time() - t0
+    if verbose:
+        stdout.write('DC contingency screening of %d outages on %d branches: '
+                     '%d islanded, %d overloads (%.2f seconds).\n' %
+                     (len(outages), len(monitored), islanded.sum(),
+                      len(overloads), et))
+
+    return {'outages': outages, 'islanded': islanded, 'overloads': overloads,
+            'F0': F0, 'et': et}
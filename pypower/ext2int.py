@@ -11,10 +11,10 @@ from warnings import warn
 
 from copy import deepcopy
 
-from numpy import array, zeros, argsort, arange, concatenate
+from numpy import zeros, argsort, arange, concatenate
 from numpy import flatnonzero as find
 
-from scipy.sparse import issparse, vstack, hstack, csr_matrix as sparse
+from scipy.sparse import issparse, vstack, hstack
 
 from pypower.idx_bus import PQ, PV, REF, NONE, BUS_I, BUS_TYPE
 from pypower.idx_gen import GEN_BUS, GEN_STATUS
@@ -27,7 +27,7 @@ from pypower.e2i_data import e2i_data
 from pypower.run_userfcn import run_userfcn
 
 
-def ext2int(ppc, val_or_field=None, ordering=None, dim=0):
+def ext2int(ppc, val_or_field=None, ordering=None, dim=0, copy=True):
     """Converts external to internal indexing.
 
     This function has two forms, the old form that operates on
@@ -48,6 +48,14 @@ def ext2int(ppc, val_or_field=None, ordering=None, dim=0):
     the reverse conversions. If the case is already using internal
     numbering it is returned unchanged.
 
+    With C{copy=False}, the input case is not copied. The original bus,
+    branch, gen and areas matrices saved under 'order' are those of the
+    input case, and the data which is not reordered is shared with it.
+    Only the matrices which are renumbered or reordered are new arrays.
+    The input case is not modified, but it must not be modified while the
+    internal case is in use. Cases with 'userfcn' callbacks are always
+    copied.
+
     Example::
         ppc = ext2int(ppc)
 
@@ -55,7 +63,8 @@ def ext2int(ppc, val_or_field=None, ordering=None, dim=0):
 
     @author: Ray Zimmerman (PSERC Cornell)
     """
-    ppc = deepcopy(ppc)
+    copy = copy or 'userfcn' in ppc
+    ppc = deepcopy(ppc) if copy else dict(ppc)
     if val_or_field is None:  # nargin == 1
         first = 'order' not in ppc
         if first or ppc["order"]["state"] == 'e':
@@ -75,8 +84,11 @@ def ext2int(ppc, val_or_field=None, ordering=None, dim=0):
                                       'status':   {} },
                         'branch':   { 'status': {} }
                     }
-            else:
+            elif copy:
                 o = ppc["order"]
+            else:
+                o = dict((k, deepcopy(v)) for k, v in ppc["order"].items()
+                         if k != 'int')
 
             ## sizes
             nb = ppc["bus"].shape[0]
@@ -93,14 +105,15 @@ def ext2int(ppc, val_or_field=None, ordering=None, dim=0):
             if 'ext' not in o: o['ext'] = {}
             ## Note: these dictionaries contain mixed float/int data, 
             ## so don't cast them all astype(int) for numpy/scipy indexing
-            o["ext"]["bus"]    = ppc["bus"].copy()
-            o["ext"]["branch"] = ppc["branch"].copy()
-            o["ext"]["gen"]    = ppc["gen"].copy()
+            ## (without copy, those of ppc are replaced by new arrays below)
+            for key in ['bus', 'branch', 'gen']:
+                o["ext"][key] = ppc[key].copy() if copy else ppc[key]
             if 'areas' in ppc:
                 if len(ppc["areas"]) == 0: ## if areas field is empty
                     del ppc['areas']       ## delete it (so it's ignored)
                 else:                      ## otherwise
-                    o["ext"]["areas"] = ppc["areas"].copy()  ## save it
+                    o["ext"]["areas"] = ppc["areas"].copy() if copy \
+                        else ppc["areas"]  ## save it
 
             ## check that all buses have a valid BUS_TYPE
             bt = ppc["bus"][:, BUS_TYPE]
@@ -110,9 +123,9 @@ def ext2int(ppc, val_or_field=None, ordering=None, dim=0):
 
             ## determine which buses, branches, gens are connected and
             ## in-service
-            n2i = sparse((range(nb), (ppc["bus"][:, BUS_I], zeros(nb))),
-                         shape=(max(ppc["bus"][:, BUS_I].astype(int)) + 1, 1))
-            n2i = (array( n2i.todense().flatten() )[0, :]).astype(int) # as 1D array
+            bus_i = ppc["bus"][:, BUS_I].astype(int)
+            n2i = zeros(bus_i.max() + 1, int)
+            n2i[bus_i] = arange(nb)
             bs = (bt != NONE)                               ## bus status
             o["bus"]["status"]["on"]  = find(  bs )         ## connected
             o["bus"]["status"]["off"] = find( ~bs )         ## isolated
@@ -131,17 +144,19 @@ def ext2int(ppc, val_or_field=None, ordering=None, dim=0):
                 o["areas"]["status"]["on"]  = find(  ar )
                 o["areas"]["status"]["off"] = find( ~ar )
 
-            ## delete stuff that is "out"
-            if len(o["bus"]["status"]["off"]) > 0:
+            ## delete stuff that is "out" (without copy, always, to get
+            ## new arrays to renumber below)
+            if len(o["bus"]["status"]["off"]) > 0 or not copy:
 #                ppc["bus"][o["bus"]["status"]["off"], :] = array([])
                 ppc["bus"] = ppc["bus"][o["bus"]["status"]["on"], :]
-            if len(o["branch"]["status"]["off"]) > 0:
+            if len(o["branch"]["status"]["off"]) > 0 or not copy:
 #                ppc["branch"][o["branch"]["status"]["off"], :] = array([])
                 ppc["branch"] = ppc["branch"][o["branch"]["status"]["on"], :]
-            if len(o["gen"]["status"]["off"]) > 0:
+            if len(o["gen"]["status"]["off"]) > 0 or not copy:
 #                ppc["gen"][o["gen"]["status"]["off"], :] = array([])
                 ppc["gen"] = ppc["gen"][o["gen"]["status"]["on"], :]
-            if 'areas' in ppc and (len(o["areas"]["status"]["off"]) > 0):
+            if 'areas' in ppc and \
+                    (len(o["areas"]["status"]["off"]) > 0 or not copy):
 #                ppc["areas"][o["areas"]["status"]["off"], :] = array([])
                 ppc["areas"] = ppc["areas"][o["areas"]["status"]["on"], :]
 
@@ -150,7 +165,7 @@ def ext2int(ppc, val_or_field=None, ordering=None, dim=0):
 
             ## apply consecutive bus numbering
             o["bus"]["i2e"] = ppc["bus"][:, BUS_I].copy()
-            o["bus"]["e2i"] = zeros(max(o["bus"]["i2e"]).astype(int) + 1)
+            o["bus"]["e2i"] = zeros(int(o["bus"]["i2e"].max()) + 1)
             o["bus"]["e2i"][o["bus"]["i2e"].astype(int)] = arange(nb)
             ppc["bus"][:, BUS_I] = \
                 o["bus"]["e2i"][ ppc["bus"][:, BUS_I].astype(int) ].copy()
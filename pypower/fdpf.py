@@ -13,7 +13,7 @@ from scipy.sparse.linalg import splu
 from pypower.ppoption import ppoption
 
 
-def fdpf(Ybus, Sbus, V0, Bp, Bpp, ref, pv, pq, ppopt=None):
+def fdpf(Ybus, Sbus, V0, Bp, Bpp, ref, pv, pq, ppopt=None, factors=None):
     """Solves the power flow using a fast decoupled method.
 
     Solves for bus voltages given the full system admittance matrix (for
@@ -30,7 +30,11 @@ def fdpf(Ybus, Sbus, V0, Bp, Bpp, ref, pv, pq, ppopt=None):
     final complex voltages, a flag which indicates whether it converged
     or not, and the number of iterations performed.
 
-    @see: L{runpf}
+    If C{factors} is given, it is a tuple of solvers (objects with a
+    C{solve} method) for C{Bp[pvpq, pvpq]} and C{Bpp[pq, pq]}, as returned
+    by L{fdpf_factors.factor}, and C{Bp} and C{Bpp} are not factored.
+
+    @see: L{runpf}, L{fdpf_factors}
 
     @author: Ray Zimmerman (PSERC Cornell)
     """
@@ -72,13 +76,16 @@ def fdpf(Ybus, Sbus, V0, Bp, Bpp, ref, pv, pq, ppopt=None):
         if verbose > 1:
             sys.stdout.write('\nConverged!\n')
 
-    ## reduce B matrices
-    Bp = Bp[array([pvpq]).T, pvpq].tocsc() # splu requires a CSC matrix
-    Bpp = Bpp[array([pq]).T, pq].tocsc()
+    if factors is not None:
+        Bp_solver, Bpp_solver = factors
+    else:
+        ## reduce B matrices
+        Bp = Bp[array([pvpq]).T, pvpq].tocsc() # splu requires a CSC matrix
+        Bpp = Bpp[array([pq]).T, pq].tocsc()
 
-    ## factor B matrices
-    Bp_solver = splu(Bp)
-    Bpp_solver = splu(Bpp)
+        ## factor B matrices
+        Bp_solver = splu(Bp)
+        Bpp_solver = splu(Bpp)
 
     ## do P and Q iterations
     while (not converged and i < max_it):
@@ -0,0 +1,112 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Cache of the factored fast-decoupled power flow matrices.
+"""
+
+from hashlib import sha1
+
+from numpy import array, asarray, array_equal, r_, sort, searchsorted, \
+    zeros
+from scipy.sparse.linalg import splu
+
+from pypower.makeB import makeB
+
+from pypower.idx_bus import BS
+from pypower.idx_brch import F_BUS, T_BUS, BR_R, BR_X, BR_B, TAP, SHIFT, \
+    BR_STATUS
+
+
+class fdpf_factors(object):
+    """Cache of the factored fast-decoupled power flow matrices.
+
+    Keeps the B prime and B double prime matrices of L{makeB} and the LU
+    factors of their reduced forms used by L{fdpf}. The matrices are
+    rebuilt only when the network changes, i.e. the branch impedances,
+    charging, taps, phase shifts, status or connectivity, the bus shunt
+    susceptances, C{baseMVA} or the algorithm. The factors are keyed on
+    the partition of the buses into types: B prime is refactored only
+    when the set of PV and PQ buses changes and B double prime when the
+    set of PQ buses changes, so converting a PV bus to PQ when enforcing
+    generator Q limits only refactors B double prime.
+
+    L{runpf} uses one for each run. Pass an instance as the
+    C{PF_FD_FACTORS} option to share it across calls to L{runpf}.
+
+    Example::
+
+        ppopt = ppoption(PF_ALG=2, PF_FD_FACTORS=fdpf_factors())
+        for Pd in profile:
+            ppc['bus'][:, PD] = Pd
+            results, success = runpf(ppc, ppopt)
+
+    @see: L{fdpf}, L{makeB}
+    """
+
+    def __init__(self):
+        #: digest of the network data of the cached matrices
+        self.key = None
+        #: B prime and B double prime matrices
+        self.Bp, self.Bpp = None, None
+        #: sorted PV and PQ buses, and PQ buses, of the cached factors
+        self.pvpq, self.pq = None, None
+        #: factors of C{Bp[pvpq, pvpq]} and C{Bpp[pq, pq]}
+        self.Bp_lu, self.Bpp_lu = None, None
+
+    def factor(self, baseMVA, bus, branch, alg, pv, pq):
+        """Returns the factors of the reduced B prime and B double prime.
+
+        Returns solvers for C{Bp[pvpq, pvpq]} and C{Bpp[pq, pq]}, with
+        C{pvpq = r_[pv, pq]}, for the case data in internal indexing, the
+        C{PF_ALG} option C{alg} and the PV and PQ buses C{pv} and C{pq}.
+        The factors are cached for the sorted bus sets and the solvers
+        permute the right-hand sides and solutions to the given order.
+        """
+        key = self.network_key(baseMVA, bus, branch, alg)
+        if key != self.key:
+            self.Bp, self.Bpp = makeB(baseMVA, bus, branch, alg)
+            self.key = key
+            self.pvpq, self.pq = None, None
+
+        pvpq = r_[pv, pq].astype(int)
+        pq = asarray(pq, int)
+        pvpq_s = sort(pvpq)
+        pq_s = sort(pq)
+        if self.pvpq is None or not array_equal(pvpq_s, self.pvpq):
+            self.Bp_lu = splu(self.Bp[array([pvpq_s]).T, pvpq_s].tocsc())
+            self.pvpq = pvpq_s
+        if self.pq is None or not array_equal(pq_s, self.pq):
+            self.Bpp_lu = splu(self.Bpp[array([pq_s]).T, pq_s].tocsc())
+            self.pq = pq_s
+
+        return (_permuted(self.Bp_lu, searchsorted(pvpq_s, pvpq)),
+                _permuted(self.Bpp_lu, searchsorted(pq_s, pq)))
+
+    @staticmethod
+    def network_key(baseMVA, bus, branch, alg):
+        """Returns a digest of the data that B prime and B double prime
+        depend on.
+        """
+        h = sha1(array([baseMVA, alg, bus.shape[0]], float).tobytes())
+        h.update(bus[:, BS].tobytes())
+        h.update(branch[:, [F_BUS, T_BUS, BR_R, BR_X, BR_B, TAP, SHIFT,
+                            BR_STATUS]].tobytes())
+        return h.digest()
+
+
+class _permuted(object):
+    """Solver for C{A[p][:, p]} given the factors C{lu} of C{A}.
+    """
+
+    def __init__(self, lu, p):
+        self.lu = lu
+        self.p = p
+        self.shape = lu.shape
+
+    def solve(self, b):
+        """Solves C{A[p][:, p] * x = b}.
+        """
+        bs = zeros(len(b))
+        bs[self.p] = b
+        return self.lu.solve(bs)[self.p]
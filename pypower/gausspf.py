@@ -7,10 +7,17 @@
 
 import sys
 from math import inf
-from numpy import linalg, conj, r_, ndarray
+from numpy import linalg, conj, r_, dot, ones, asarray
+
+from scipy.sparse import csr_matrix
 
 from pypower.ppoption import ppoption
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 
 def gausspf(Ybus, Sbus, V0, ref, pv, pq, ppopt=None):
     """Solves the power flow using a Gauss-Seidel method.
@@ -29,6 +36,16 @@ def gausspf(Ybus, Sbus, V0, ref, pv, pq, ppopt=None):
     a flag which indicates whether it converged or not, and the number
     of iterations performed.
 
+    The order in which the bus voltages are updated is set by the
+    C{PF_GS_ORDER} option. With C{'natural'}, each sweep updates the PQ
+    buses and then the PV buses one at a time, working directly on the
+    CSR arrays of C{Ybus} (compiled with Numba, if it is installed).
+    With C{'redblack'}, the buses are split into groups with no branches
+    between buses of the same group (two groups, red and black, for a
+    radial network) and each group is updated at once with a sparse
+    matrix-vector product. With C{'jacobi'}, all buses are updated at
+    once from the voltages of the previous sweep.
+
     @see: L{runpf}
 
     @author: Ray Zimmerman (PSERC Cornell)
@@ -41,6 +58,7 @@ def gausspf(Ybus, Sbus, V0, ref, pv, pq, ppopt=None):
     ## options
     tol     = ppopt['PF_TOL']
     max_it  = ppopt['PF_MAX_IT_GS']
+    order   = ppopt['PF_GS_ORDER']
     verbose = ppopt['VERBOSE']
 
     ## initialize
@@ -51,10 +69,25 @@ def gausspf(Ybus, Sbus, V0, ref, pv, pq, ppopt=None):
     Vm = abs(V)
 
     ## set up indexing for updating V
-    npv = len(pv)
-    npq = len(pq)
+    pv = asarray(pv, int)
+    pq = asarray(pq, int)
     pvpq = r_[pv, pq]
 
+    Ybus = csr_matrix(Ybus)
+    Ydiag = Ybus.diagonal()
+    if order == 'natural':
+        indptr, indices, data = Ybus.indptr, Ybus.indices, Ybus.data
+    elif order in ('redblack', 'jacobi'):
+        if order == 'jacobi':
+            groups = [pvpq]
+        else:
+            groups = _colors(Ybus.indptr, Ybus.indices, pvpq)
+        isPV = ones(len(V), bool)
+        isPV[pq] = False
+        groups = [(g, Ybus[g, :], g[isPV[g]], isPV[g]) for g in groups]
+    else:
+        raise ValueError('gausspf: unknown PF_GS_ORDER \'%s\'' % order)
+
     ## evaluate F(x0)
     mis = V * conj(Ybus * V) - Sbus
     F = r_[  mis[pvpq].real,
@@ -77,20 +110,16 @@ def gausspf(Ybus, Sbus, V0, ref, pv, pq, ppopt=None):
         i = i + 1
 
         ## update voltage
-        ## at PQ buses
-        for k in pq[list(range(npq))]:
-            tmp = (conj(Sbus[k] / V[k]) - Ybus[k, :] * V) / Ybus[k, k]
-            V[k] = V[k] + ndarray.item(tmp)
-
-        ## at PV buses
-        if npv:
-            for k in pv[list(range(npv))]:
-                tmp = (V[k] * conj(Ybus[k,:] * V)).imag
-                Sbus[k] = Sbus[k].real + 1j * ndarray.item(tmp)
-                tmp = (conj(Sbus[k] / V[k]) - Ybus[k, :] * V) / Ybus[k, k]
-                V[k] = V[k] + ndarray.item(tmp)
-#               V[k] = Vm[k] * V[k] / abs(V[k])
-            V[pv] = Vm[pv] * V[pv] / abs(V[pv])
+        if order == 'natural':
+            _gs_sweep(indptr, indices, data, Ydiag, V, Sbus, pq, pv, Vm)
+        else:
+            for g, Yg, gpv, ipv in groups:
+                I = Yg * V
+                if len(gpv):
+                    Sbus[gpv] = Sbus[gpv].real + \
+                        1j * (V[gpv] * conj(I[ipv])).imag
+                V[g] = V[g] + (conj(Sbus[g] / V[g]) - I) / Ydiag[g]
+                V[gpv] = Vm[gpv] * V[gpv] / abs(V[gpv])
 
         ## evalute F(x)
         mis = V * conj(Ybus * V) - Sbus
@@ -114,3 +143,70 @@ def gausspf(Ybus, Sbus, V0, ref, pv, pq, ppopt=None):
                              'iterations.' % i)
 
     return V, converged, i
+
+
+def _gs_sweep_loop(indptr, indices, data, Ydiag, V, Sbus, pq, pv, Vm):
+    """Gauss-Seidel sweep over the CSR arrays of C{Ybus} with scalar loops.
+
+    Updates C{V} and, at the PV buses, the imaginary part of C{Sbus} in
+    place. Meant to be compiled with Numba.
+    """
+    for k in pq:
+        I = 0j
+        for n in range(indptr[k], indptr[k + 1]):
+            I += data[n] * V[indices[n]]
+        V[k] = V[k] + ((Sbus[k] / V[k]).conjugate() - I) / Ydiag[k]
+
+    for k in pv:
+        I = 0j
+        for n in range(indptr[k], indptr[k + 1]):
+            I += data[n] * V[indices[n]]
+        Sbus[k] = Sbus[k].real + 1j * (V[k] * I.conjugate()).imag
+        V[k] = V[k] + ((Sbus[k] / V[k]).conjugate() - I) / Ydiag[k]
+
+    for k in pv:
+        V[k] = Vm[k] * V[k] / abs(V[k])
+
+
+def _gs_sweep_numpy(indptr, indices, data, Ydiag, V, Sbus, pq, pv, Vm):
+    """Gauss-Seidel sweep over the CSR arrays of C{Ybus}, with a NumPy dot
+    product for each row.
+
+    Same as L{_gs_sweep_loop}, for when Numba is not available.
+    """
+    for k in pq.tolist():
+        a, b = indptr[k], indptr[k + 1]
+        I = dot(data[a:b], V[indices[a:b]])
+        V[k] = V[k] + (conj(Sbus[k] / V[k]) - I) / Ydiag[k]
+
+    for k in pv.tolist():
+        a, b = indptr[k], indptr[k + 1]
+        I = dot(data[a:b], V[indices[a:b]])
+        Sbus[k] = Sbus[k].real + 1j * (V[k] * conj(I)).imag
+        V[k] = V[k] + (conj(Sbus[k] / V[k]) - I) / Ydiag[k]
+
+    V[pv] = Vm[pv] * V[pv] / abs(V[pv])
+
+
+if njit is not None:
+    _gs_sweep = njit(_gs_sweep_loop)
+else:
+    _gs_sweep = _gs_sweep_numpy
+
+
+def _colors(indptr, indices, buses):
+    """Splits C{buses} into groups with no branches within a group.
+
+    Greedy coloring of the graph of the CSR pattern C{indptr, indices}.
+    Returns a list of arrays of buses, one per color.
+    """
+    color = -ones(len(indptr) - 1, int)
+    for k in buses.tolist():
+        used = set(color[indices[indptr[k]:indptr[k + 1]]].tolist())
+        c = 0
+        while c in used:
+            c += 1
+        color[k] = c
+
+    c = color[buses]
+    return [buses[c == i] for i in range(c.max() + 1)] if len(buses) else []
@@ -22,7 +22,8 @@ from pypower.i2e_field import i2e_field
 from pypower.i2e_data import i2e_data
 
 
-def int2ext(ppc, val_or_field=None, oldval=None, ordering=None, dim=0):
+def int2ext(ppc, val_or_field=None, oldval=None, ordering=None, dim=0,
+            copy=True):
     """Converts internal to external bus numbering.
 
     C{ppc = int2ext(ppc)}
@@ -33,6 +34,12 @@ def int2ext(ppc, val_or_field=None, oldval=None, ordering=None, dim=0):
     and original bus numbering. This requires that the 'order' key
     created by L{ext2int} be in place.
 
+    With C{copy=False}, the input case is not copied. The internal data
+    saved under 'order' is that of the input case, and only the restored
+    bus, branch, gen and areas matrices, which are updated with the
+    internal data, are new arrays. The input case is not modified. Cases
+    with 'userfcn' callbacks are always copied.
+
     Example::
         ppc = int2ext(ppc)
 
@@ -40,7 +47,13 @@ def int2ext(ppc, val_or_field=None, oldval=None, ordering=None, dim=0):
 
     @author: Ray Zimmerman (PSERC Cornell)
     """
-    ppc = deepcopy(ppc)
+    copy = copy or 'userfcn' in ppc
+    if copy:
+        ppc = deepcopy(ppc)
+    else:
+        ppc = dict(ppc)
+        if 'order' in ppc:
+            ppc['order'] = dict(ppc['order'])
     if val_or_field is None: # nargin == 1
         if 'order' not in ppc:
             sys.stderr.write('int2ext: ppc does not have the "order" field '
@@ -53,25 +66,15 @@ def int2ext(ppc, val_or_field=None, oldval=None, ordering=None, dim=0):
                 ppc = run_userfcn(ppc["userfcn"], 'int2ext', ppc)
 
             ## save data matrices with internal ordering & restore originals
+            ## (without copy, only those updated below are copied)
             o["int"] = {}
-            o["int"]["bus"]    = ppc["bus"].copy()
-            o["int"]["branch"] = ppc["branch"].copy()
-            o["int"]["gen"]    = ppc["gen"].copy()
-            ppc["bus"]     = o["ext"]["bus"].copy()
-            ppc["branch"]  = o["ext"]["branch"].copy()
-            ppc["gen"]     = o["ext"]["gen"].copy()
-            if 'gencost' in ppc:
-                o["int"]["gencost"] = ppc["gencost"].copy()
-                ppc["gencost"] = o["ext"]["gencost"].copy()
-            if 'areas' in ppc:
-                o["int"]["areas"] = ppc["areas"].copy()
-                ppc["areas"] = o["ext"]["areas"].copy()
-            if 'A' in ppc:
-                o["int"]["A"] = ppc["A"].copy()
-                ppc["A"] = o["ext"]["A"].copy()
-            if 'N' in ppc:
-                o["int"]["N"] = ppc["N"].copy()
-                ppc["N"] = o["ext"]["N"].copy()
+            for key in ['bus', 'branch', 'gen', 'gencost', 'areas', 'A', 'N']:
+                if key in ppc:
+                    o["int"][key] = ppc[key].copy() if copy else ppc[key]
+                    if copy or key in ['bus', 'branch', 'gen', 'areas']:
+                        ppc[key] = o["ext"][key].copy()
+                    else:
+                        ppc[key] = o["ext"][key]
 
             ## update data (in bus, branch and gen only)
             ppc["bus"][o["bus"]["status"]["on"], :] = \
@@ -11,9 +11,15 @@ from os.path import basename, splitext, exists
 
 from copy import deepcopy
 
-from numpy import array, zeros, ones, c_
+from struct import unpack
+
+from zipfile import ZipFile, ZIP_STORED
+
+from numpy import array, zeros, ones, c_, load, memmap
+from numpy.lib import format as npformat
 
 from scipy.io import loadmat
+from scipy.sparse import csr_matrix
 
 from pypower._compat import PY2
 from pypower.idx_gen import PMIN, MU_PMAX, MU_PMIN, MU_QMAX, MU_QMIN, APF
@@ -31,11 +37,12 @@ def loadcase(casefile,
 
     Here C{casefile} is either a dict containing the keys C{baseMVA}, C{bus},
     C{gen}, C{branch}, C{areas}, C{gencost}, or a string containing the name
-    of the file. If C{casefile} contains the extension '.mat' or '.py', then
-    the explicit file is searched. If C{casefile} containts no extension, then
-    L{loadcase} looks for a '.mat' file first, then for a '.py' file.  If the
-    file does not exist or doesn't define all matrices, the function returns
-    an exit code as follows:
+    of the file. If C{casefile} contains the extension '.mat', '.py' or
+    '.npz', then the explicit file is searched. If C{casefile} containts no
+    extension, then L{loadcase} looks for a '.mat' file first, then for a
+    '.py' file, then for a '.npz' file.  If the file does not exist or
+    doesn't define all matrices, the function returns an exit code as
+    follows:
 
         0.  all variables successfully defined
         1.  input argument is not a string or dict
@@ -44,6 +51,12 @@ def loadcase(casefile,
         4.  specified .py file does not exist
         5.  specified file fails to define all matrices or contains syntax
             error
+        6.  specified .npz file does not exist or cannot be read
+
+    The arrays of a '.npz' file written by L{savecase} are memory-mapped,
+    in copy-on-write mode, so the load time does not depend on the size of
+    the case. Data is read from the file when it is accessed, and changes
+    to the arrays are not written back to the file.
 
     If the input data is not a dict containing a 'version' key, it is
     assumed to be a PYPOWER case file in version 1 format, and will be
@@ -58,11 +71,12 @@ def loadcase(casefile,
         expect_areas = False
 
     info = 0
+    extension = None
 
     # read data into case object
     if isinstance(casefile, basestring):
         # check for explicit extension
-        if casefile.endswith(('.py', '.mat')):
+        if casefile.endswith(('.py', '.mat', '.npz')):
             rootname, extension = splitext(casefile)
             fname = basename(rootname)
         else:
@@ -72,6 +86,8 @@ def loadcase(casefile,
                 extension = '.mat'
             elif exists(casefile + '.py'):
                 extension = '.py'
+            elif exists(casefile + '.npz'):
+                extension = '.npz'
             else:
                 info = 2
             fname = basename(rootname)
@@ -158,6 +174,12 @@ def loadcase(casefile,
                 if info == 4 and exists(rootname + '.py'):
                     info = 5
                     err5 = lasterr
+            elif extension == '.npz':     ## from NumPy binary file
+                try:
+                    s = loadnpz(rootname + extension)
+                except (IOError, ValueError) as e:
+                    info = 6
+                    lasterr = str(e)
 
     elif isinstance(casefile, dict):
         s = deepcopy(casefile)
@@ -178,8 +200,8 @@ def loadcase(casefile,
             if hasattr(s, 'areas') and (len(s['areas']) == 0) and (not expect_areas):
                 del s['areas']
 
-            ## all fields present, copy to ppc
-            ppc = deepcopy(s)
+            ## all fields present, copy to ppc (except memory-mapped data)
+            ppc = s if extension == '.npz' else deepcopy(s)
             if not hasattr(ppc, 'version'):  ## hmm, struct with no 'version' field
                 if ppc['gen'].shape[1] < 21:    ## version 2 has 21 or 25 cols
                     ppc['version'] = '1'
@@ -215,6 +237,9 @@ def loadcase(casefile,
         elif info == 5:
             sys.stderr.write('Syntax error or undefined data '
                              'matrix(ices) in the file\n')
+        elif info == 6:
+            sys.stderr.write('Specified NPZ file does not exist or cannot '
+                             'be read\n')
         else:
             sys.stderr.write('Unknown error encountered loading case.\n')
 
@@ -223,6 +248,61 @@ def loadcase(casefile,
         return info
 
 
+def loadnpz(fname):
+    """Returns the case dict saved in a '.npz' file by L{savecase}.
+
+    Arrays stored without compression are memory-mapped in copy-on-write
+    mode, others are read. Nested dicts and sparse matrices are rebuilt
+    from the '/' separated keys of the arrays, and 0-d arrays are
+    converted to scalars.
+    """
+    s = {}
+    with ZipFile(fname) as z, open(fname, 'rb') as fd:
+        npz = load(fname)
+        for info in z.infolist():
+            key = info.filename[:-4]        ## strip '.npy'
+            val = None
+            if info.compress_type == ZIP_STORED:
+                ## skip the local file header and read the array header
+                fd.seek(info.header_offset + 26)
+                n, m = unpack('<HH', fd.read(4))
+                fd.seek(info.header_offset + 30 + n + m)
+                version = npformat.read_magic(fd)
+                if version == (1, 0):
+                    shape, fortran, dtype = npformat.read_array_header_1_0(fd)
+                else:
+                    shape, fortran, dtype = npformat.read_array_header_2_0(fd)
+                if len(shape) > 0 and all(shape) and not dtype.hasobject:
+                    val = memmap(fname, dtype, 'c', fd.tell(), shape,
+                                 'F' if fortran else 'C')
+            if val is None:
+                val = npz[key]
+                if val.ndim == 0:
+                    val = val.item()
+
+            d = s
+            path = key.split('/')
+            for k in path[:-1]:
+                d = d.setdefault(k, {})
+            d[path[-1]] = val
+        npz.close()
+
+    return _npz_sparse(s)
+
+
+def _npz_sparse(d):
+    """Converts the sparse matrices saved by L{savecase} in C{d}.
+    """
+    for k, v in d.items():
+        if isinstance(v, dict):
+            if v.get('__sparse__') == 'csr':
+                d[k] = csr_matrix((v['data'], v['indices'], v['indptr']),
+                                  tuple(v['shape']))
+            else:
+                _npz_sparse(v)
+    return d
+
+
 def ppc_1to2(gen, branch):
     ##-----  gen  -----
     ## use the version 1 values for column names
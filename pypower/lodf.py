@@ -0,0 +1,126 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""DC line outage distribution factors computed on demand.
+"""
+
+from numpy import zeros, ones, arange, asarray, nan, r_, flatnonzero as find
+
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import splu
+
+from pypower.idx_bus import BUS_TYPE, REF
+from pypower.idx_brch import F_BUS, T_BUS
+from pypower.makeBdc import makeBdc
+
+
+class lodf(object):
+    """DC line outage distribution factors computed on demand.
+
+    Factors the reduced C{Bbus} once and computes columns of the LODF
+    matrix of L{makeLODF} for a requested set of outaged branches,
+    optionally restricted to the rows of a set of monitored branches,
+    without forming the PTDF matrix or the full C{nbr x nbr} LODF matrix.
+    Column C{k} gives the change in flow on each branch, as a fraction of
+    the pre-outage flow on branch C{k}, when branch C{k} is taken out. The
+    element for the outaged branch itself is -1.
+
+    An outage which islands part of the network has a denominator
+    C{1 - PTDF[k] * (e_f - e_t)} of (nearly) zero. Its column is set to
+    C{nan}, and it can be identified with L{islanding}, or along with the
+    columns by L{columns_islanding}.
+
+    Example::
+
+        L = lodf(baseMVA, bus, branch)
+        Lk = L.columns(outages, monitored)
+        for k, Lk in L.iter_columns(outages, monitored, chunksize=500):
+            ...
+
+    @see: L{makeLODF}, L{ptdf}
+    """
+
+    def __init__(self, baseMVA, bus, branch, tol=1e-8):
+        nb = bus.shape[0]
+        nl = branch.shape[0]
+        slack_bus = find(bus[:, BUS_TYPE] == REF)[0]
+        noref = arange(1, nb)
+        noslack = find(arange(nb) != slack_bus)
+
+        Bbus, Bf, _, _ = makeBdc(baseMVA, bus, branch)
+
+        #: factorization of C{Bbus[noslack, noref]}
+        self.lu = splu(Bbus[noslack, :][:, noref].tocsc())
+        #: C{Bf[:, noref]} (CSR)
+        self.Bf = Bf[:, noref].tocsr()
+        #: C{(Cf - Ct).T} on the C{noslack} rows (CSC), column C{k} is the
+        #  injection pattern of branch C{k}
+        f = branch[:, F_BUS].astype(int)
+        t = branch[:, T_BUS].astype(int)
+        i = r_[range(nl), range(nl)]
+        Cft = csr_matrix((r_[ones(nl), -ones(nl)], (i, r_[f, t])), (nl, nb))
+        self.Cft = Cft[:, noslack].T.tocsc()
+        #: tolerance on the denominator for islanding outages
+        self.tol = tol
+        self.shape = (nl, nl)
+
+    def _H(self, outages, monitored):
+        """Returns C{PTDF * (e_f - e_t)} for the branches C{outages}, on
+        the rows C{monitored}, and on the outaged branches themselves.
+        """
+        X = self.lu.solve(self.Cft[:, outages].toarray())
+        Hk = asarray(self.Bf[outages, :].multiply(X.T).sum(1)).ravel()
+        if monitored is None:
+            H = self.Bf * X
+        else:
+            H = self.Bf[monitored, :] * X
+
+        return H, Hk
+
+    def columns(self, outages, monitored=None):
+        """Returns the columns of the LODF matrix for the branches
+        C{outages}, on the rows C{monitored} (default is all branches).
+        """
+        return self.columns_islanding(outages, monitored)[0]
+
+    def columns_islanding(self, outages, monitored=None):
+        """Returns the columns of the LODF matrix for the branches
+        C{outages}, as L{columns}, and the flags of L{islanding} for these
+        outages, which are set from their denominators whatever the
+        C{monitored} rows are.
+        """
+        outages = asarray(outages, int)
+        H, h = self._H(outages, monitored)
+        d = 1 - h
+        island = abs(d) < self.tol
+        d[island] = nan
+        L = H / d
+
+        ## the outaged branch itself
+        rows = arange(self.shape[0]) if monitored is None \
+            else asarray(monitored, int)
+        pos = zeros(self.shape[0], int) - 1
+        pos[rows] = arange(len(rows))
+        j = find(pos[outages] >= 0)
+        L[pos[outages[j]], j] = -1
+        L[:, island] = nan
+
+        return L, island
+
+    def iter_columns(self, outages, monitored=None, chunksize=256):
+        """Yields C{(outages[i:i + chunksize], L)} in chunks, where C{L} is
+        the corresponding block of columns from L{columns}.
+        """
+        outages = asarray(outages, int)
+        for i in range(0, len(outages), chunksize):
+            k = outages[i:i + chunksize]
+            yield k, self.columns(k, monitored)
+
+    def islanding(self, outages):
+        """Returns a boolean array, C{True} for the branches in C{outages}
+        whose outage islands part of the network.
+        """
+        outages = asarray(outages, int)
+        _, h = self._H(outages, [])
+        return abs(1 - h) < self.tol
@@ -7,15 +7,15 @@
 
 from sys import stderr
 
-from numpy import zeros, arange, isscalar, dot, ix_, flatnonzero as find
+from numpy import zeros, arange, isscalar, dot, asarray, flatnonzero as find
 
-from numpy.linalg import solve
+from scipy.sparse.linalg import splu
 
 from pypower.idx_bus import BUS_TYPE, REF, BUS_I
 from pypower.makeBdc import makeBdc
 
 
-def makePTDF(baseMVA, bus, branch, slack=None):
+def makePTDF(baseMVA, bus, branch, slack=None, bus_idx=None, branch_idx=None):
     """Builds the DC PTDF matrix for a given choice of slack.
 
     Returns the DC PTDF matrix for a given choice of slack. The matrix is
@@ -29,7 +29,14 @@ def makePTDF(baseMVA, bus, branch, slack=None):
     column specifies how the slack should be handled for injections
     at that bus.
 
-    @see: L{makeLODF}
+    The optional C{bus_idx} and C{branch_idx} select the columns (bus
+    injections) and rows (branch flows) to compute, in which case the
+    returned matrix is C{len(branch_idx) x len(bus_idx)}. The reduced
+    C{Bbus} is factored once as a sparse matrix and only the requested
+    rows or columns are solved for, whichever is fewer, so memory is
+    proportional to the size of the result.
+
+    @see: L{makeLODF}, L{ptdf}
 
     @author: Ray Zimmerman (PSERC Cornell)
     """
@@ -53,12 +60,28 @@ def makePTDF(baseMVA, bus, branch, slack=None):
     if any(bus[:, BUS_I] != arange(nb)):
         stderr.write('makePTDF: buses must be numbered consecutively')
 
-    ## compute PTDF for single slack_bus
+    branch_idx = arange(nbr) if branch_idx is None else asarray(branch_idx)
+    bus_idx = arange(nb) if bus_idx is None else asarray(bus_idx)
+    ## all columns are needed to apply a slack distribution matrix
+    cols = bus_idx if isscalar(slack) or len(slack.shape) == 1 else arange(nb)
+
+    ## factor reduced Bbus
     Bbus, Bf, _, _ = makeBdc(baseMVA, bus, branch)
-    Bbus, Bf = Bbus.todense(), Bf.todense()
-    H = zeros((nbr, nb))
-    H[:, noslack] = solve( Bbus[ix_(noslack, noref)].T, Bf[:, noref].T ).T
-    #             = Bf[:, noref] * inv(Bbus[ix_(noslack, noref)])
+    lu = splu(Bbus[noslack, :][:, noref].tocsc())
+    Bf = Bf[branch_idx, :][:, noref]
+
+    ## compute PTDF for single slack_bus
+    ##    H[:, noslack] = Bf[:, noref] * inv(Bbus[ix_(noslack, noref)])
+    H = zeros((len(branch_idx), len(cols)))
+    k = zeros(nb, int)          ## position of each bus within noslack
+    k[noslack] = arange(nb - 1)
+    c = find(cols != slack_bus)
+    if len(branch_idx) <= len(c):   ## solve for rows
+        H[:, c] = lu.solve(Bf.T.toarray(), trans='T')[k[cols[c]], :].T
+    else:                           ## solve for columns
+        E = zeros((nb - 1, len(c)))
+        E[k[cols[c]], arange(len(c))] = 1
+        H[:, c] = Bf * lu.solve(E)
 
     ## distribute slack, if requested
     if not isscalar(slack):
@@ -68,10 +91,9 @@ def makePTDF(baseMVA, bus, branch, slack=None):
             ## conceptually, we want to do ...
             ##    H = H * (eye(nb, nb) - slack * ones((1, nb)))
             ## ... we just do it more efficiently
-            v = dot(H, slack)
-            for k in range(nb):
-                H[:, k] = H[:, k] - v
+            v = Bf * lu.solve(slack[noslack])   ## = H * slack
+            H = H - v[:, None]
         else:
-            H = dot(H, slack)
+            H = dot(H, slack[:, bus_idx])
 
     return H
@@ -7,16 +7,38 @@
 
 import sys
 from math import inf
-from numpy import array, angle, exp, linalg, conj, r_
+from numpy import angle, exp, linalg, conj, dot, isfinite, roots, r_
 
-from scipy.sparse import hstack, vstack
-
-from pypower.dSbus_dV import dSbus_dV
+from pypower.pfjac import pfjac
 from pypower.ppoption import ppoption
-from pypower.pplinsolve import pplinsolve
-
-
-def newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppopt=None):
+from pypower.pplinsolve import pplinsolve, splu_solver, krylov_solver
+
+#: reasons for which L{newtonpf} stops, returned in C{info['reason']}
+NR_CONVERGED = 1    ## converged
+NR_MAX_IT = 2       ## reached PF_MAX_IT iterations
+NR_DIVERGED = 3     ## mismatch grew in PF_NR_DIV_IT consecutive iterations
+NR_BLOWUP = 4       ## mismatch not finite or above NR_MAX_MISMATCH
+NR_COLLAPSE = 5     ## PQ bus voltage magnitude below PF_NR_VMIN
+NR_STALLED = 6      ## optimal multiplier below NR_MIN_MU in PF_NR_DIV_IT
+                    ## consecutive iterations
+
+#: description of each reason
+NR_REASONS = {
+    NR_CONVERGED: 'converged',
+    NR_MAX_IT: 'maximum number of iterations reached',
+    NR_DIVERGED: 'mismatch growing',
+    NR_BLOWUP: 'mismatch blew up',
+    NR_COLLAPSE: 'voltage collapse',
+    NR_STALLED: 'optimal multiplier vanishing'
+}
+
+#: mismatch (p.u.) above which the iterations are considered to blow up
+NR_MAX_MISMATCH = 1e10
+#: optimal multiplier below which a step is considered stalled
+NR_MIN_MU = 0.01
+
+
+def newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppopt=None, jac=None, info=None):
     """Solves the power flow using a full Newton's method.
 
     Solves for bus voltages given the full system admittance matrix (for
@@ -33,6 +55,27 @@ def newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppopt=None):
     flag which indicates whether it converged or not, and the number of
     iterations performed.
 
+    C{jac} is an optional L{pfjac} built for the same C{Ybus}, C{pv} and
+    C{pq}, allowing the Jacobian pattern to be shared across several
+    power flows on the same network.
+
+    With the C{PF_LIN_SOLVER_NR} option set to C{'gmres'} or C{'bicgstab'}
+    or to a L{krylov_solver}, the Newton steps are solved inexactly by a
+    preconditioned Krylov method (Newton-Krylov), which avoids factoring
+    the Jacobian at each iteration.
+
+    With the C{PF_NR_IWAMOTO} option, each step is scaled by the optimal
+    multiplier of Iwamoto and Tamura, which minimizes the norm of a
+    second order model of the mismatch along the Newton direction, built
+    from the mismatches at the current point and after a full step. With
+    C{PF_NR_DIV_IT} > 0, the iterations stop early when they diverge:
+    when the mismatch grows, or the multiplier stays below L{NR_MIN_MU},
+    in C{PF_NR_DIV_IT} consecutive iterations, when the mismatch is not
+    finite or exceeds L{NR_MAX_MISMATCH}, or when the voltage magnitude of
+    a PQ bus falls below C{PF_NR_VMIN}. If C{info} is a dict, the reason
+    for stopping, one of the C{NR_*} codes, is stored in C{info['reason']}
+    (see L{NR_REASONS}).
+
     @see: L{runpf}
 
     @author: Ray Zimmerman (PSERC Cornell)
@@ -46,27 +89,35 @@ def newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppopt=None):
     max_it  = ppopt['PF_MAX_IT']
     verbose = ppopt['VERBOSE']
     lin_solver = ppopt['PF_LIN_SOLVER_NR']
+    iwamoto = ppopt['PF_NR_IWAMOTO']
+    div_it  = ppopt['PF_NR_DIV_IT']
+    vmin    = ppopt['PF_NR_VMIN']
+
+    ## reuse the ordering or preconditioner of the Jacobian across iterations
+    if lin_solver == 'splu':
+        lin_solver = splu_solver()
+    elif lin_solver in ('gmres', 'bicgstab'):
+        lin_solver = krylov_solver(lin_solver)
 
     ## initialize
     converged = 0
+    reason = NR_MAX_IT
     i = 0
     V = V0
     Va = angle(V)
     Vm = abs(V)
 
-    ## set up indexing for updating V
-    pvpq = r_[pv, pq]
-    npv = len(pv)
-    npq = len(pq)
-    j1 = 0;         j2 = npv           ## j1:j2 - V angle of pv buses
-    j3 = j2;        j4 = j2 + npq      ## j3:j4 - V angle of pq buses
-    j5 = j4;        j6 = j4 + npq      ## j5:j6 - V mag of pq buses
+    ## set up indexing for updating V, angles of pv and pq buses, then
+    ## magnitudes of pq buses
+    pvpq = r_[pv, pq].astype(int)
+    pq = pq.astype(int)
+
+    ## sparsity pattern of the Jacobian, fixed for all iterations
+    if jac is None:
+        jac = pfjac(Ybus, pv, pq)
 
     ## evaluate F(x0)
-    mis = V * conj(Ybus * V) - Sbus
-    F = r_[  mis[pv].real,
-             mis[pq].real,
-             mis[pq].imag  ]
+    F = _mismatch(Ybus, V, Sbus, pvpq, pq)
 
     ## check tolerance
     normF = linalg.norm(F, inf)
@@ -76,59 +127,112 @@ def newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppopt=None):
         sys.stdout.write('\n%3d        %10.3e' % (i, normF))
     if normF < tol:
         converged = 1
+        reason = NR_CONVERGED
         if verbose > 1:
             sys.stdout.write('\nConverged!\n')
 
     ## do Newton iterations
+    ngrow = nstall = 0
     while (not converged and i < max_it):
         ## update iteration counter
         i = i + 1
 
         ## evaluate Jacobian
-        dS_dVm, dS_dVa = dSbus_dV(Ybus, V)
-
-        J11 = dS_dVa[array([pvpq]).T, pvpq].real
-        J12 = dS_dVm[array([pvpq]).T, pq].real
-        J21 = dS_dVa[array([pq]).T, pvpq].imag
-        J22 = dS_dVm[array([pq]).T, pq].imag
-
-        J = vstack([
-                hstack([J11, J12]),
-                hstack([J21, J22])
-            ], format="csr")
+        J = jac.update(V)
 
         ## compute update step
         dx = -1 * pplinsolve(J, F, lin_solver)
 
-        ## update voltage
-        if npv:
-            Va[pv] = Va[pv] + dx[j1:j2]
-        if npq:
-            Va[pq] = Va[pq] + dx[j3:j4]
-            Vm[pq] = Vm[pq] + dx[j5:j6]
-        V = Vm * exp(1j * Va)
+        ## update voltage, scaling the step by the optimal multiplier
+        V1 = _step(Va, Vm, dx, 1.0, pvpq, pq)
+        mu = 1.0
+        if iwamoto:
+            F1 = _mismatch(Ybus, V1, Sbus, pvpq, pq)
+            mu = _multiplier(F, F1)
+        if mu != 1.0:
+            V = _step(Va, Vm, dx, mu, pvpq, pq)
+            F = _mismatch(Ybus, V, Sbus, pvpq, pq)
+        else:
+            V = V1
+            F = F1 if iwamoto else _mismatch(Ybus, V, Sbus, pvpq, pq)
         Vm = abs(V)            ## update Vm and Va again in case
         Va = angle(V)          ## we wrapped around with a negative Vm
 
-        ## evalute F(x)
-        mis = V * conj(Ybus * V) - Sbus
-        F = r_[  mis[pv].real,
-                 mis[pq].real,
-                 mis[pq].imag  ]
-
         ## check for convergence
-        normF = linalg.norm(F, inf)
+        normF0, normF = normF, linalg.norm(F, inf)
         if verbose > 1:
             sys.stdout.write('\n%3d        %10.3e' % (i, normF))
+            if iwamoto:
+                sys.stdout.write('    mu = %.4f' % mu)
         if normF < tol:
             converged = 1
+            reason = NR_CONVERGED
             if verbose:
                 sys.stdout.write("\nNewton's method power flow converged in "
                                  "%d iterations.\n" % i)
+        elif div_it:
+            ## check for divergence
+            ngrow = ngrow + 1 if normF > normF0 else 0
+            nstall = nstall + 1 if mu < NR_MIN_MU else 0
+            if not isfinite(normF) or normF > NR_MAX_MISMATCH:
+                reason = NR_BLOWUP
+            elif len(pq) > 0 and Vm[pq].min() < vmin:
+                reason = NR_COLLAPSE
+            elif ngrow >= div_it:
+                reason = NR_DIVERGED
+            elif nstall >= div_it:
+                reason = NR_STALLED
+            if reason != NR_MAX_IT:
+                break
 
     if verbose:
-        if not converged:
+        if reason == NR_MAX_IT:
             sys.stdout.write("\nNewton's method power did not converge in %d "
                              "iterations.\n" % i)
+        elif reason != NR_CONVERGED:
+            sys.stdout.write("\nNewton's method power flow stopped after %d "
+                             "iterations: %s.\n" % (i, NR_REASONS[reason]))
+
+    if info is not None:
+        info['reason'] = reason
 
     return V, converged, i
+
+
+def _mismatch(Ybus, V, Sbus, pvpq, pq):
+    """Returns the real power mismatch of the PV and PQ buses and the
+    reactive power mismatch of the PQ buses.
+    """
+    mis = V * conj(Ybus * V) - Sbus
+    return r_[mis[pvpq].real, mis[pq].imag]
+
+
+def _step(Va, Vm, dx, mu, pvpq, pq):
+    """Returns the voltages after a step C{mu * dx} from C{Va} and C{Vm}.
+    """
+    Va = Va.copy()
+    Vm = Vm.copy()
+    npvpq = len(pvpq)
+    Va[pvpq] = Va[pvpq] + mu * dx[:npvpq]
+    Vm[pq] = Vm[pq] + mu * dx[npvpq:]
+    return Vm * exp(1j * Va)
+
+
+def _multiplier(F0, F1):
+    """Returns the optimal multiplier of the Newton step.
+
+    With C{F0} the mismatch at the current point and C{F1} that after a
+    full Newton step, the mismatch along the step is modeled as::
+
+        F(mu) = (1 - mu) * F0 + mu**2 * F1
+
+    which is exact for the power flow equations in rectangular coordinates
+    (Iwamoto and Tamura). Returns the first minimum of C{|F(mu)|**2}, the
+    smallest positive root of its derivative, a cubic in C{mu}.
+    """
+    a, b, c = dot(F0, F0), dot(F0, F1), dot(F1, F1)
+    if not isfinite(a + b + c):
+        return 1.0
+    r = roots([2 * c, -3 * b, a + 2 * b, -a])
+    r = r[(abs(r.imag) < 1e-8 * abs(r)) & (r.real > 0)].real
+    return r.min() if len(r) > 0 else 1.0
@@ -0,0 +1,195 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Solves the power flow using Newton's method, current injection form.
+"""
+
+import sys
+from math import inf
+from numpy import arange, bincount, conj, cumsum, linalg, unique, zeros, \
+    int32, r_
+from scipy.sparse import coo_matrix, csr_matrix
+
+from pypower.ppoption import ppoption
+from pypower.pplinsolve import pplinsolve, splu_solver, krylov_solver
+
+
+def newtonpf_I_cart(Ybus, Sbus, V0, ref, pv, pq, ppopt=None):
+    """Solves the power flow using Newton's method, current injection form.
+
+    Solves the same problem as L{newtonpf}, with the same arguments and
+    return values, using the current balance equations in rectangular
+    (cartesian) coordinates::
+
+        Ibus(V) - conj(S / V) = 0
+
+    at the PV and PQ buses, where C{S} is C{Sbus} with the reactive power
+    injection of the PV buses as an additional unknown, and::
+
+        Vr**2 + Vi**2 = Vm0**2
+
+    at the PV buses, with C{Vm0} the voltage magnitude set point in
+    C{V0}. The unknowns are the real and imaginary parts of the voltages
+    of the PV and PQ buses and the reactive injections of the PV buses.
+
+    The derivatives of the currents C{Ybus * V} w.r.t. the rectangular
+    voltages are the constant elements of C{Ybus}, so only the diagonal of
+    the Jacobian, the derivatives w.r.t. the PV bus reactive injections
+    and the PV voltage magnitude rows change between iterations. The
+    constant part is summed once into the C{data} array of the fixed CSR
+    pattern of the Jacobian, to which each iteration adds the changing
+    elements at precomputed positions. This is cheapest for cases with
+    few PV buses.
+
+    Convergence is checked on the same power mismatch as L{newtonpf}
+    (C{PF_TOL}), along with the voltage magnitudes of the PV buses. The
+    C{PF_NR_IWAMOTO} and C{PF_NR_DIV_IT} options are not used, and the
+    C{PF_LIN_SOLVER_NR} option is used as in L{newtonpf}, except for a
+    L{krylov_solver} with the C{'fdpf'} preconditioner.
+
+    @see: L{newtonpf}, L{runpf}
+    """
+    ## default arguments
+    if ppopt is None:
+        ppopt = ppoption()
+
+    ## options
+    tol     = ppopt['PF_TOL']
+    max_it  = ppopt['PF_MAX_IT']
+    verbose = ppopt['VERBOSE']
+    lin_solver = ppopt['PF_LIN_SOLVER_NR']
+
+    ## reuse the ordering or preconditioner of the Jacobian across iterations
+    if lin_solver == 'splu':
+        lin_solver = splu_solver()
+    elif lin_solver in ('gmres', 'bicgstab'):
+        lin_solver = krylov_solver(lin_solver)
+
+    ## initialize
+    converged = 0
+    i = 0
+    V = V0.copy()
+    pv = pv.astype(int)
+    pq = pq.astype(int)
+    pvpq = r_[pv, pq]
+    npv, npvpq = len(pv), len(pvpq)
+    Vm2 = abs(V0[pv])**2                ## squared PV voltage set points
+
+    ## reactive injections of the PV buses, at the initial voltages
+    S = Sbus.copy()
+    S[pv] = Sbus[pv].real + 1j * (V[pv] * conj(Ybus[pv, :] * V)).imag
+
+    ## Jacobian pattern and its constant part
+    jac = _jac_pattern(Ybus, pv, pvpq)
+
+    ## evaluate F(x0)
+    Ibus = Ybus * V
+    normF = _norm_mismatch(V, Ibus, Sbus, pv, pq, pvpq, Vm2)
+    if verbose > 1:
+        sys.stdout.write('\n it    max P & Q mismatch (p.u.)')
+        sys.stdout.write('\n----  ---------------------------')
+        sys.stdout.write('\n%3d        %10.3e' % (i, normF))
+    if normF < tol:
+        converged = 1
+        if verbose > 1:
+            sys.stdout.write('\nConverged!\n')
+
+    ## do Newton iterations
+    while (not converged and i < max_it):
+        ## update iteration counter
+        i = i + 1
+
+        ## current mismatch and voltage magnitudes of PV buses
+        Vp = V[pvpq]
+        mis = Ibus[pvpq] - conj(S[pvpq] / Vp)
+        F = r_[mis.real, mis.imag, abs(V[pv])**2 - Vm2]
+
+        ## evaluate Jacobian, adding the changing elements to the constant
+        ## part: diagonal conj(S) / conj(V)**2 of the current mismatch ...
+        d = conj(S[pvpq]) / conj(Vp)**2
+        ## ... derivatives w.r.t. reactive injections of PV buses ...
+        dq = 1j / conj(V[pv])
+        ## ... and voltage magnitudes of PV buses
+        J = jac['J']
+        J.data[:] = jac['data0']
+        J.data[jac['pos']] += r_[d.real, d.imag, d.imag, -d.real,
+                                 dq.real, dq.imag,
+                                 2 * V[pv].real, 2 * V[pv].imag]
+
+        ## compute update step
+        dx = -1 * pplinsolve(J, F, lin_solver)
+
+        ## update voltage and reactive injections of PV buses
+        V[pvpq] = Vp + dx[:npvpq] + 1j * dx[npvpq:2 * npvpq]
+        S[pv] = S[pv] + 1j * dx[2 * npvpq:2 * npvpq + npv]
+
+        ## check for convergence
+        Ibus = Ybus * V
+        normF = _norm_mismatch(V, Ibus, Sbus, pv, pq, pvpq, Vm2)
+        if verbose > 1:
+            sys.stdout.write('\n%3d        %10.3e' % (i, normF))
+        if normF < tol:
+            converged = 1
+            if verbose:
+                sys.stdout.write("\nNewton's method power flow (current "
+                                 "injection, cartesian) converged in %d "
+                                 "iterations.\n" % i)
+
+    if verbose:
+        if not converged:
+            sys.stdout.write("\nNewton's method power flow (current "
+                             "injection, cartesian) did not converge in %d "
+                             "iterations.\n" % i)
+
+    return V, converged, i
+
+
+def _norm_mismatch(V, Ibus, Sbus, pv, pq, pvpq, Vm2):
+    """Returns the largest power mismatch of L{newtonpf}, or squared
+    voltage magnitude mismatch of the PV buses.
+    """
+    mis = V * conj(Ibus) - Sbus
+    F = r_[mis[pvpq].real, mis[pq].imag, abs(V[pv])**2 - Vm2]
+    return linalg.norm(F, inf) if len(F) else 0.0
+
+
+def _jac_pattern(Ybus, pv, pvpq):
+    """Returns the CSR pattern and constant part of the Jacobian.
+
+    The rows of the Jacobian are the real and imaginary current mismatches
+    of the C{pvpq} buses and the voltage magnitude equations of the C{pv}
+    buses, its columns the real and imaginary voltages of the C{pvpq}
+    buses and the reactive injections of the C{pv} buses. Returns a dict
+    with the Jacobian C{J}, the C{data0} array of its constant part, and
+    the positions C{pos} in C{data} of the changing elements, in the order
+    used by L{newtonpf_I_cart}.
+    """
+    n1, npv = len(pvpq), len(pv)
+    n = 2 * n1 + npv
+
+    ## constant part, from the elements of Ybus[pvpq, pvpq]
+    Y = coo_matrix(Ybus.tocsr()[pvpq, :][:, pvpq])
+    r, c, G, B = Y.row, Y.col, Y.data.real, Y.data.imag
+    rows = [r, r, n1 + r, n1 + r]
+    cols = [c, n1 + c, c, n1 + c]
+    vals = [G, -B, B, G]
+    nconst = 4 * Y.nnz
+
+    ## changing elements
+    k = arange(n1)
+    kv = arange(npv)            ## PV buses are first in pvpq
+    qv = 2 * n1 + kv            ## columns of Q, rows of |V|**2 equations
+    rows += [k, k, n1 + k, n1 + k, kv, n1 + kv, qv, qv]
+    cols += [k, n1 + k, k, n1 + k, qv, qv, kv, n1 + kv]
+    vals += [zeros(4 * n1 + 4 * npv)]
+
+    key = r_[tuple(rows)].astype(int) * n + r_[tuple(cols)]
+    uniq, pos = unique(key, return_inverse=True)
+    pos = pos.ravel()
+    indices = (uniq % n).astype(int32)
+    indptr = r_[0, cumsum(bincount(uniq // n, minlength=n))].astype(int32)
+    data0 = bincount(pos, r_[tuple(vals)], len(uniq))
+
+    return {'J': csr_matrix((data0.copy(), indices, indptr), (n, n)),
+            'data0': data0, 'pos': pos[nconst:]}
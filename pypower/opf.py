@@ -163,7 +163,7 @@ def opf(*args):
         ppc['branch'] = c_[ppc['branch'], zeros((nl, MU_ANGMAX + 1 - shape(ppc['branch'])[1]))]
 
     ##-----  convert to internal numbering, remove out-of-service stuff  -----
-    ppc = ext2int(ppc)
+    ppc = ext2int(ppc, copy=False)
 
     ##-----  construct OPF model object  -----
     om = opf_setup(ppc, ppopt)
@@ -172,7 +172,7 @@ def opf(*args):
     results, success, raw = opf_execute(om, ppopt)
 
     ##-----  revert to original ordering, including out-of-service stuff  -----
-    results = int2ext(results)
+    results = int2ext(results, copy=False)
 
     ## zero out result fields of out-of-service gens & branches
     if len(results['order']['gen']['status']['off']) > 0:
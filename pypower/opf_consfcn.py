@@ -10,18 +10,15 @@ except ImportError:
     # in python < 3.5, inf is not defined in math
     from numpy import inf
 
-from numpy import zeros, ones, conj, exp, r_, arange
+from numpy import zeros, ones, conj, exp, r_, arange, repeat, diff, \
+    array_equal, flatnonzero as find
 
-from scipy.sparse import lil_matrix, vstack, hstack, csr_matrix as sparse
+from scipy.sparse import coo_matrix, csr_matrix as sparse
 
 from pypower.idx_gen import GEN_BUS, PG, QG
 from pypower.idx_brch import F_BUS, T_BUS, RATE_A
 
 from pypower.makeSbus import makeSbus
-from pypower.dSbus_dV import dSbus_dV
-from pypower.dIbr_dV import dIbr_dV
-from pypower.dSbr_dV import dSbr_dV
-from pypower.dAbr_dV import dAbr_dV
 
 
 def opf_consfcn(x, om, Ybus, Yf, Yt, ppopt, il=None, *args):
@@ -123,58 +120,177 @@ def opf_consfcn(x, om, Ybus, Yf, Yt, ppopt, il=None, *args):
         h = zeros((0,1))
 
     ##----- evaluate partials of constraints -----
-    ## index ranges
+    ## sparsity patterns and index maps, built once per problem
+    jac = opf_consjac(om, Ybus, Yf, Yt, ppopt, il, nxyz)
+
+    ## partials of injected bus powers w.r.t. V, for each element of Ybus
+    Y, row, col, diag = jac['Y'], jac['row'], jac['col'], jac['diag']
+    Ibus = Y * V
+    VYV = V[row] * conj(Y.data * V[col])
+    dS_dVa = -1j * VYV
+    dS_dVa[diag] += 1j * V * conj(Ibus)
+    dS_dVm = VYV / Vm[col]
+    dS_dVm[diag] += conj(Ibus) * V / Vm
+
+    ## Jacobian of equality constraints (power flow), transposed
+    dgT = jac['dgT']
+    vals = r_[dS_dVa.real, dS_dVm.real, dS_dVa.imag, dS_dVm.imag, -ones(ng)]
+    dg = sparse((vals[dgT['take']], dgT['indices'], dgT['indptr']),
+                (2 * nb, nxyz)).T
+
+    if nl2 > 0:
+        ## partials of flows w.r.t. V, for each element of Yf and Yt
+        parts = []
+        for side in [jac['f'], jac['t']]:
+            F, dF_dVa, dF_dVm = \
+                    flow_partials(side, V, Vm, ppopt['OPF_FLOW_LIM'])
+
+            ## squared magnitude of flow (of complex power or current,
+            ## or real power)
+            Fr = F[side['row']]
+            parts.extend([2 * (Fr.real * dF_dVa.real + Fr.imag * dF_dVa.imag),
+                          2 * (Fr.real * dF_dVm.real + Fr.imag * dF_dVm.imag)])
+
+        ## Jacobian of inequality constraints (branch limits), transposed
+        dhT = jac['dhT']
+        vals = r_[tuple(parts)]
+        dh = sparse((vals[dhT['take']], dhT['indices'], dhT['indptr']),
+                    (2 * nl2, nxyz)).T
+    else:
+        dh = None
+
+    return h, g, dh, dg
+
+
+def opf_consjac(om, Ybus, Yf, Yt, ppopt, il, nxyz):
+    """Returns the sparsity patterns of the OPF constraint Jacobians.
+
+    Returns a dict with the fixed sparsity patterns of the transposed
+    Jacobians of the power balance and branch flow constraints, as used by
+    L{opf_consfcn}, with their columns already in the layout of the full
+    optimization vector, and for each element of their CSR C{data} arrays,
+    its index into the stacked element-wise partials computed over the
+    nonzeros of C{Ybus}, C{Yf} and C{Yt}. The result is cached in
+    C{om.cache} and only rebuilt when C{Ybus}, C{Yf} or C{Yt} are replaced
+    or the constrained branches, number of variables or C{OPF_FLOW_LIM}
+    change, so subsequent evaluations only compute the values of the
+    partials and gather them into new C{data} arrays.
+    """
+    jac = om.cache.get('consfcn')
+    if jac is not None and jac['Ybus'] is Ybus and jac['Yf'] is Yf and \
+            jac['Yt'] is Yt and jac['nxyz'] == nxyz and \
+            jac['lim'] == ppopt['OPF_FLOW_LIM'] and \
+            array_equal(jac['il'], il):
+        return jac
+
+    ppc = om.get_ppc()
+    bus, gen, branch = ppc["bus"], ppc["gen"], ppc["branch"]
+    vv, _, _, _ = om.get_idx()
+    nb = bus.shape[0]
+    ng = gen.shape[0]
+    nl2 = len(il)
+
     iVa = arange(vv["i1"]["Va"], vv["iN"]["Va"])
     iVm = arange(vv["i1"]["Vm"], vv["iN"]["Vm"])
     iPg = arange(vv["i1"]["Pg"], vv["iN"]["Pg"])
     iQg = arange(vv["i1"]["Qg"], vv["iN"]["Qg"])
-    iVaVmPgQg = r_[iVa, iVm, iPg, iQg].T
-
-    ## compute partials of injected bus powers
-    dSbus_dVm, dSbus_dVa = dSbus_dV(Ybus, V)           ## w.r.t. V
-    ## Pbus w.r.t. Pg, Qbus w.r.t. Qg
-    neg_Cg = sparse((-ones(ng), (gen[:, GEN_BUS], range(ng))), (nb, ng))
-
-    ## construct Jacobian of equality constraints (power flow) and transpose it
-    dg = lil_matrix((2 * nb, nxyz))
-    blank = sparse((nb, ng))
-    dg[:, iVaVmPgQg] = vstack([
-            ## P mismatch w.r.t Va, Vm, Pg, Qg
-            hstack([dSbus_dVa.real, dSbus_dVm.real, neg_Cg, blank]),
-            ## Q mismatch w.r.t Va, Vm, Pg, Qg
-            hstack([dSbus_dVa.imag, dSbus_dVm.imag, blank, neg_Cg])
-        ], "csr")
-    dg = dg.T
+
+    jac = {'Ybus': Ybus, 'Yf': Yf, 'Yt': Yt, 'il': il, 'nxyz': nxyz,
+           'lim': ppopt['OPF_FLOW_LIM']}
+
+    ## Ybus with an explicit diagonal
+    Y, row, col = _with_entries(Ybus, arange(nb))
+    nnz = Y.nnz
+    jac['Y'], jac['row'], jac['col'] = Y, row, col
+    jac['diag'] = find(row == col)
+
+    ## r_[dS_dVa.real, dS_dVm.real, dS_dVa.imag, dS_dVm.imag, -ones(ng)]
+    gbus = gen[:, GEN_BUS].astype(int)
+    k = arange(nnz)
+    jac['dgT'] = _pattern(
+        r_[row, row, nb + row, nb + row, gbus, nb + gbus],
+        r_[iVa[col], iVm[col], iVa[col], iVm[col], iPg, iQg],
+        r_[k, nnz + k, 2 * nnz + k, 3 * nnz + k, 4 * nnz + arange(ng),
+           4 * nnz + arange(ng)],
+        (2 * nb, nxyz))
 
     if nl2 > 0:
-        ## compute partials of Flows w.r.t. V
-        if ppopt['OPF_FLOW_LIM'] == 2:     ## current
-            dFf_dVa, dFf_dVm, dFt_dVa, dFt_dVm, Ff, Ft = \
-                    dIbr_dV(branch[il, :], Yf, Yt, V)
-        else:                  ## power
-            dFf_dVa, dFf_dVm, dFt_dVa, dFt_dVm, Ff, Ft = \
-                    dSbr_dV(branch[il, :], Yf, Yt, V)
-        if ppopt['OPF_FLOW_LIM'] == 1:     ## real part of flow (active power)
-            dFf_dVa = dFf_dVa.real
-            dFf_dVm = dFf_dVm.real
-            dFt_dVa = dFt_dVa.real
-            dFt_dVm = dFt_dVm.real
-            Ff = Ff.real
-            Ft = Ft.real
-
-        ## squared magnitude of flow (of complex power or current, or real power)
-        df_dVa, df_dVm, dt_dVa, dt_dVm = \
-                dAbr_dV(dFf_dVa, dFf_dVm, dFt_dVa, dFt_dVm, Ff, Ft)
-
-        ## construct Jacobian of inequality constraints (branch limits)
-        ## and transpose it.
-        dh = lil_matrix((2 * nl2, nxyz))
-        dh[:, r_[iVa, iVm].T] = vstack([
-                hstack([df_dVa, df_dVm]),    ## "from" flow limit
-                hstack([dt_dVa, dt_dVm])     ## "to" flow limit
-            ], "csr")
-        dh = dh.T
-    else:
-        dh = None
+        ## Yf, Yt with explicit elements for the "from" / "to" bus of each row
+        rows, cols, src = [], [], []
+        offset = 0
+        for side, Ybr, idx, i0 in [('f', Yf, F_BUS, 0), ('t', Yt, T_BUS, nl2)]:
+            Fbr = branch[il, idx].astype(int)
+            Yx, r, c = _with_entries(Ybr, Fbr)
+            jac[side] = {'Y': Yx, 'bus': Fbr, 'row': r, 'col': c,
+                         'k': find(c == Fbr[r])}
+            ## r_[df_dVa, df_dVm] (side f), r_[dt_dVa, dt_dVm] (side t)
+            n = Yx.nnz
+            ir = i0 + r
+            rows.extend([ir, ir])
+            cols.extend([iVa[c], iVm[c]])
+            src.extend([offset + arange(n), offset + n + arange(n)])
+            offset += 2 * n
+        jac['dhT'] = _pattern(r_[tuple(rows)], r_[tuple(cols)],
+                              r_[tuple(src)], (2 * nl2, nxyz))
 
-    return h, g, dh, dg
+    om.cache['consfcn'] = jac
+
+    return jac
+
+
+def flow_partials(side, V, Vm, lim):
+    """Returns the branch flows and their partials w.r.t. V element-wise.
+
+    For one end C{side} (C{jac['f']} or C{jac['t']} of L{opf_consjac}),
+    returns the flows C{F} of the constrained branches, complex power,
+    real power or current for C{lim} = 0, 1 or 2, and the values of the
+    partials C{dF_dVa} and C{dF_dVm} for each element of C{side['Y']}.
+    """
+    Ybr, Fbr, k = side['Y'], side['bus'], side['k']
+    rows, cols = side['row'], side['col']
+    Ibr = Ybr * V
+    if lim == 2:                ## current
+        F = Ibr
+        dF_dVa = 1j * Ybr.data * V[cols]
+        dF_dVm = Ybr.data * V[cols] / Vm[cols]
+    else:                       ## power
+        F = V[Fbr] * conj(Ibr)
+        Vbr = V[Fbr[rows]]
+        YV = conj(Ybr.data * V[cols])
+        dF_dVa = -1j * Vbr * YV
+        dF_dVa[k] += 1j * V[Fbr] * conj(Ibr)
+        dF_dVm = Vbr * YV / Vm[cols]
+        dF_dVm[k] += conj(Ibr) * V[Fbr] / Vm[Fbr]
+    if lim == 1:                ## real part of flow (active power)
+        F = F.real
+        dF_dVa = dF_dVa.real
+        dF_dVm = dF_dVm.real
+
+    return F, dF_dVa, dF_dVm
+
+
+def _with_entries(A, j):
+    """Returns C{A} (CSR) with explicit elements C{(i, j[i])} for each row
+    C{i}, and the row and column indices of its elements.
+    """
+    A = coo_matrix(A)
+    n = A.shape[0]
+    A = coo_matrix((r_[A.data, zeros(n, complex)],
+                    (r_[A.row, arange(n)], r_[A.col, j])), A.shape).tocsr()
+    A.sum_duplicates()
+    A.sort_indices()
+    row = repeat(arange(n), diff(A.indptr))
+
+    return A, row, A.indices
+
+
+def _pattern(rows, cols, src, shape):
+    """Returns the CSR pattern of the elements C{(rows, cols)} and, for
+    each element of its C{data} array, its index in C{src}.
+    """
+    tag = arange(1, len(src) + 1, dtype=float)
+    A = coo_matrix((tag, (rows, cols)), shape).tocsr()
+    A.sort_indices()
+
+    return {'indptr': A.indptr, 'indices': A.indices,
+            'take': src[A.data.astype(int) - 1]}
@@ -5,21 +5,15 @@
 """Evaluates Hessian of Lagrangian for AC OPF.
 """
 
-from numpy import array, zeros, ones, exp, arange, r_, flatnonzero as find
-from scipy.sparse import vstack, hstack, issparse, csr_matrix as sparse
+from numpy import array, zeros, ones, exp, conj, arange, repeat, diff, \
+    cumsum, bincount, unique, int32, r_, flatnonzero as find
+from scipy.sparse import issparse, csr_matrix as sparse
 
 from pypower.idx_gen import PG, QG
-from pypower.idx_brch import F_BUS, T_BUS
 from pypower.idx_cost import MODEL, POLYNOMIAL
 
 from pypower.polycost import polycost
-from pypower.d2Sbus_dV2 import d2Sbus_dV2
-from pypower.dSbr_dV import dSbr_dV
-from pypower.dIbr_dV import dIbr_dV
-from pypower.d2AIbr_dV2 import d2AIbr_dV2
-from pypower.d2ASbr_dV2 import d2ASbr_dV2
-from pypower.opf_costfcn import opf_costfcn
-from pypower.opf_consfcn import opf_consfcn
+from pypower.opf_consfcn import opf_consjac, flow_partials
 
 
 def opf_hessfcn(x, lmbda, om, Ybus, Yf, Yt, ppopt, il=None, cost_mult=1.0):
@@ -51,6 +45,11 @@ def opf_hessfcn(x, lmbda, om, Ybus, Yf, Yt, ppopt, il=None, cost_mult=1.0):
 
     @return: Hessian of the Lagrangian.
 
+    The second derivatives of the power balance and flow constraints are
+    computed for each element of C{Ybus}, C{Yf} and C{Yt} and summed into
+    the data array of a sparsity pattern which is built once per problem
+    (see L{opf_hesspattern}).
+
     @see: L{opf_costfcn}, L{opf_consfcn}
 
     @author: Ray Zimmerman (PSERC Cornell)
@@ -90,7 +89,6 @@ def opf_hessfcn(x, lmbda, om, Ybus, Yf, Yt, ppopt, il=None, cost_mult=1.0):
     Va = x[vv["i1"]["Va"]:vv["iN"]["Va"]]
     Vm = x[vv["i1"]["Vm"]:vv["iN"]["Vm"]]
     V = Vm * exp(1j * Va)
-    nxtra = nxyz - 2 * nb
     pcost = gencost[arange(ng), :]
     if gencost.shape[0] > ng:
         qcost = gencost[arange(ng, 2 * ng), :]
@@ -107,13 +105,9 @@ def opf_hessfcn(x, lmbda, om, Ybus, Yf, Yt, ppopt, il=None, cost_mult=1.0):
         ipolq = find(qcost[:, MODEL] == POLYNOMIAL)
         d2f_dQg2[ipolq] = \
                 baseMVA**2 * polycost(qcost[ipolq, :], Qg[ipolq] * baseMVA, 2)
-    i = r_[arange(vv["i1"]["Pg"], vv["iN"]["Pg"]),
-           arange(vv["i1"]["Qg"], vv["iN"]["Qg"])]
-#    d2f = sparse((vstack([d2f_dPg2, d2f_dQg2]).toarray().flatten(),
-#                  (i, i)), shape=(nxyz, nxyz))
-    d2f = sparse((r_[d2f_dPg2, d2f_dQg2], (i, i)), (nxyz, nxyz))
 
     ## generalized cost
+    d2f = None
     if issparse(N) and N.nnz > 0:
         nw = N.shape[0]
         r = N * x - rh                    ## Nx - rhat
@@ -136,101 +130,170 @@ def opf_hessfcn(x, lmbda, om, Ybus, Yf, Yt, ppopt, il=None, cost_mult=1.0):
         HwC = H * w + Cw
         AA = N.T * M * (LL + 2 * QQ * diagrr)
 
-        d2f = d2f + AA * H * AA.T + 2 * N.T * M * QQ * \
+        d2f = AA * H * AA.T + 2 * N.T * M * QQ * \
                 sparse((HwC, (arange(nw), arange(nw))), (nw, nw)) * N
-    d2f = d2f * cost_mult
+        d2f = d2f * cost_mult
+
+    ## sparsity pattern and index maps, built once per problem
+    hess = opf_hesspattern(om, Ybus, Yf, Yt, ppopt, il, nxyz)
+    jac = hess['jac']
 
     ##----- evaluate Hessian of power balance constraints -----
     nlam = int(len(lmbda["eqnonlin"]) / 2)
     lamP = lmbda["eqnonlin"][:nlam]
     lamQ = lmbda["eqnonlin"][nlam:nlam + nlam]
-    Gpaa, Gpav, Gpva, Gpvv = d2Sbus_dV2(Ybus, V, lamP)
-    Gqaa, Gqav, Gqva, Gqvv = d2Sbus_dV2(Ybus, V, lamQ)
-
-    d2G = vstack([
-            hstack([
-                vstack([hstack([Gpaa, Gpav]),
-                        hstack([Gpva, Gpvv])]).real +
-                vstack([hstack([Gqaa, Gqav]),
-                        hstack([Gqva, Gqvv])]).imag,
-                sparse((2 * nb, nxtra))]),
-            hstack([
-                sparse((nxtra, 2 * nb)),
-                sparse((nxtra, nxtra))
-            ])
-        ], "csr")
+
+    ## lamP * P + lamQ * Q = Re((lamP - j lamQ) * S), for each element of Ybus
+    Y, row, col = jac['Y'], jac['row'], jac['col']
+    z = (lamP - 1j * lamQ)[row] * V[row] * conj(Y.data * V[col])
+    vals = _d2_terms(z, Vm[row], Vm[col], hess['od'], hess['dg'])
 
     ##----- evaluate Hessian of flow constraints -----
     nmu = int(len(lmbda["ineqnonlin"]) / 2)
-    muF = lmbda["ineqnonlin"][:nmu]
-    muT = lmbda["ineqnonlin"][nmu:nmu + nmu]
-    if ppopt['OPF_FLOW_LIM'] == 2:       ## current
-        dIf_dVa, dIf_dVm, dIt_dVa, dIt_dVm, If, It = dIbr_dV(branch, Yf, Yt, V)
-        Hfaa, Hfav, Hfva, Hfvv = d2AIbr_dV2(dIf_dVa, dIf_dVm, If, Yf, V, muF)
-        Htaa, Htav, Htva, Htvv = d2AIbr_dV2(dIt_dVa, dIt_dVm, It, Yt, V, muT)
-    else:
-        f = branch[il, F_BUS].astype(int)    ## list of "from" buses
-        t = branch[il, T_BUS].astype(int)    ## list of "to" buses
-        ## connection matrix for line & from buses
-        Cf = sparse((ones(nl2), (arange(nl2), f)), (nl2, nb))
-        ## connection matrix for line & to buses
-        Ct = sparse((ones(nl2), (arange(nl2), t)), (nl2, nb))
-        dSf_dVa, dSf_dVm, dSt_dVa, dSt_dVm, Sf, St = \
-                dSbr_dV(branch[il,:], Yf, Yt, V)
-        if ppopt['OPF_FLOW_LIM'] == 1:     ## real power
-            Hfaa, Hfav, Hfva, Hfvv = d2ASbr_dV2(dSf_dVa.real, dSf_dVm.real,
-                                                Sf.real, Cf, Yf, V, muF)
-            Htaa, Htav, Htva, Htvv = d2ASbr_dV2(dSt_dVa.real, dSt_dVm.real,
-                                                St.real, Ct, Yt, V, muT)
-        else:                  ## apparent power
-            Hfaa, Hfav, Hfva, Hfvv = \
-                    d2ASbr_dV2(dSf_dVa, dSf_dVm, Sf, Cf, Yf, V, muF)
-            Htaa, Htav, Htva, Htvv = \
-                    d2ASbr_dV2(dSt_dVa, dSt_dVm, St, Ct, Yt, V, muT)
-
-    d2H = vstack([
-            hstack([
-                vstack([hstack([Hfaa, Hfav]),
-                        hstack([Hfva, Hfvv])]) +
-                vstack([hstack([Htaa, Htav]),
-                        hstack([Htva, Htvv])]),
-                sparse((2 * nb, nxtra))
-            ]),
-            hstack([
-                sparse((nxtra, 2 * nb)),
-                sparse((nxtra, nxtra))
-            ])
-        ], "csr")
-
-    ##-----  do numerical check using (central) finite differences  -----
-    if 0:
-        nx = len(x)
-        step = 1e-5
-        num_d2f = sparse((nx, nx))
-        num_d2G = sparse((nx, nx))
-        num_d2H = sparse((nx, nx))
-        for i in range(nx):
-            xp = x
-            xm = x
-            xp[i] = x[i] + step / 2
-            xm[i] = x[i] - step / 2
-            # evaluate cost & gradients
-            _, dfp = opf_costfcn(xp, om)
-            _, dfm = opf_costfcn(xm, om)
-            # evaluate constraints & gradients
-            _, _, dHp, dGp = opf_consfcn(xp, om, Ybus, Yf, Yt, ppopt, il)
-            _, _, dHm, dGm = opf_consfcn(xm, om, Ybus, Yf, Yt, ppopt, il)
-            num_d2f[:, i] = cost_mult * (dfp - dfm) / step
-            num_d2G[:, i] = (dGp - dGm) * lmbda["eqnonlin"]   / step
-            num_d2H[:, i] = (dHp - dHm) * lmbda["ineqnonlin"] / step
-        d2f_err = max(max(abs(d2f - num_d2f)))
-        d2G_err = max(max(abs(d2G - num_d2G)))
-        d2H_err = max(max(abs(d2H - num_d2H)))
-        if d2f_err > 1e-6:
-            print('Max difference in d2f: %g' % d2f_err)
-        if d2G_err > 1e-5:
-            print('Max difference in d2G: %g' % d2G_err)
-        if d2H_err > 1e-6:
-            print('Max difference in d2H: %g' % d2H_err)
-
-    return d2f + d2G + d2H
+    if nl2 > 0:
+        lim = ppopt['OPF_FLOW_LIM']
+        for s, mu in [('f', lmbda["ineqnonlin"][:nmu]),
+                      ('t', lmbda["ineqnonlin"][nmu:nmu + nmu])]:
+            side, terms = jac[s], hess[s]
+            Ybr, Fbr = side['Y'], side['bus']
+            r, c = side['row'], side['col']
+            F, dF_dVa, dF_dVm = flow_partials(side, V, Vm, lim)
+
+            ## 2 * mu * Re(conj(F) * d2F), for each element of Yf (Yt)
+            w = 2 * mu * conj(F)
+            if lim == 2:                   ## current
+                z = w[r] * Ybr.data * V[c]
+                R, X = z.real, z.imag
+                Vmc = Vm[c]
+                vals.extend([-R, -X / Vmc, -X / Vmc])
+            else:                          ## power
+                z = w[r] * V[Fbr[r]] * conj(Ybr.data * V[c])
+                vals.extend(_d2_terms(z, Vm[Fbr[r]], Vm[c],
+                                      terms['od'], terms['dg']))
+
+            ## 2 * mu * Re(dF.T * conj(dF)), for each pair of elements in a row
+            a, b = terms['a'], terms['b']
+            m = 2 * mu[r[a]]
+            for dA in [dF_dVa, dF_dVm]:
+                for dB in [dF_dVa, dF_dVm]:
+                    vals.append(m * (dA[a].real * dB[b].real +
+                                     dA[a].imag * dB[b].imag))
+
+    ## polynomial costs
+    vals.extend([cost_mult * d2f_dPg2, cost_mult * d2f_dQg2])
+
+    data = bincount(hess['pos'], r_[tuple(vals)], len(hess['indices']))
+    Lxx = sparse((data, hess['indices'], hess['indptr']), (nxyz, nxyz))
+
+    if d2f is not None:
+        Lxx = Lxx + d2f
+
+    return Lxx
+
+
+def opf_hesspattern(om, Ybus, Yf, Yt, ppopt, il, nxyz):
+    """Returns the sparsity pattern of the Hessian of the OPF Lagrangian.
+
+    Returns a dict with the CSR pattern (C{indptr} and C{indices}) of the
+    sum of the Hessians of the power balance and branch flow constraints
+    and of the polynomial costs, and for each of the element-wise terms
+    computed by L{opf_hessfcn}, the position C{pos} of the element of the
+    C{data} array it is added to, with the indices of the elements and
+    pairs of elements of the flow terms under C{f} and C{t}. The
+    element-wise patterns of C{Ybus}, C{Yf} and C{Yt} are those of
+    L{opf_consjac} (stored under C{jac}).
+    The result is cached in C{om.cache} along with them.
+    """
+    jac = opf_consjac(om, Ybus, Yf, Yt, ppopt, il, nxyz)
+    hess = om.cache.get('hessfcn')
+    if hess is not None and hess['jac'] is jac:
+        return hess
+
+    vv, _, _, _ = om.get_idx()
+    iVa = arange(vv["i1"]["Va"], vv["iN"]["Va"])
+    iVm = arange(vv["i1"]["Vm"], vv["iN"]["Vm"])
+    iPg = arange(vv["i1"]["Pg"], vv["iN"]["Pg"])
+    iQg = arange(vv["i1"]["Qg"], vv["iN"]["Qg"])
+
+    hess = {'jac': jac}
+
+    ## power balance
+    row, col = jac['row'], jac['col']
+    rows, cols, hess['od'], hess['dg'] = _d2_pattern(row, col, iVa, iVm)
+
+    ## flow limits
+    if len(il) > 0:
+        for s in ['f', 't']:
+            side, terms = jac[s], {}
+            Yx, Fbr = side['Y'], side['bus']
+            r, c = side['row'], side['col']
+            if jac['lim'] == 2:            ## current
+                rows.extend([iVa[c], iVa[c], iVm[c]])
+                cols.extend([iVa[c], iVm[c], iVa[c]])
+            else:                          ## power
+                rr, cc, terms['od'], terms['dg'] = \
+                        _d2_pattern(Fbr[r], c, iVa, iVm)
+                rows.extend(rr)
+                cols.extend(cc)
+
+            ## all pairs of elements (a, b) in each row
+            cnt = diff(Yx.indptr)
+            reps = cnt[r]
+            a = repeat(arange(Yx.nnz), reps)
+            start = cumsum(reps) - reps
+            b = Yx.indptr[r[a]] + arange(len(a)) - start[a]
+            terms['a'], terms['b'] = a, b
+            hess[s] = terms
+            for ia in [iVa, iVm]:
+                for ib in [iVa, iVm]:
+                    rows.append(ia[c[a]])
+                    cols.append(ib[c[b]])
+
+    ## polynomial costs
+    rows.extend([iPg, iQg])
+    cols.extend([iPg, iQg])
+
+    key = r_[tuple(rows)].astype(int) * nxyz + r_[tuple(cols)]
+    uniq, pos = unique(key, return_inverse=True)
+    hess['pos'] = pos.ravel()
+    hess['indices'] = (uniq % nxyz).astype(int32)
+    hess['indptr'] = r_[0, cumsum(bincount(uniq // nxyz, minlength=nxyz))
+                        ].astype(int32)
+
+    om.cache['hessfcn'] = hess
+
+    return hess
+
+
+def _d2_pattern(i, k, iVa, iVm):
+    """Returns the rows and columns of the terms of L{_d2_terms}, and the
+    elements with C{i != k} and C{i == k}.
+    """
+    od, dg = find(i != k), find(i == k)
+    ai, ak = iVa[i[od]], iVa[k[od]]
+    vi, vk = iVm[i[od]], iVm[k[od]]
+    rows = [ai, ak, ai, ak, ai, vi, ai, vk, ak, vi, ak, vk, vi, vk,
+            iVm[i[dg]]]
+    cols = [ai, ak, ak, ai, vi, ai, vk, ai, vi, ak, vk, ak, vk, vi,
+            iVm[i[dg]]]
+
+    return rows, cols, od, dg
+
+
+def _d2_terms(z, Vmi, Vmk, od, dg):
+    """Returns the second derivatives of C{Re(z)} w.r.t. C{Va} and C{Vm}.
+
+    Each element of C{z = w * V[i] * conj(y * V[k])}, where C{w} is a
+    (complex) multiplier and C{y} an element of an admittance matrix, is
+    proportional to C{Vm[i] * Vm[k] * exp(1j * (Va[i] - Va[k]))} for the
+    elements with C{i != k} (C{od}), and to C{Vm[i]**2} for the others
+    (C{dg}). Returns the values of the terms at the positions given by
+    L{_d2_pattern}.
+    """
+    Vmi_o, Vmk_o = Vmi[od], Vmk[od]
+    R, X = z[od].real, z[od].imag
+    Xi, Xk = X / Vmi_o, X / Vmk_o
+    Rik = R / (Vmi_o * Vmk_o)
+
+    return [-R, -R, R, R, -Xi, -Xi, -Xk, -Xk, Xi, Xi, Xk, Xk, Rik, Rik,
+            2 * z[dg].real / Vmi[dg]**2]
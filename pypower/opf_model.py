@@ -9,9 +9,9 @@ problem formulation.
 from sys import stderr
 
 from math import inf
-from numpy import array, zeros, ones, dot, arange, r_
+from numpy import array, zeros, ones, dot, arange, r_, concatenate
 from numpy import flatnonzero as find
-from scipy.sparse import lil_matrix, csr_matrix as sparse
+from scipy.sparse import coo_matrix, csr_matrix as sparse
 
 
 class opf_model(object):
@@ -75,7 +75,8 @@ class opf_model(object):
                 'u': {},    ## right hand side vector, bounding A*x above
                 'vs': {}    ## cell array of variable sets that define the xx for this constraint block
             },
-            'order': []     ## list of names for linear constraint blocks in the order they appear in ghl(x)
+            'order': [],    ## list of names for linear constraint blocks in the order they appear in ghl(x)
+            'cache': None   ## assembled (A, l, u), see linear_constraints()
         }
 
         #: data for user-defined costs
@@ -102,6 +103,18 @@ class opf_model(object):
 
         self.user_data = {}
 
+        #: data cached by the OPF callbacks for this problem, such as the
+        #  sparsity patterns of the constraint Jacobians (see L{opf_consfcn})
+        #  and the admittance matrices, to be cleared if the network data
+        #  in C{ppc} is changed
+        self.cache = {}
+
+        #: C{(kind, name)} of the var sets (C{'var'}), linear constraint
+        #  sets (C{'lin'}) and cost sets (C{'cost'}) changed since the last
+        #  call to L{clear_dirty}, and of any case data (C{'ppc'}) marked
+        #  with L{set_dirty}
+        self.dirty = set()
+
 
     def __repr__(self):
         """String representation of the object.
@@ -254,6 +267,7 @@ class opf_model(object):
             ## put name in ordered list of var sets
 #            self.lin["order"][self.lin["NS"]] = name
             self.lin["order"].append(name)
+            self.lin["cache"] = None
 
 
     def add_costs(self, name, cp, varsets):
@@ -358,16 +372,16 @@ class opf_model(object):
             self.cost["data"]["H"][name]  = cp["H"]
 
         if 'dd' in cp:
-            self.cost["data"]["dd"]["name"] = cp["dd"]
+            self.cost["data"]["dd"][name] = cp["dd"]
 
         if 'rh' in cp:
-            self.cost["data"]["rh"]["name"] = cp["rh"]
+            self.cost["data"]["rh"][name] = cp["rh"]
 
         if 'kk' in cp:
-            self.cost["data"]["kk"]["name"] = cp["kk"]
+            self.cost["data"]["kk"][name] = cp["kk"]
 
         if 'mm' in cp:
-            self.cost["data"]["mm"]["name"] = cp["mm"]
+            self.cost["data"]["mm"][name] = cp["mm"]
 
         ## update number of vars and var sets
         self.cost["N"]  = self.cost["idx"]["iN"][name]
@@ -375,6 +389,7 @@ class opf_model(object):
 
         ## put name in ordered list of var sets
         self.cost["order"].append(name)
+        self.cost.pop("params", None)
 
 
     def add_vars(self, name, N, v0=None, vl=None, vu=None):
@@ -416,18 +431,23 @@ class opf_model(object):
         ## put name in ordered list of var sets
 #        self.var["order"][self.var["NS"]] = name
         self.var["order"].append(name)
+        self.lin["cache"] = None
 
 
-    def build_cost_params(self):
+    def build_cost_params(self, force=False):
         """Builds and saves the full generalized cost parameters.
 
         Builds the full set of cost parameters from the individual named
         sub-sets added via L{add_costs}. Skips the building process if it has
-        already been done, unless a second input argument is present.
+        already been done and no cost set has been added or changed since,
+        unless C{force} is C{True}.
 
         These cost parameters can be retrieved by calling L{get_cost_params}
         and the user-defined costs evaluated by calling L{compute_cost}.
         """
+        if "params" in self.cost and not force:
+            return
+
         ## initialize parameters
         nw = self.cost["N"]
 #        nnzN = 0
@@ -489,6 +509,12 @@ class opf_model(object):
             'N': N, 'Cw': Cw, 'H': H, 'dd': dd, 'rh': rh, 'kk': kk, 'mm': mm }
 
 
+    def clear_dirty(self):
+        """Clears the record of changed blocks, see L{is_dirty}.
+        """
+        self.dirty.clear()
+
+
     def compute_cost(self, x, name=None):
         r""" Computes a user-defined cost.
 
@@ -705,6 +731,24 @@ class opf_model(object):
         return v0, vl, vu
 
 
+    def is_dirty(self, kind, name=None):
+        """Returns C{True} if a block has changed since L{clear_dirty}.
+
+        C{kind} is one of C{'var'}, C{'lin'} or C{'cost'} for the blocks
+        changed by L{update_vars}, L{update_constraints} and L{update_costs},
+        or C{'ppc'} for the case data marked by L{set_dirty}. If C{name} is
+        omitted, returns C{True} if any block of that kind has changed.
+
+        Examples::
+            is_dirty(om, 'var', 'Pg')
+            is_dirty(om, 'ppc', 'load')
+            is_dirty(om, 'lin')
+        """
+        if name is None:
+            return any(k == kind for k, _ in self.dirty)
+        return (kind, name) in self.dirty
+
+
     def linear_constraints(self):
         """Builds and returns the full set of linear constraints.
 
@@ -712,15 +756,20 @@ class opf_model(object):
         L{add_constraints}::
 
             L <= A * x <= U
+
+        C{A} is assembled in sparse triplet form, mapping the columns of
+        each constraint set to the columns of its var sets. The result is
+        cached until a constraint set or var set is added or a constraint
+        set is changed by L{update_constraints}, so it should be treated
+        as read-only. The bounds of the cache are updated in place by
+        L{update_constraints}, so copies of C{l} and C{u} are returned.
         """
+        if self.lin["cache"] is not None:
+            A, l, u = self.lin["cache"]
+            return A, l.copy(), u.copy()
 
         ## initialize A, l and u
-#        nnzA = 0
-#        for k in range(self.lin["NS"]):
-#            nnzA = nnzA + nnz(self.lin["data"].A.(self.lin.order{k}))
-
         if self.lin["N"]:
-            A = lil_matrix((self.lin["N"], self.var["N"]))
             u = inf * ones(self.lin["N"])
             l = -u
         else:
@@ -731,30 +780,117 @@ class opf_model(object):
             return A, l, u
 
         ## fill in each piece
+        rows, cols, vals = [], [], []
         for k in range(self.lin["NS"]):
             name = self.lin["order"][k]
             N = self.lin["idx"]["N"][name]
             if N:                                   ## non-zero number of rows to add
-                Ak = self.lin["data"]["A"][name]    ## A for kth linear constrain set
+                ## A for kth linear constrain set
+                Ak = coo_matrix(self.lin["data"]["A"][name])
                 i1 = self.lin["idx"]["i1"][name]    ## starting row index
                 iN = self.lin["idx"]["iN"][name]    ## ing row index
                 vsl = self.lin["data"]["vs"][name]  ## var set list
-                kN = 0                              ## initialize last col of Ak used
-                # FIXME: Sparse matrix with fancy indexing
-                Ai = zeros((N, self.var["N"]))
-                for v in vsl:
-                    j1 = self.var["idx"]["i1"][v]      ## starting column in A
-                    jN = self.var["idx"]["iN"][v]      ## ing column in A
-                    k1 = kN                            ## starting column in Ak
-                    kN = kN + self.var["idx"]["N"][v]  ## ing column in Ak
-                    Ai[:, j1:jN] = Ak[:, k1:kN].todense()
 
-                A[i1:iN, :] = Ai
+                ## column in A of each column of Ak
+                jj = concatenate([[]] + [arange(self.var["idx"]["i1"][v],
+                                                self.var["idx"]["iN"][v])
+                                         for v in vsl]).astype(int)
+
+                rows.append(Ak.row + i1)
+                cols.append(jj[Ak.col])
+                vals.append(Ak.data)
 
                 l[i1:iN] = self.lin["data"]["l"][name]
                 u[i1:iN] = self.lin["data"]["u"][name]
 
-        return A.tocsr(), l, u
+        A = coo_matrix((concatenate(vals), (concatenate(rows),
+                                            concatenate(cols))),
+                       (self.lin["N"], self.var["N"])).tocsr()
+        A.eliminate_zeros()
+
+        self.lin["cache"] = (A, l, u)
+
+        return A, l.copy(), u.copy()
+
+
+    def set_dirty(self, kind, name):
+        """Marks a block as changed, see L{is_dirty}.
+        """
+        self.dirty.add((kind, name))
+
+
+    def update_constraints(self, name, A=None, l=None, u=None):
+        """Changes the data of an existing set of linear constraints.
+
+        Replaces any of C{A}, C{l} and C{u} of the linear constraint set
+        C{name}, keeping its number of rows and var sets. If only the
+        bounds change, the cached result of L{linear_constraints} is
+        updated in place, otherwise it is rebuilt on the next call. If C{A}
+        does not have the size of the set, an error is printed and nothing
+        is changed.
+        """
+        if name not in self.lin["idx"]["N"]:
+            stderr.write('opf_model.update_constraints: linear constraint '
+                         'set named \'%s\' does not exist\n' % name)
+            return
+
+        N = self.lin["idx"]["N"][name]
+        i1 = self.lin["idx"]["i1"][name]
+        iN = self.lin["idx"]["iN"][name]
+        if A is not None:
+            if A.shape[0] != N or \
+                    A.shape[1] != self.lin["data"]["A"][name].shape[1]:
+                stderr.write('opf_model.update_constraints: size of A does '
+                             'not match constraint set \'%s\'\n' % name)
+                return
+        self.dirty.add(("lin", name))
+        if A is not None:
+            self.lin["data"]["A"][name] = A
+            self.lin["cache"] = None
+        for key, val in [("l", l), ("u", u)]:
+            if val is not None:
+                self.lin["data"][key][name] = val
+                if self.lin["cache"] is not None:
+                    b = self.lin["cache"][1 if key == "l" else 2]
+                    b[i1:iN] = val
+
+
+    def update_costs(self, name, cp):
+        """Changes the data of an existing set of user costs.
+
+        Replaces the parameters given in the C{cp} dict (any of C{N},
+        C{Cw}, C{H}, C{dd}, C{rh}, C{kk} and C{mm}, see L{add_costs}) of the
+        cost set C{name}, keeping its number of rows and var sets. The full
+        set of cost parameters is rebuilt by the next call to
+        L{build_cost_params}.
+        """
+        if name not in self.cost["idx"]["N"]:
+            stderr.write('opf_model.update_costs: cost set named \'%s\' '
+                         'does not exist\n' % name)
+            return
+
+        for key in ["N", "Cw", "H", "dd", "rh", "kk", "mm"]:
+            if key in cp:
+                self.cost["data"][key][name] = cp[key]
+        self.cost.pop("params", None)
+        self.dirty.add(("cost", name))
+
+
+    def update_vars(self, name, v0=None, vl=None, vu=None):
+        """Changes the initial values or bounds of an existing var set.
+
+        Replaces any of C{v0}, C{vl} and C{vu} of the var set C{name},
+        keeping its number of variables.
+        """
+        if name not in self.var["idx"]["N"]:
+            stderr.write('opf_model.update_vars: variable set named '
+                         '\'%s\' does not exist\n' % name)
+            return
+
+        for key, val in [("v0", v0), ("vl", vl), ("vu", vu)]:
+            if val is not None:
+                self.var["data"][key][name] = val
+        self.dirty.add(("var", name))
 
 
     def userdata(self, name, val=None):
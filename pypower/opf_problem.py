@@ -0,0 +1,279 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""OPF problem which is set up once and solved repeatedly.
+"""
+
+from time import time
+
+from numpy import array, arange, array_equal, zeros, c_, ix_, \
+    flatnonzero as find
+
+from pypower.idx_bus import PD, QD, GS, VMIN, VMAX, MU_VMIN
+from pypower.idx_gen import PG, QG, PMIN, PMAX, QMIN, QMAX, MU_QMIN, \
+    MU_PMAX, MU_PMIN
+from pypower.idx_brch import RATE_A, PF, QF, PT, QT, MU_SF, MU_ST, \
+    MU_ANGMIN, MU_ANGMAX
+from pypower.idx_cost import MODEL, NCOST, COST, POLYNOMIAL
+
+from pypower.ppoption import ppoption
+from pypower.ext2int import ext2int
+from pypower.e2i_data import e2i_data
+from pypower.int2ext import int2ext
+from pypower.opf_args import opf_args2
+from pypower.opf_setup import opf_setup
+from pypower.opf_execute import opf_execute
+from pypower.makeBdc import makeBdc
+from pypower.makeAvl import makeAvl
+from pypower.makeApq import makeApq
+from pypower.makeAy import makeAy
+from pypower.pqcost import pqcost
+
+
+class opf_problem(object):
+    """OPF problem which is set up once and solved repeatedly.
+
+    Converts the case to internal indexing and builds the L{opf_model}
+    once, with the same arguments as L{opf}. The loads, generator and
+    voltage limits, branch ratings and generator costs can then be
+    changed in place with the C{set_*} methods, which take data in the
+    external indexing of the case (all rows by default, or the rows
+    C{idx} of the C{bus}, C{gen} or C{branch} matrix) and update only the
+    affected blocks of the model, which records them as dirty (see
+    L{opf_model.is_dirty}). L{solve} runs the OPF on the current data and
+    returns a C{results} dict as L{opf} does. The admittance matrices and
+    the sparsity patterns of the AC OPF derivatives are kept across
+    solves.
+
+    The network (topology, impedances, set of branches with flow limits)
+    and the structure of the costs (C{MODEL} and C{NCOST}) are fixed; a
+    change which affects them raises a C{ValueError}, leaving the data
+    and the model unchanged.
+
+    Example::
+
+        prob = opf_problem(ppc, ppopt)
+        for Pd, Qd in profile:
+            prob.set_load(Pd, Qd)
+            results = prob.solve(warm_start=True)
+
+    @see: L{opf}, L{opf_model}
+    """
+
+    def __init__(self, *args):
+        ppc, ppopt = opf_args2(*args)
+
+        ## add zero columns to bus, gen, branch for multipliers, etc if needed
+        for key, col in [('bus', MU_VMIN), ('gen', MU_QMIN),
+                         ('branch', MU_ANGMAX)]:
+            n, m = ppc[key].shape
+            if m < col + 1:
+                ppc[key] = c_[ppc[key], zeros((n, col + 1 - m))]
+
+        #: options
+        self.ppopt = ppopt
+        #: case in internal indexing, shared with the model
+        self.ppc = ext2int(ppc, copy=False)
+        #: OPF model
+        self.om = opf_setup(self.ppc, ppopt)
+        #: results of the last solve
+        self.results = None
+
+        if ppopt['PF_DC']:
+            _, _, self.Pbusinj, self.Pfinj = \
+                makeBdc(self.ppc['baseMVA'], self.ppc['bus'],
+                        self.ppc['branch'])
+
+    def set_load(self, Pd=None, Qd=None, idx=None):
+        """Sets the real and reactive power demands (MW, MVAr) of buses.
+        """
+        self._set('bus', [(PD, Pd), (QD, Qd)], idx)
+        self.om.set_dirty('ppc', 'load')
+
+        if self.ppopt['PF_DC']:
+            bus = self.ppc['bus']
+            bmis = -(bus[:, PD] + bus[:, GS]) / self.ppc['baseMVA'] - \
+                self.Pbusinj
+            self.om.update_constraints('Pmis', l=bmis, u=bmis)
+
+    def set_gen_limits(self, Pmin=None, Pmax=None, Qmin=None, Qmax=None,
+                       idx=None):
+        """Sets the real and reactive power limits (MW, MVAr) of generators.
+        """
+        ext, gen = self._values('gen', [(PMIN, Pmin), (PMAX, Pmax),
+                                        (QMIN, Qmin), (QMAX, Qmax)], idx)
+        baseMVA, om = self.ppc['baseMVA'], self.om
+
+        ## dispatchable loads and capability curves depend on the limits,
+        ## check them before changing any data
+        if not self.ppopt['PF_DC']:
+            Avl, lvl, uvl, _ = makeAvl(baseMVA, gen)
+            Apqh, ubpqh, Apql, ubpql, Apqdata = makeApq(baseMVA, gen)
+            lin = [('vl', Avl, lvl, uvl), ('PQh', Apqh, None, ubpqh),
+                   ('PQl', Apql, None, ubpql)]
+            for name, A, _, _ in lin:
+                if A.shape[0] != om.getN('lin', name):
+                    raise ValueError('opf_problem: the new generator limits '
+                                     'change the number of \'%s\' '
+                                     'constraints' % name)
+
+        self._store('gen', ext, gen)
+        om.update_vars('Pg', vl=gen[:, PMIN] / baseMVA,
+                       vu=gen[:, PMAX] / baseMVA)
+
+        if not self.ppopt['PF_DC']:
+            om.update_vars('Qg', vl=gen[:, QMIN] / baseMVA,
+                           vu=gen[:, QMAX] / baseMVA)
+            for name, A, l, u in lin:
+                if A.shape[0]:
+                    om.update_constraints(name, A, l, u)
+            om.userdata('Apqdata', Apqdata)
+
+    def set_voltage_limits(self, Vmin=None, Vmax=None, idx=None):
+        """Sets the voltage magnitude limits (p.u.) of buses.
+        """
+        self._set('bus', [(VMIN, Vmin), (VMAX, Vmax)], idx)
+        if not self.ppopt['PF_DC']:
+            bus = self.ppc['bus']
+            self.om.update_vars('Vm', vl=bus[:, VMIN], vu=bus[:, VMAX])
+        else:
+            self.om.set_dirty('ppc', 'vlim')
+
+    def set_branch_rating(self, rate_a, idx=None):
+        """Sets the flow limits (C{RATE_A}, MVA) of branches.
+        """
+        ext, branch = self._values('branch', [(RATE_A, rate_a)], idx)
+        rate = self.ppc['branch'][:, RATE_A]
+        il = find((rate != 0) & (rate < 1e10))
+        il_new = find((branch[:, RATE_A] != 0) & (branch[:, RATE_A] < 1e10))
+        if not array_equal(il, il_new):
+            raise ValueError('opf_problem: the new ratings change the '
+                             'set of branches with flow limits')
+
+        self._store('branch', ext, branch)
+        self.om.set_dirty('ppc', 'rate')
+
+        if self.ppopt['PF_DC']:
+            rate = branch[il, RATE_A] / self.ppc['baseMVA']
+            self.om.update_constraints('Pf', u=rate - self.Pfinj[il])
+            self.om.update_constraints('Pt', u=rate + self.Pfinj[il])
+
+    def set_gencost(self, gencost):
+        """Sets the generator cost data.
+
+        C{gencost} is a full C{gencost} matrix for the case, in external
+        indexing, with the same C{MODEL} and C{NCOST} for each row.
+        """
+        o = self.ppc['order']
+        ng = o['ext']['gen'].shape[0]
+        gencost = array(gencost, float)
+        if gencost.shape[0] == 2 * ng:
+            gc = e2i_data(self.ppc, gencost, ['gen', 'gen'])
+        else:
+            gc = e2i_data(self.ppc, gencost, 'gen')
+
+        ## as done by opf_setup
+        ngi = self.ppc['gen'].shape[0]
+        if self.ppopt['PF_DC']:
+            gc, _ = pqcost(gc, ngi)
+        pwl1 = self.om.userdata('pwl1')
+        if len(pwl1) > 0:
+            x0, y0 = gc[pwl1, COST], gc[pwl1, COST + 1]
+            x1, y1 = gc[pwl1, COST + 2], gc[pwl1, COST + 3]
+            m = (y1 - y0) / (x1 - x0)
+            gc[pwl1, MODEL] = POLYNOMIAL
+            gc[pwl1, NCOST] = 2
+            gc[pwl1, COST] = m
+            gc[pwl1, COST + 1] = y0 - m * x0
+
+        old = self.ppc['gencost']
+        if gc.shape != old.shape or \
+                not array_equal(gc[:, [MODEL, NCOST]], old[:, [MODEL, NCOST]]):
+            raise ValueError('opf_problem: the new costs must have the same '
+                             'MODEL and NCOST as the current ones')
+        old[:] = gc
+        o['ext']['gencost'] = gencost
+        self.om.set_dirty('ppc', 'gencost')
+
+        ## basin constraints of piece-wise linear costs
+        if self.om.getN('lin', 'ycon'):
+            nq = 0 if self.ppopt['PF_DC'] else ngi
+            q1 = array([]) if self.ppopt['PF_DC'] else ngi
+            Ay, by = makeAy(self.ppc['baseMVA'], ngi, old, 1, q1,
+                            1 + ngi + nq)
+            self.om.update_constraints('ycon', A=Ay, u=by)
+
+    def solve(self, warm_start=False):
+        """Solves the OPF for the current data and returns the results.
+
+        With C{warm_start}, the AC OPF solved by PIPS starts from the
+        results of the previous solve (see C{PDIPM_WARM_START} in
+        L{ppoption}). The C{om} of the results is the model of this
+        problem, which is updated by later changes.
+        """
+        t0 = time()
+        ppopt = self.ppopt
+        if warm_start and self.results is not None:
+            ppopt = ppoption(ppopt, PDIPM_WARM_START=self.results)
+
+        results, success, raw = opf_execute(self.om, ppopt)
+
+        ## the solvers return the case of the model, keep it out of the copy
+        results = dict(results)
+        om = results.pop('om', None)
+        self.ppc.pop('om', None)
+        results = int2ext(results)
+
+        ## zero out result fields of out-of-service gens & branches
+        o = results['order']
+        if len(o['gen']['status']['off']) > 0:
+            results['gen'][ix_(o['gen']['status']['off'],
+                               [PG, QG, MU_PMAX, MU_PMIN])] = 0
+        if len(o['branch']['status']['off']) > 0:
+            results['branch'][ix_(o['branch']['status']['off'],
+                                  [PF, QF, PT, QT, MU_SF, MU_ST, MU_ANGMIN,
+                                   MU_ANGMAX])] = 0
+
+        results['om'] = om
+        results['et'] = time() - t0
+        results['success'] = success
+        results['raw'] = raw
+
+        self.om.clear_dirty()
+        self.results = results
+
+        return results
+
+    def _set(self, key, values, idx):
+        """Sets columns of the C{bus}, C{gen} or C{branch} data.
+
+        C{values} is a list of C{(column, value)}, with values for the
+        rows C{idx} (default all) of the external matrix; C{None} values
+        are skipped. Updates the external data kept in C{order} and the
+        internal matrix.
+        """
+        self._store(key, *self._values(key, values, idx))
+
+    def _values(self, key, values, idx):
+        """Returns the C{bus}, C{gen} or C{branch} data with new values.
+
+        Returns copies of the external matrix kept in C{order} and of the
+        internal matrix with the C{values} set as by L{_set}, so a change
+        can be checked before it is stored.
+        """
+        ext = self.ppc['order']['ext'][key].copy()
+        data = self.ppc[key].copy()
+        rows = arange(ext.shape[0]) if idx is None else idx
+        for col, val in values:
+            if val is not None:
+                ext[rows, col] = val
+                data[:, col] = e2i_data(self.ppc, ext[:, col], key)
+        return ext, data
+
+    def _store(self, key, ext, data):
+        """Stores the external and internal C{bus}, C{gen} or C{branch}
+        data returned by L{_values}.
+        """
+        self.ppc['order']['ext'][key][:] = ext
+        self.ppc[key][:] = data
@@ -207,6 +207,7 @@ def opf_setup(ppc, ppopt):
 
     if dc:
         om.userdata('Bf', Bf)
+        om.userdata('Pbusinj', Pbusinj)
         om.userdata('Pfinj', Pfinj)
         om.userdata('iang', iang)
         om.add_vars('Va', nb, Va, Val, Vau)
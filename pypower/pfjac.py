@@ -0,0 +1,150 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Power flow Jacobian with a fixed sparsity pattern.
+"""
+
+from numpy import arange, ones, zeros, conj, diag, dot, ix_, r_
+from scipy.sparse import coo_matrix, csr_matrix
+
+
+class pfjac(object):
+    """Power flow Jacobian with a fixed sparsity pattern.
+
+    Builds the sparsity pattern of the polar power flow Jacobian::
+
+        J = [ dP/dVa[pvpq, pvpq]   dP/dVm[pvpq, pq]
+              dQ/dVa[pq,   pvpq]   dQ/dVm[pq,   pq] ]
+
+    once for a given C{Ybus} and set of C{pv} and C{pq} buses, along with
+    the map from each nonzero of C{Ybus} to its position in the C{data}
+    array of the CSR Jacobian. Each call to L{update} then evaluates the
+    partial derivatives of L{dSbus_dV} element-wise over the nonzeros of
+    C{Ybus} and refills C{J.data} in place, so no sparse structure is
+    allocated between Newton iterations.
+
+    Example::
+
+        jac = pfjac(Ybus, pv, pq)
+        J = jac.update(V)
+
+    @see: L{newtonpf}, L{dSbus_dV}
+    """
+
+    def __init__(self, Ybus, pv, pq):
+        nb = Ybus.shape[0]
+        npvpq = len(pv) + len(pq)
+        npq = len(pq)
+        pvpq = r_[pv, pq].astype(int)
+        pq = pq.astype(int)
+
+        ## pattern of Ybus with an explicit diagonal
+        Y = coo_matrix(Ybus)
+        ib = arange(nb)
+        Y = coo_matrix((r_[Y.data, zeros(nb, complex)],
+                        (r_[Y.row, ib], r_[Y.col, ib])), (nb, nb)).tocsr()
+        Y.sum_duplicates()
+        Y.sort_indices()
+
+        row = arange(nb).repeat(Y.indptr[1:] - Y.indptr[:-1])
+        col = Y.indices
+
+        ## position of each bus in the rows/columns of the Jacobian blocks
+        i_pvpq = -ones(nb, int)
+        i_pvpq[pvpq] = arange(npvpq)
+        i_pq = -ones(nb, int)
+        i_pq[pq] = arange(npq)
+
+        ## nonzeros of Ybus contributing to each block of J
+        k11 = ((i_pvpq[row] >= 0) & (i_pvpq[col] >= 0)).nonzero()[0]
+        k12 = ((i_pvpq[row] >= 0) & (i_pq[col] >= 0)).nonzero()[0]
+        k21 = ((i_pq[row] >= 0) & (i_pvpq[col] >= 0)).nonzero()[0]
+        k22 = ((i_pq[row] >= 0) & (i_pq[col] >= 0)).nonzero()[0]
+
+        Jr = r_[i_pvpq[row[k11]], i_pvpq[row[k12]],
+                npvpq + i_pq[row[k21]], npvpq + i_pq[row[k22]]]
+        Jc = r_[i_pvpq[col[k11]], npvpq + i_pq[col[k12]],
+                i_pvpq[col[k21]], npvpq + i_pq[col[k22]]]
+
+        ## index into r_[dS_dVa.real, dS_dVm.real, dS_dVa.imag, dS_dVm.imag]
+        nnz = Y.nnz
+        src = r_[k11, nnz + k12, 2 * nnz + k21, 3 * nnz + k22]
+
+        ## build the CSR pattern, tagging each entry with its source so the
+        ## ordering chosen by the COO -> CSR conversion can be recovered
+        nj = npvpq + npq
+        tag = arange(1, len(src) + 1, dtype=float)
+        J = coo_matrix((tag, (Jr, Jc)), (nj, nj)).tocsr()
+        J.sort_indices()
+
+        #: Ybus (CSR) with an explicit diagonal
+        self.Ybus = Y
+        #: position of each bus in the P / Va and the Q / Vm blocks of J
+        self.i_pvpq, self.i_pq = i_pvpq, i_pq
+        #: row and column index of each nonzero of C{Ybus}
+        self.row, self.col = row, col
+        #: positions of the diagonal elements within C{Ybus.data}
+        self.diag = (row == col).nonzero()[0]
+        #: for each element of C{J.data}, its index into the stacked partials
+        self.take = src[J.data.astype(int) - 1]
+        #: the Jacobian, whose C{data} array is refilled by L{update}
+        self.J = csr_matrix((zeros(J.nnz), J.indices, J.indptr), (nj, nj))
+
+    def update(self, V):
+        """Evaluates the Jacobian at the complex bus voltages C{V}.
+
+        Refills the C{data} array of the cached CSR matrix and returns it.
+        """
+        Y, row, col, diag = self.Ybus, self.row, self.col, self.diag
+
+        Ibus = Y * V
+        Vnorm = V / abs(V)
+
+        ## off-diagonal terms: V_i * conj(Y_ik * V_k)
+        VYV = V[row] * conj(Y.data * V[col])
+
+        dS_dVa = -1j * VYV
+        dS_dVa[diag] += 1j * V * conj(Ibus)
+
+        dS_dVm = VYV / abs(V[col])
+        dS_dVm[diag] += conj(Ibus) * Vnorm
+
+        partials = r_[dS_dVa.real, dS_dVm.real, dS_dVa.imag, dS_dVm.imag]
+        self.J.data[:] = partials[self.take]
+
+        return self.J
+
+    def dJ(self, idx, dY, V):
+        """Returns the change in the Jacobian for a low-rank change in Ybus.
+
+        For a change C{dY} in the elements of C{Ybus} on the buses C{idx},
+        as returned by L{updateYbus}, returns the rows and columns of the
+        Jacobian that change and the dense matrix C{M} such that at the
+        voltages C{V}::
+
+            J_new = J_old + E_r * M * E_c.T
+
+        where C{E_r} and C{E_c} are the columns C{rows} and C{cols} of the
+        identity matrix, for use with L{smwsolve}.
+        """
+        i_pvpq, i_pq = self.i_pvpq, self.i_pq
+        npvpq = (i_pvpq >= 0).sum()
+        Vi = V[idx]
+        dI = dot(dY, Vi)
+
+        ## partials of dY on the buses idx, as in dSbus_dV
+        VYV = Vi[:, None] * conj(dY * Vi[None, :])
+        dS_dVa = -1j * VYV + diag(1j * Vi * conj(dI))
+        dS_dVm = VYV / abs(Vi)[None, :] + diag(conj(dI) * Vi / abs(Vi))
+
+        ## rows / columns of J corresponding to the buses idx
+        a = (i_pvpq[idx] >= 0).nonzero()[0]     ## P rows, Va columns
+        m = (i_pq[idx] >= 0).nonzero()[0]       ## Q rows, Vm columns
+        rows = r_[i_pvpq[idx[a]], npvpq + i_pq[idx[m]]]
+
+        M = r_['0,2',
+               r_['1,2', dS_dVa[ix_(a, a)].real, dS_dVm[ix_(a, m)].real],
+               r_['1,2', dS_dVa[ix_(m, a)].imag, dS_dVm[ix_(m, m)].imag]]
+
+        return rows, M, rows
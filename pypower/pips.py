@@ -5,15 +5,16 @@
 """Python Interior Point Solver (PIPS).
 """
 from math import inf
-from numpy import array, any, isnan, ones, r_, finfo, \
-    zeros, dot, absolute, log, flatnonzero as find
+from numpy import array, any, isnan, ones, r_, finfo, nan, \
+    zeros, dot, absolute, log, maximum, flatnonzero as find
 
 from numpy.linalg import norm
 
-from scipy.sparse import vstack, hstack, eye, csr_matrix as sparse
+from scipy.sparse import vstack, hstack, eye
 
 from pypower.pipsver import pipsver
 from pypower.pplinsolve import pplinsolve
+from pypower.pipskkt import pipskkt
 
 
 EPS = finfo(float).eps
@@ -140,6 +141,18 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
                     value is also passed as the 3rd argument to the Hessian
                     evaluation function so that it can appropriately scale the
                     objective function term in the Hessian of the Lagrangian.
+                  - C{linsolver} ('', i.e. C{spsolve}) - linear solver for
+                    the Newton step, as for L{pplinsolve}. The KKT matrix is
+                    assembled by L{pipskkt} with a fixed sparsity pattern, so
+                    an L{splu_solver} reuses its ordering across iterations
+                    (used by L{pipsopf_solver})
+                  - C{lmbda0} (None) - multipliers to warm start from, in the
+                    form of the C{lmbda} dict of a previous solution for the
+                    same constraints, typically with its C{x} as C{x0}. The
+                    slacks are initialized from the constraints at C{x0}, and
+                    the barrier coefficient from their complementarity with
+                    the multipliers, so a solution of a slightly perturbed
+                    problem converges in fewer iterations
     @type opt: dict
 
     @rtype: dict
@@ -217,6 +230,10 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
         opt["cost_mult"] = 1
     if "verbose" not in opt:
         opt["verbose"] = 0
+    if "linsolver" not in opt:
+        opt["linsolver"] = ''
+    if "lmbda0" not in opt:
+        opt["lmbda0"] = None
 
     # initialize history
     hist = []
@@ -229,6 +246,7 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
     rho_min = 0.95
     rho_max = 1.05
     mu_threshold = 1e-5
+    z_warm = 1e-3
 
     # initialize
     i = 0                       # iteration counter
@@ -299,14 +317,28 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
     nbx = len(ibx)             # number of doubly bounded linear inequalities
 
     # initialize gamma, lam, mu, z, e
-    gamma = 1                  # barrier coefficient
-    lam = zeros(neq)
-    z = z0 * ones(niq)
-    mu = z0 * ones(niq)
-    k = find(h < -z0)
-    z[k] = -h[k]
-    k = find((gamma / z) > z0)
-    mu[k] = gamma / z[k]
+    if opt["lmbda0"] is None:
+        gamma = 1                  # barrier coefficient
+        lam = zeros(neq)
+        z = z0 * ones(niq)
+        mu = z0 * ones(niq)
+        k = find(h < -z0)
+        z[k] = -h[k]
+        k = find((gamma / z) > z0)
+        mu[k] = gamma / z[k]
+    else:
+        lm = opt["lmbda0"]
+        mu_l = r_[lm["lower"], lm["mu_l"]]
+        mu_u = r_[lm["upper"], lm["mu_u"]]
+        lam = r_[lm.get("eqnonlin", zeros(neqnln)),
+                 mu_u[ieq] - mu_l[ieq]] * opt["cost_mult"]
+        mu = r_[lm.get("ineqnonlin", zeros(niqnln)), mu_u[ilt], mu_l[igt],
+                mu_u[ibx], mu_l[ibx]] * opt["cost_mult"]
+        # keep slacks and multipliers away from zero, and set the barrier
+        # coefficient to match their complementarity
+        z = maximum(-h, z_warm)
+        mu = maximum(mu, z_warm * opt["cost_mult"])
+        gamma = sigma * dot(z, mu) / niq if niq else 0
     e = ones(niq)
 
     # check tolerance
@@ -356,6 +388,9 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
         if opt["verbose"]:
             print("Converged!")
 
+    # KKT matrix with a fixed pattern, for the Newton steps
+    kkt = pipskkt()
+
     # do Newton iterations
     while (not converged) and (i < opt["max_it"]):
         # update iteration counter
@@ -373,21 +408,15 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
         else:
             _, _, d2f = f_fcn(x, True)      # cost
             Lxx = d2f * opt["cost_mult"]
-        rz = range(len(z))
-        zinvdiag = sparse((1.0 / z, (rz, rz))) if len(z) else None
-        rmu = range(len(mu))
-        mudiag = sparse((mu, (rmu, rmu))) if len(mu) else None
-        dh_zinv = None if dh is None else dh * zinvdiag
-        M = Lxx if dh is None else Lxx + dh_zinv * mudiag * dh.T
-        N = Lx if dh is None else Lx + dh_zinv * (mudiag * h + gamma * e)
-
-        Ab = sparse(M) if dg is None else vstack([
-            hstack([M, dg]),
-            hstack([dg.T, sparse((neq, neq))])
-        ])
+        N = Lx if dh is None else Lx + dh * ((mu * h + gamma * e) / z)
+
+        Ab = kkt.assemble(Lxx, dh, mu / z, dg)
         bb = r_[-N, -g]
 
-        dxdlam = pplinsolve(Ab.tocsr(), bb)
+        try:
+            dxdlam = pplinsolve(Ab, bb, opt["linsolver"])
+        except RuntimeError:            ## singular
+            dxdlam = nan * bb
 
         if any(isnan(dxdlam)):
             if opt["verbose"]:
@@ -398,7 +427,7 @@ def pips(f_fcn, x0=None, A=None, l=None, u=None, xmin=None, xmax=None,
         dx = dxdlam[:nx]
         dlam = dxdlam[nx:nx + neq]
         dz = -h - z if dh is None else -h - z - dh.T * dx
-        dmu = -mu if dh is None else -mu + zinvdiag * (gamma * e - mudiag * dz)
+        dmu = -mu if dh is None else -mu + (gamma * e - mu * dz) / z
 
         # optional step-size control
         sc = False
@@ -0,0 +1,123 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""KKT matrix of the PIPS Newton step with a fixed sparsity pattern.
+"""
+
+from numpy import arange, array_equal, bincount, cumsum, diff, repeat, \
+    unique, r_
+from scipy.sparse import csc_matrix, csr_matrix
+
+
+class pipskkt(object):
+    """KKT matrix of the PIPS Newton step with a fixed sparsity pattern.
+
+    Assembles the matrix of the Newton step of L{pips}::
+
+        [ Lxx + dh * diag(d) * dh.T   dg ]
+        [ dg.T                         0 ]
+
+    with C{d = mu / z}. The sparsity pattern is computed from those of
+    C{Lxx}, C{dh} and C{dg} the first time, along with the position in the
+    C{data} array of the CSR result of every term of the sum, including
+    each product C{dh[i, k] * d[k] * dh[j, k]}. Subsequent calls with
+    matrices of the same patterns scatter the new values with a single
+    C{bincount}, without forming any intermediate sparse matrix. The
+    pattern is recomputed whenever one of the input patterns changes.
+
+    As the pattern of the result is fixed, solving with an L{splu_solver}
+    reuses the fill-reducing ordering across iterations.
+
+    @see: L{pips}, L{splu_solver}
+    """
+
+    def __init__(self):
+        #: patterns of C{Lxx}, C{dh} and C{dg} used to build the maps
+        self.patterns = None
+        #: number of rows and columns
+        self.n = 0
+        #: pointers and column indices of the CSR result
+        self.indptr, self.indices = None, None
+        #: position of each term in the C{data} array of the result
+        self.pos = None
+        #: entries of C{dh} and column of the C{dh * diag(d) * dh.T} terms
+        self.a, self.b, self.k = None, None, None
+
+    def assemble(self, Lxx, dh, d, dg):
+        """Returns the KKT matrix (CSR) for the given values.
+
+        C{dh} and C{dg} may be C{None} if there are no inequality or
+        equality constraints, respectively.
+        """
+        Lxx = csr_matrix(Lxx)
+        dh = None if dh is None else csc_matrix(dh)
+        dg = None if dg is None else csc_matrix(dg)
+
+        patterns = [_pattern(A) for A in (Lxx, dh, dg)]
+        if self.patterns is None or \
+                not all(map(_same, patterns, self.patterns)):
+            self._build(Lxx, dh, dg)
+            self.patterns = [p if p is None else (p[0], p[1].copy(),
+                                                  p[2].copy())
+                             for p in patterns]
+
+        vals = [Lxx.data]
+        if dh is not None:
+            vals.append(dh.data[self.a] * dh.data[self.b] * d[self.k])
+        if dg is not None:
+            vals.extend([dg.data, dg.data])
+        data = bincount(self.pos, r_[tuple(vals)], len(self.indices))
+
+        return csr_matrix((data, self.indices, self.indptr), (self.n, self.n))
+
+    def _build(self, Lxx, dh, dg):
+        """Computes the pattern of the result and the map of the terms.
+        """
+        nx = Lxx.shape[0]
+        neq = 0 if dg is None else dg.shape[1]
+        n = nx + neq
+
+        rows = [repeat(arange(nx), diff(Lxx.indptr))]
+        cols = [Lxx.indices]
+
+        if dh is not None:
+            ## all pairs of entries (a, b) in each column k of dh
+            cnt = diff(dh.indptr)
+            col = repeat(arange(dh.shape[1]), cnt)
+            reps = cnt[col]
+            a = repeat(arange(dh.nnz), reps)
+            start = cumsum(reps) - reps
+            b = dh.indptr[col[a]] + arange(len(a)) - start[a]
+            self.a, self.b, self.k = a, b, col[a]
+            rows.append(dh.indices[a])
+            cols.append(dh.indices[b])
+
+        if dg is not None:
+            gr = dg.indices
+            gc = nx + repeat(arange(neq), diff(dg.indptr))
+            rows.extend([gr, gc])
+            cols.extend([gc, gr])
+
+        key = r_[tuple(rows)].astype(int) * n + r_[tuple(cols)]
+        uniq, pos = unique(key, return_inverse=True)
+
+        self.n = n
+        self.pos = pos.ravel()
+        self.indices = uniq % n
+        self.indptr = r_[0, cumsum(bincount(uniq // n, minlength=n))]
+
+
+def _pattern(A):
+    """Returns the shape and compressed index arrays of C{A}, or C{None}.
+    """
+    return None if A is None else (A.shape, A.indptr, A.indices)
+
+
+def _same(p, q):
+    """Returns C{True} if the patterns C{p} and C{q} are equal.
+    """
+    if p is None or q is None:
+        return p is q
+    return p[0] == q[0] and array_equal(p[1], q[1]) and \
+        array_equal(p[2], q[2])
@@ -5,7 +5,7 @@
 """Converts polynomial cost variable to piecewise linear.
 """
 
-from numpy import ones, zeros, r_
+from numpy import asarray, zeros, arange
 
 from pypower.idx_cost import MODEL, COST, NCOST, PW_LINEAR
 
@@ -16,33 +16,35 @@ def poly2pwl(polycost, Pmin, Pmax, npts):
     """Converts polynomial cost variable to piecewise linear.
 
     Converts the polynomial cost variable C{polycost} into a piece-wise linear
-    cost by evaluating at zero and then at C{npts} evenly spaced points between
-    C{Pmin} and C{Pmax}. If C{Pmin <= 0} (such as for reactive power, where
-    C{P} really means C{Q}) it just uses C{npts} evenly spaced points between
-    C{Pmin} and C{Pmax}.
+    cost by evaluating at zero and then at C{npts - 1} evenly spaced points
+    between C{Pmin} and C{Pmax}. If C{Pmin <= 0} (such as for reactive power,
+    where C{P} really means C{Q}) it just uses C{npts} evenly spaced points
+    between C{Pmin} and C{Pmax}. The points of all rows are evaluated at once
+    by L{totcost}. C{polycost} is not modified.
     """
-    pwlcost = polycost
+    Pmin = asarray(Pmin, float)
+    Pmax = asarray(Pmax, float)
     ## size of piece being changed
     m, n = polycost.shape
+
+    ## breakpoints, m x npts
+    pos = Pmin > 0
+    xx = zeros((m, npts))
+    t = arange(npts) / float(npts - 1)
+    xx[~pos, :] = Pmin[~pos, None] + (Pmax - Pmin)[~pos, None] * t
+    t = arange(npts - 1) / float(npts - 2)
+    xx[pos, 1:] = Pmin[pos, None] + (Pmax - Pmin)[pos, None] * t
+
+    ## costs at the breakpoints, row i of polycost evaluated at row i of xx
+    yy = totcost(polycost, xx.T).T
+
+    pwlcost = zeros((m, max(n, COST + 2 * npts)))
+    pwlcost[:, :COST] = polycost[:, :COST]
     ## change cost model
-    pwlcost[:, MODEL]  = PW_LINEAR * ones(m)
-    ## zero out old data
-    pwlcost[:, COST:COST + n] = zeros(pwlcost[:, COST:COST + n].shape)
+    pwlcost[:, MODEL] = PW_LINEAR
     ## change number of data points
-    pwlcost[:, NCOST]  = npts * ones(m)
-
-    for i in range(m):
-        if Pmin[i] == 0:
-            step = (Pmax[i] - Pmin[i]) / (npts - 1)
-            xx = range(Pmin[i], step, Pmax[i])
-        elif Pmin[i] > 0:
-            step = (Pmax[i] - Pmin[i]) / (npts - 2)
-            xx = r_[0, range(Pmin[i], step, Pmax[i])]
-        elif Pmin[i] < 0 & Pmax[i] > 0:        ## for when P really means Q
-            step = (Pmax[i] - Pmin[i]) / (npts - 1)
-            xx = range(Pmin[i], step, Pmax[i])
-        yy = totcost(polycost[i, :], xx)
-        pwlcost[i,      COST:2:(COST + 2*(npts-1)    )] = xx
-        pwlcost[i,  (COST+1):2:(COST + 2*(npts-1) + 1)] = yy
+    pwlcost[:, NCOST] = npts
+    pwlcost[:, COST:COST + 2 * npts:2] = xx
+    pwlcost[:, COST + 1:COST + 2 * npts:2] = yy
 
     return pwlcost
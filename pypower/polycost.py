@@ -7,7 +7,7 @@
 
 import sys
 
-from numpy import zeros, arange, flatnonzero as find
+from numpy import asarray, zeros, arange, flatnonzero as find
 
 from pypower.idx_cost import MODEL, NCOST, PW_LINEAR, COST
 
@@ -24,7 +24,9 @@ def polycost(gencost, Pg, der=0):
     of costs evaluated at C{Pg}
 
     C{gencost} must contain only polynomial costs
-    C{Pg} is in MW, not p.u. (works for C{Qg} too)
+    C{Pg} is in MW, not p.u. (works for C{Qg} too), a vector with one element
+    per row of C{gencost} or an C{nscen x ng} matrix with one row per
+    scenario, and the result has the same dimensions
 
     @author: Ray Zimmerman (PSERC Cornell)
     """
@@ -35,7 +37,8 @@ def polycost(gencost, Pg, der=0):
     if any(gencost[:, MODEL] == PW_LINEAR):
         sys.stderr.write('polycost: all costs must be polynomial\n')
 
-    ng = len(Pg)
+    Pg = asarray(Pg, float)
+    ng = gencost.shape[0]
     maxN = max( gencost[:, NCOST].astype(int) )
     minN = min( gencost[:, NCOST].astype(int) )
 
@@ -56,12 +59,12 @@ def polycost(gencost, Pg, der=0):
         for k in range(2, maxN - d + 1):
             c[:, k-1] = c[:, k-1] * k
 
-    ## evaluate polynomial
+    ## evaluate polynomial by Horner's rule, for all rows of Pg at once
     if len(c) == 0:
         f = zeros(Pg.shape)
     else:
-        f = c[:, :1].flatten()  ## constant term
-        for k in range(1, c.shape[1]):
-            f = f + c[:, k] * Pg**k
+        f = zeros(Pg.shape) + c[:, -1]  ## highest order term
+        for k in range(c.shape[1] - 2, -1, -1):
+            f = f * Pg + c[:, k]
 
     return f
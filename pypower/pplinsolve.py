@@ -1,10 +1,254 @@
-from numpy import asfortranarray
+from inspect import signature
+
+from numpy import asfortranarray, arange, argsort, array_equal, cumsum, \
+    diff, empty, r_
 from scipy.sparse import csc_matrix, csr_matrix
-from scipy.sparse.linalg import spsolve
+from scipy.sparse.linalg import spsolve, splu, spilu, gmres, bicgstab, \
+    LinearOperator
+
+from pypower.fdpf_factors import fdpf_factors
+
+## keyword of the relative tolerance of the SciPy Krylov solvers
+_RTOL = 'rtol' if 'rtol' in signature(gmres).parameters else 'tol'
+
+
+class splu_solver(object):
+    """Sparse LU solver that reuses the fill-reducing ordering.
+
+    Solves a sequence of systems C{A * x = b} whose matrices share a
+    sparsity pattern, such as the power flow Jacobians of successive
+    Newton iterations or of repeated power flows on the same network.
+    The first matrix of a given pattern is factored and solved with the
+    COLAMD ordering of SuperLU. The resulting column permutation is cached
+    along with the index map that applies it to the C{data} array, so
+    subsequent matrices with the same pattern are permuted by a single
+    gather and numerically refactored without recomputing the ordering.
+
+    CSR matrices are factored as the transpose of the CSC matrix sharing
+    their arrays, avoiding a format conversion.
+
+    Pass an instance as the C{PF_LIN_SOLVER_NR} option to share the cached
+    ordering across calls to L{runpf}, or set the option to C{'splu'} to
+    reuse it across the iterations of a single L{newtonpf} call.
+
+    @see: L{pplinsolve}
+    """
+
+    def __init__(self):
+        #: cached pattern (shape, indptr, indices) of the compressed matrix
+        self.pattern = None
+        #: fill-reducing column permutation of the compressed matrix
+        self.q = None
+        #: column pointers of the permuted matrix
+        self.indptr = None
+        #: index into C{data} for each element of the permuted matrix
+        self.take = None
+
+    def solve(self, A, b):
+        """Solves C{A * x = b}.
+        """
+        if isinstance(A, csr_matrix):
+            trans = 'T'
+        else:
+            A = csc_matrix(A)
+            trans = 'N'
+        n = A.shape[0]
+
+        ## compressed matrix: A if CSC, A^T if CSR
+        M = csc_matrix((A.data, A.indices, A.indptr), (n, n))
+        M.sum_duplicates()
+
+        q = self.q
+        if not self.same_pattern(M):
+            ## factor with the COLAMD ordering and cache it for this pattern
+            lu = splu(M)
+            q = argsort(lu.perm_c)
+            nnz = diff(M.indptr)[q]
+            indptr = r_[0, cumsum(nnz)]
+            self.pattern = (M.shape, M.indptr.copy(), M.indices.copy())
+            self.q = q
+            self.indptr = indptr
+            self.take = (M.indptr[q] - indptr[:-1]).repeat(nnz) + \
+                arange(M.nnz)
+
+            return lu.solve(b, trans=trans)
+
+        ## refactor with the cached ordering
+        take = self.take
+        Mq = csc_matrix((M.data[take], M.indices[take], self.indptr), (n, n))
+        lu = splu(Mq, permc_spec='NATURAL')
+
+        if trans == 'N':
+            y = lu.solve(b)
+            x = empty(y.shape, y.dtype)
+            x[q] = y
+        else:
+            x = lu.solve(b[q], trans='T')
+
+        return x
+
+    def same_pattern(self, M):
+        """Returns C{True} if C{M} has the sparsity pattern cached
+        by this solver.
+        """
+        if self.pattern is None:
+            return False
+        shape, indptr, indices = self.pattern
+        return shape == M.shape and \
+            (indptr is M.indptr or array_equal(indptr, M.indptr)) and \
+            (indices is M.indices or array_equal(indices, M.indices))
+
+
+class krylov_solver(object):
+    """Preconditioned Krylov solver for Newton-Krylov power flows.
+
+    Solves C{A * x = b} iteratively with the GMRES or BiCGSTAB solver of
+    SciPy (C{method} C{'gmres'} or C{'bicgstab'}) to the relative
+    tolerance C{tol}, using a preconditioner which is reused across
+    solves, so a sequence of Jacobians is solved with far fewer
+    factorizations than with a direct solver, at the cost of some inner
+    iterations. The preconditioner C{precond} is:
+        - C{'ilu'} - an incomplete LU factorization (see C{spilu}, with
+        the given C{drop_tol} and C{fill_factor}) of the first matrix,
+        recomputed only when the sparsity pattern of C{A} changes or an
+        iterative solve does not converge in C{maxiter} iterations
+        - C{'fdpf'} - the factors of the fast-decoupled B prime and
+        B double prime matrices set by L{set_fdpf}, applied to the angle
+        and magnitude blocks of the power flow Jacobian
+
+    If the preconditioned solve does not converge even with a fresh ILU
+    factorization, the last iterate is returned and the Newton
+    iterations continue from it.
+
+    Set the C{PF_LIN_SOLVER_NR} option to C{'gmres'} or C{'bicgstab'} to
+    reuse an ILU preconditioner across the iterations of a single
+    L{newtonpf} call, or pass an instance to reuse it across power flow
+    runs and scenarios. L{runpf} and L{runpf_batch} call L{set_fdpf} for
+    an instance with the C{'fdpf'} preconditioner.
+
+    Example::
+
+        ppopt = ppoption(PF_LIN_SOLVER_NR=krylov_solver('gmres', 'fdpf'))
+        for Pd in profile:
+            ppc['bus'][:, PD] = Pd
+            results, success = runpf(ppc, ppopt)
+
+    @see: L{pplinsolve}, L{newtonpf}, L{fdpf_factors}
+    """
+
+    def __init__(self, method='gmres', precond='ilu', tol=1e-6, maxiter=200,
+                 drop_tol=1e-4, fill_factor=10):
+        if method not in ('gmres', 'bicgstab'):
+            raise ValueError('krylov_solver: unknown method \'%s\'' % method)
+        if precond not in ('ilu', 'fdpf'):
+            raise ValueError('krylov_solver: unknown preconditioner '
+                             '\'%s\'' % precond)
+        #: Krylov method, C{'gmres'} or C{'bicgstab'}
+        self.method = method
+        #: preconditioner, C{'ilu'} or C{'fdpf'}
+        self.precond = precond
+        #: relative tolerance and maximum number of iterations of a solve
+        self.tol, self.maxiter = tol, maxiter
+        #: parameters of the incomplete LU factorization
+        self.drop_tol, self.fill_factor = drop_tol, fill_factor
+        #: cached pattern (shape, indptr, indices) of the factored matrix
+        self.pattern = None
+        #: preconditioner, as a C{LinearOperator}
+        self.M = None
+        #: cache of the fast-decoupled factors
+        self.fd = None
+        #: number of solves, of inner iterations and of ILU factorizations
+        self.nsolve, self.niter, self.nfactor = 0, 0, 0
+
+    def set_fdpf(self, baseMVA, bus, branch, pv, pq):
+        """Sets the fast-decoupled preconditioner for a power flow.
+
+        Factors the reduced B prime and B double prime matrices (XB
+        version) of the case data in internal indexing for the PV and PQ
+        buses C{pv} and C{pq}, in the order of the rows of the Jacobian
+        of L{newtonpf}. The factors are cached by an L{fdpf_factors}, so
+        they are only recomputed when the network or bus types change.
+        """
+        if self.fd is None:
+            self.fd = fdpf_factors()
+        Bp, Bpp = self.fd.factor(baseMVA, bus, branch, 2, pv, pq)
+        npvpq, npq = Bp.shape[0], Bpp.shape[0]
+        n = npvpq + npq
+
+        def solve(r):
+            r = r.ravel()
+            return r_[Bp.solve(r[:npvpq]), Bpp.solve(r[npvpq:])]
+
+        self.M = LinearOperator((n, n), solve)
+
+    def solve(self, A, b):
+        """Solves C{A * x = b}.
+        """
+        if self.precond == 'ilu':
+            if not self.same_pattern(A):
+                self.factor(A)
+        elif self.M is None or self.M.shape != A.shape:
+            raise ValueError('krylov_solver: the fdpf preconditioner is '
+                             'not set, see set_fdpf')
+
+        x, info = self.iterate(A, b)
+        if info != 0 and self.precond == 'ilu':
+            ## preconditioner too far from A, refactor and try again
+            self.factor(A)
+            x, info = self.iterate(A, b)
+        self.nsolve += 1
+
+        return x
+
+    def iterate(self, A, b):
+        """Runs the Krylov solver, returns the solution and its C{info}.
+        """
+        n = [0]
+
+        def count(_):
+            n[0] += 1
+
+        solver = gmres if self.method == 'gmres' else bicgstab
+        kw = {_RTOL: self.tol, 'atol': 0.0, 'maxiter': self.maxiter,
+              'M': self.M, 'callback': count}
+        if self.method == 'gmres':
+            kw['callback_type'] = 'pr_norm'
+        x, info = solver(A, b, **kw)
+        self.niter += n[0]
+
+        return x, info
+
+    def factor(self, A):
+        """Computes the incomplete LU preconditioner of C{A}.
+        """
+        lu = spilu(csc_matrix(A), drop_tol=self.drop_tol,
+                   fill_factor=self.fill_factor)
+        self.M = LinearOperator(A.shape, lu.solve)
+        self.pattern = (A.shape, A.indptr.copy(), A.indices.copy())
+        self.nfactor += 1
+
+    def same_pattern(self, A):
+        """Returns C{True} if C{A} has the sparsity pattern of the
+        factored matrix.
+        """
+        if self.pattern is None:
+            return False
+        shape, indptr, indices = self.pattern
+        return shape == A.shape and \
+            (indptr is A.indptr or array_equal(indptr, A.indptr)) and \
+            (indices is A.indices or array_equal(indices, A.indices))
 
 
 def pplinsolve(A, b, lin_solver=None):
     """Solves the linear system of equations C{A * x = b}.
+
+    C{lin_solver} selects the solver: C{''} or C{None} for C{spsolve},
+    C{'pyrlu'} for PyRLU, C{'splu'} for C{spsolve} (a single solve has no
+    ordering to reuse, L{newtonpf} replaces it by an L{splu_solver}),
+    C{'gmres'} or C{'bicgstab'} for a new ILU preconditioned
+    L{krylov_solver}, or an object with a C{solve(A, b)} method such as an
+    L{splu_solver} or L{krylov_solver} instance, whose cached ordering or
+    preconditioner is reused.
     """
     if lin_solver == "pyrlu":
         x = asfortranarray(b.copy())
@@ -23,6 +267,10 @@ def pplinsolve(A, b, lin_solver=None):
 
         import pyrlu
         pyrlu.factor_solve(n, A.indices, A.indptr, A.data, x, trans=trans, par=False)
+    elif lin_solver in ("gmres", "bicgstab"):
+        x = krylov_solver(lin_solver).solve(A, b)
+    elif hasattr(lin_solver, "solve"):
+        x = lin_solver.solve(A, b)
     else:
         x = spsolve(A, b)
 
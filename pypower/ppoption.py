@@ -10,7 +10,9 @@ PF_OPTIONS = [
 1 - Newton's method,
 2 - Fast-Decoupled (XB version),
 3 - Fast-Decoupled (BX version),
-4 - Gauss Seidel'''),
+4 - Gauss Seidel,
+5 - Newton's method, current injection in
+rectangular coordinates'''),
 
     ('pf_tol', 1e-8, 'termination tolerance on per unit P & Q mismatch'),
 
@@ -22,6 +24,11 @@ PF_OPTIONS = [
     ('pf_max_it_gs', 1000, 'maximum number of iterations for '
      'Gauss-Seidel method'),
 
+    ('pf_gs_order', 'natural', '''update order for Gauss-Seidel method:
+'natural' - one bus at a time, PQ then PV buses,
+'redblack' - vectorized over groups of non-adjacent buses,
+'jacobi' - vectorized over all buses at once'''),
+
     ('enforce_q_lims', False, 'enforce gen reactive power limits, at '
      'expense of |V|'),
 
@@ -29,7 +36,34 @@ PF_OPTIONS = [
 False - use AC formulation & corresponding algorithm opts,
 True  - use DC formulation, ignore AC algorithm options'''),
 
-    ('pf_lin_solver_nr', '', 'linear solver for Newton update step')
+    ('pf_lin_solver_nr', '', '''linear solver for Newton update step:
+'' - SciPy spsolve,
+'pyrlu' - PyRLU,
+'splu' - SuperLU, reusing the fill-reducing ordering
+across iterations (or pass a splu_solver instance to
+reuse it across power flow runs),
+'gmres', 'bicgstab' - Newton-Krylov, preconditioned by an
+incomplete LU of the first Jacobian reused across iterations
+(or pass a krylov_solver instance to reuse it across runs, or
+to use the fast-decoupled B prime and B double prime factors)'''),
+
+    ('pf_fd_factors', None, '''factors of B prime and B double prime for
+fast-decoupled methods: None - factored for each power flow
+run and reused across Q limit iterations, or an
+fdpf_factors instance to reuse them across runs'''),
+
+    ('pf_nr_iwamoto', False, '''scale the steps of Newton's method by
+Iwamoto's optimal multiplier'''),
+
+    ('pf_nr_div_it', 0, '''stop Newton's method early when diverging:
+0 - never,
+n - when the mismatch grows (or, with PF_NR_IWAMOTO, the
+multiplier is below 0.01) in n consecutive iterations, the
+mismatch is not finite or above 1e10, or a PQ bus voltage
+magnitude falls below PF_NR_VMIN'''),
+
+    ('pf_nr_vmin', 0.3, 'voltage magnitude (p.u.) below which Newton\'s '
+     'method stops, when PF_NR_DIV_IT > 0')
 ]
 
 CPF_OPTIONS = [
@@ -172,7 +206,12 @@ Primal-Dual Interior Points Methods'''),
     ('pdipm_max_it',  150, '''maximum number of iterations for
 Primal-Dual Interior Points Methods'''),
     ('scpdipm_red_it', 20, '''maximum number of reductions per iteration
-for Step-Control Primal-Dual Interior Points Methods''')
+for Step-Control Primal-Dual Interior Points Methods'''),
+    ('pdipm_warm_start', None, '''warm start for the PIPS AC OPF solver:
+None - start from the midpoint of the variable bounds,
+or the results of a previous OPF of the same system,
+whose solution and multipliers are used as the
+starting point''')
 ]
 
 GUROBI_OPTIONS = [
@@ -0,0 +1,106 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""DC PTDF matrix with rows computed on demand.
+"""
+
+from collections import OrderedDict
+
+from numpy import zeros, arange, isscalar, dot, atleast_1d, flatnonzero as find
+
+from scipy.sparse.linalg import splu
+
+from pypower.idx_bus import BUS_TYPE, REF
+from pypower.makeBdc import makeBdc
+
+
+class ptdf(object):
+    """DC PTDF matrix with rows computed on demand.
+
+    Factors the reduced C{Bbus} once and computes rows of the PTDF matrix
+    of L{makePTDF} (the sensitivities of the flow in one branch to the
+    injections at all buses) only when they are requested, keeping the
+    C{maxsize} most recently used rows in a cache. The C{slack} argument
+    is as for L{makePTDF}.
+
+    Example::
+
+        H = ptdf(baseMVA, bus, branch)
+        h = H[k]                ## row for branch k
+        Hm = H[monitored]       ## rows for a list of branches
+
+    @see: L{makePTDF}
+    """
+
+    def __init__(self, baseMVA, bus, branch, slack=None, maxsize=1024):
+        ## use reference bus for slack by default
+        if slack is None:
+            slack = find(bus[:, BUS_TYPE] == REF)[0]
+        slack_bus = slack if isscalar(slack) else 0
+
+        nb = bus.shape[0]
+        noref = arange(1, nb)
+        noslack = find(arange(nb) != slack_bus)
+
+        Bbus, Bf, _, _ = makeBdc(baseMVA, bus, branch)
+
+        #: factorization of C{Bbus[noslack, noref]}
+        self.lu = splu(Bbus[noslack, :][:, noref].tocsc())
+        #: C{Bf[:, noref]} (CSR)
+        self.Bf = Bf[:, noref].tocsr()
+        self.noslack = noslack
+        self.slack = slack
+        #: flows for the slack distribution of a vector of weights
+        self.v = None
+        if not isscalar(slack) and len(slack.shape) == 1:
+            slack = slack / sum(slack)
+            self.v = self.Bf * self.lu.solve(slack[noslack])
+        self.shape = (Bf.shape[0], nb)
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+
+    def __getitem__(self, k):
+        """Returns row C{k}, or the rows for a list of branches C{k}.
+        """
+        if isscalar(k):
+            return self.rows([k])[0]
+        return self.rows(k)
+
+    def rows(self, idx):
+        """Returns the rows of the PTDF matrix for the branches C{idx}.
+        """
+        idx = atleast_1d(idx)
+        cache = self.cache
+        new = [k for k in dict.fromkeys(idx.tolist()) if k not in cache]
+        if len(new):
+            Hn = self._compute(new)
+            for k, h in zip(new, Hn):
+                cache[k] = h
+                if len(cache) > self.maxsize:
+                    cache.popitem(last=False)
+        else:
+            Hn = None
+
+        H = zeros((len(idx), self.shape[1]))
+        for n, k in enumerate(idx.tolist()):
+            if k in cache:
+                cache.move_to_end(k)
+                H[n] = cache[k]
+            else:   ## already evicted, when more rows than maxsize
+                H[n] = Hn[new.index(k)]
+
+        return H
+
+    def _compute(self, idx):
+        """Computes the rows of the PTDF matrix for the branches C{idx}.
+        """
+        H = zeros((len(idx), self.shape[1]))
+        H[:, self.noslack] = self.lu.solve(self.Bf[idx, :].T.toarray(),
+                                           trans='T').T
+        if self.v is not None:
+            H = H - self.v[idx][:, None]
+        elif not isscalar(self.slack):
+            H = dot(H, self.slack)
+
+        return H
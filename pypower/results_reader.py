@@ -0,0 +1,93 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Reads the results written by a L{results_writer}.
+"""
+
+from os.path import join
+
+from numpy import concatenate, flatnonzero as find, load, zeros
+
+from pypower.results_writer import TABLES, SNAPSHOT, chunk_files
+
+
+class results_reader(object):
+    """Reads the results written by a L{results_writer}.
+
+    Reads the chunks of results stored in the directory C{path}, memory-
+    mapping the C{.npy} file of each chunk, so only the data which is used
+    is read. The chunks are listed each time they are read, so the results
+    of a series of runs can be read while they are written.
+
+    Example::
+
+        r = results_reader('results')
+        Vm = r.column('bus', VM)        ## nsnap x nb
+        for snap, chunk in r.iter_chunks():
+            Pg = chunk['gen'][r.col('gen', PG)]  ## k x ng
+            ...
+
+    @see: L{results_writer}
+    """
+
+    def __init__(self, path):
+        #: directory of the results
+        self.path = path
+        with load(join(path, 'index.npz')) as d:
+            #: stored columns of each table
+            self.columns = dict((t, d[t]) for t in TABLES)
+            #: number of rows of each table
+            self.nrows = dict((t, int(n)) for t, n in zip(TABLES, d['nrows']))
+
+    def __len__(self):
+        return sum(len(self._load('snapshot', f)) for f in self._files())
+
+    def col(self, table, column):
+        """Returns the position of the column C{column} of the table
+        C{table} ('bus', 'gen' or 'branch') in the stored chunks.
+        """
+        i = find(self.columns[table] == column)
+        if len(i) == 0:
+            raise ValueError('results_reader: column %d of %s is not '
+                             'stored' % (column, table))
+        return i[0]
+
+    def iter_chunks(self):
+        """Yields C{(snap, chunk)} for each complete chunk, in order.
+
+        C{snap} is the record array of the scalar data of the snapshots in
+        the chunk (see L{SNAPSHOT}) and C{chunk} a dict with the
+        memory-mapped C{ncols x k x n} array of each table.
+        """
+        for f in self._files():
+            yield self._load('snapshot', f), \
+                dict((t, self._load(t, f)) for t in TABLES)
+
+    def column(self, table, column):
+        """Returns the C{nsnap x n} values of a column of a table over all
+        snapshots.
+        """
+        i = self.col(table, column)
+        data = [self._load(table, f)[i] for f in self._files()]
+        if len(data) == 0:
+            return zeros((0, self.nrows[table]))
+        return concatenate(data)
+
+    def snapshots(self):
+        """Returns the record array of the scalar data of all snapshots.
+        """
+        data = [self._load('snapshot', f) for f in self._files()]
+        if len(data) == 0:
+            return zeros(0, SNAPSHOT)
+        return concatenate(data)
+
+    def _files(self):
+        """Returns the names of the complete chunk files.
+        """
+        return chunk_files(join(self.path, 'snapshot'))
+
+    def _load(self, table, f):
+        """Returns the memory-mapped chunk C{f} of C{table}.
+        """
+        return load(join(self.path, table, f), mmap_mode='r')
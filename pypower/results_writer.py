@@ -0,0 +1,178 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Writes the results of a series of runs in columnar chunks.
+"""
+
+from os import listdir, makedirs, replace
+from os.path import join, exists, isdir
+
+from numpy import array, asarray, array_equal, zeros, load, save, savez
+
+from pypower.idx_bus import VM, VA, LAM_P, LAM_Q
+from pypower.idx_gen import PG, QG
+from pypower.idx_brch import PF, QF, PT, QT
+
+
+#: tables of the results which are stored
+TABLES = ['bus', 'gen', 'branch']
+
+#: default columns stored for each table
+COLUMNS = {
+    'bus': [VM, VA, LAM_P, LAM_Q],
+    'gen': [PG, QG],
+    'branch': [PF, QF, PT, QT]
+}
+
+#: dtype of the scalar data stored for each snapshot
+SNAPSHOT = [
+    ('label', float),   ## label given to append, e.g. the hour of the run
+    ('success', bool),  ## success flag of the run
+    ('f', float),       ## objective function value (OPF), nan otherwise
+    ('et', float)       ## elapsed time of the run, in seconds
+]
+
+
+class results_writer(object):
+    """Writes the results of a series of runs in columnar chunks.
+
+    Stores selected columns of the C{bus}, C{gen} and C{branch} matrices
+    of a series of results (snapshots) with the same dimensions, e.g. the
+    runs of a time-series study, in the directory C{path}. The columns are
+    given by C{columns}, a dict with a list of column indices for each
+    table (default L{COLUMNS}), where columns beyond the width of a matrix
+    are stored as zeros, and the C{label}, C{success}, C{f} and
+    C{et} of each snapshot are stored as given by L{SNAPSHOT}.
+
+    Snapshots are buffered in memory and written every C{chunksize}
+    snapshots, and by L{flush} and L{close}, as one C{.npy} file per table
+    and chunk, named by the chunk number, in a subdirectory for each table
+    (and C{snapshot}). The array of a chunk of C{k} snapshots of a table
+    of C{n} rows has shape C{(ncols, k, n)}, so each column is contiguous.
+    Chunk files are written under a temporary name and then renamed, so a
+    L{results_reader} only sees complete chunks, and can read the results
+    while they are written.
+
+    If C{path} already contains results with the same columns, new
+    snapshots are appended to them.
+
+    Example::
+
+        with results_writer('results') as w:
+            for hour, Pd in enumerate(profile):
+                ppc['bus'][:, PD] = Pd
+                results, success = runpf(ppc, ppopt)
+                w.append(results, hour)
+
+    @see: L{results_reader}
+    """
+
+    def __init__(self, path, columns=None, chunksize=256):
+        if columns is None:
+            columns = COLUMNS
+        #: directory of the results
+        self.path = path
+        #: stored columns of each table
+        self.columns = dict((t, asarray(columns[t], int)) for t in TABLES)
+        #: number of snapshots of each chunk
+        self.chunksize = chunksize
+        #: number of rows of each table, set by the first snapshot
+        self.nrows = None
+        #: number of the next chunk to write
+        self.chunk = 0
+        #: number of snapshots
+        self.nsnap = 0
+        #: buffers of the current chunk and number of snapshots in them
+        self.buf, self.snap, self.k = None, None, 0
+
+        index = join(path, 'index.npz')
+        if exists(index):
+            with load(index) as d:
+                for t in TABLES:
+                    if not array_equal(d[t], self.columns[t]):
+                        raise ValueError('results_writer: %s contains '
+                                         'results with other columns' % path)
+                self.nrows = dict((t, int(n)) for t, n in
+                                  zip(TABLES, d['nrows']))
+            snapdir = join(path, 'snapshot')
+            files = chunk_files(snapdir)
+            self.chunk = len(files)
+            self.nsnap = sum(load(join(snapdir, f), mmap_mode='r').shape[0]
+                             for f in files)
+        else:
+            for t in TABLES + ['snapshot']:
+                if not isdir(join(path, t)):
+                    makedirs(join(path, t))
+
+    def append(self, results, label=None):
+        """Adds the results of a run as a snapshot.
+
+        C{label} (default is the number of the snapshot) is stored with
+        the snapshot.
+        """
+        if self.nrows is None:
+            self.nrows = dict((t, results[t].shape[0]) for t in TABLES)
+            savez(join(self.path, 'index.npz'),
+                  nrows=array([self.nrows[t] for t in TABLES]),
+                  **self.columns)
+        if self.buf is None:
+            self.buf = dict((t, zeros((len(self.columns[t]), self.chunksize,
+                                       self.nrows[t]))) for t in TABLES)
+            self.snap = zeros(self.chunksize, SNAPSHOT)
+
+        for t in TABLES:
+            data = results[t]
+            if data.shape[0] != self.nrows[t]:
+                raise ValueError('results_writer: the %s matrix has %d rows, '
+                                 'expected %d' %
+                                 (t, data.shape[0], self.nrows[t]))
+            c = self.columns[t]
+            j = c < data.shape[1]
+            self.buf[t][j, self.k, :] = data[:, c[j]].T
+            self.buf[t][~j, self.k, :] = 0
+
+        if label is None:
+            label = self.nsnap
+        self.snap[self.k] = (label, results.get('success', True),
+                             results.get('f', float('nan')),
+                             results.get('et', float('nan')))
+        self.k += 1
+        self.nsnap += 1
+
+        if self.k == self.chunksize:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered snapshots as a chunk.
+        """
+        if self.k == 0:
+            return
+        name = '%06d.npy' % self.chunk
+        for t in TABLES + ['snapshot']:
+            data = self.snap if t == 'snapshot' else self.buf[t]
+            fname = join(self.path, t, name)
+            with open(fname + '.tmp', 'wb') as fd:
+                save(fd, data[:self.k] if t == 'snapshot'
+                     else data[:, :self.k, :])
+            replace(fname + '.tmp', fname)
+        self.chunk += 1
+        self.k = 0
+
+    def close(self):
+        """Writes the buffered snapshots.
+        """
+        self.flush()
+        self.buf, self.snap = None, None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def chunk_files(path):
+    """Returns the sorted names of the chunk files in C{path}.
+    """
+    return sorted(f for f in listdir(path) if f.endswith('.npy'))
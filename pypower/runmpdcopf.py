@@ -0,0 +1,198 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Runs a multi-period DC optimal power flow with ramping limits.
+"""
+
+from sys import stdout
+
+from time import time
+
+from numpy import array, atleast_2d, zeros, ones, arange, tile, any, isnan, \
+    isfinite, broadcast_to, minimum, maximum, pi, r_, c_
+from numpy import flatnonzero as find
+
+from scipy.sparse import kron, identity, vstack, csr_matrix as sparse
+
+from pypower.ext2int import ext2int
+from pypower.loadcase import loadcase
+from pypower.ppoption import ppoption
+from pypower.opf_setup import opf_setup
+from pypower.dcopf_qp import dcopf_qp
+from pypower.qps_pypower import qps_pypower
+
+from pypower.idx_bus import GS, MU_VMIN
+from pypower.idx_gen import MU_QMIN, RAMP_30
+from pypower.idx_brch import MU_ANGMAX
+
+
+def runmpdcopf(casedata, Pd, ppopt=None, ramp=None, Pg0=None):
+    """Runs a multi-period DC optimal power flow with ramping limits.
+
+    Solves the DC OPF of C{casedata} for each row of C{Pd}, an C{nt x nb}
+    array of bus real power demands (MW) for C{nt} consecutive periods,
+    whose columns follow the rows of the C{bus} matrix of C{casedata}, as
+    a single QP. The model is set up once (see L{dcopf_qp}) and its blocks
+    are repeated along the diagonal of the QP for each period, with the
+    power balance constraints of each period set from its demands. The
+    periods are coupled by the ramping constraints::
+
+        -ramp <= Pg[t] - Pg[t - 1] <= ramp
+
+    where C{ramp} (MW per period) is a scalar or a vector with one value
+    for each row of the C{gen} matrix, by default twice the C{RAMP_30}
+    column (for hourly periods). Generators with a zero or infinite ramp
+    limit are not constrained. If the dispatch C{Pg0} (MW) before the first
+    period is given, it also limits the dispatch of the first period.
+
+    All other data (network, generator limits and costs, user constraints)
+    are the same for all periods. The QP is solved with L{qps_pypower},
+    with the solver selected by the C{OPF_ALG_DC} option.
+
+    Returns a dict with the following keys, where C{nb}, C{ng} and C{nl}
+    are the number of rows in the C{bus}, C{gen} and C{branch} matrices of
+    the case, with zeros for isolated buses and out-of-service generators
+    and branches:
+        - C{Va} - C{nt x nb} bus voltage angles (degrees)
+        - C{Pg} - C{nt x ng} generator real power outputs (MW)
+        - C{Pf} - C{nt x nl} branch real power flows (MW) at the "from" end
+        - C{lam_P} - C{nt x nb} Lagrange multipliers of the real power
+        balance ($/MWh)
+        - C{mu_ramp} - C{nt x ng} Lagrange multipliers of the ramping
+        constraints from the previous period ($/MW), positive when
+        ramping up is binding and negative when ramping down is binding
+        - C{cost} - objective function value for each period
+        - C{f} - total objective function value
+        - C{success} - C{True} if the solver converged
+        - C{raw} - dict with the C{x}, C{info}, C{output} and C{lmbda}
+        outputs of L{qps_pypower}
+        - C{et} - elapsed time in seconds
+
+    Example::
+
+        Pd = outer(load_profile, ppc['bus'][:, PD])
+        r = runmpdcopf(ppc, Pd, ramp=50)
+
+    @see: L{rundcopf}, L{dcopf_qp}
+    """
+    ppopt = ppoption(ppopt, PF_DC=True)
+    verbose = ppopt['VERBOSE']
+
+    Pd = atleast_2d(Pd)
+    nt = Pd.shape[0]
+
+    t0 = time()
+
+    ## read data and add zero columns for multipliers, etc if needed
+    ppc = loadcase(casedata)
+    for key, col in [('bus', MU_VMIN), ('gen', MU_QMIN),
+                     ('branch', MU_ANGMAX)]:
+        n, m = ppc[key].shape
+        if m < col + 1:
+            ppc[key] = c_[ppc[key], zeros((n, col + 1 - m))]
+
+    ## ramping limits and initial dispatch in external order
+    ng0 = ppc['gen'].shape[0]
+    if ramp is None:
+        ramp = 2 * ppc['gen'][:, RAMP_30]
+    ramp = broadcast_to(array(ramp, float), (ng0,))
+
+    ## set up the model of a single period
+    ppc = ext2int(ppc, copy=False)
+    baseMVA, bus, branch = ppc['baseMVA'], ppc['bus'], ppc['branch']
+    o = ppc['order']
+    ibus = o['bus']['status']['on']
+    igen = o['gen']['status']['on'][o['gen']['e2i']]
+    ibr = o['branch']['status']['on']
+    nb0, nl0 = o['ext']['bus'].shape[0], o['ext']['branch'].shape[0]
+    ng = len(igen)
+
+    om = opf_setup(ppc, ppopt)
+    om.build_cost_params()
+    vv, ll, _, _ = om.get_idx()
+    HH, CC, C0, A, l, u, xmin, xmax, x0, opt = dcopf_qp(om, ppopt)
+    nx, nA = len(xmin), len(l)
+    iPg = arange(vv['i1']['Pg'], vv['iN']['Pg'])
+    iVa = arange(vv['i1']['Va'], vv['iN']['Va'])
+    iPmis = arange(ll['i1']['Pmis'], ll['iN']['Pmis'])
+
+    ## power balance of each period
+    Pbusinj = om.userdata('Pbusinj')
+    ll_t = tile(l, (nt, 1))
+    uu_t = tile(u, (nt, 1))
+    ll_t[:, iPmis] = uu_t[:, iPmis] = \
+        -(Pd[:, ibus] + bus[:, GS]) / baseMVA - Pbusinj
+
+    ## bounds, with those of the first period limited by the ramp from Pg0
+    rmp = ramp[igen] / baseMVA
+    xmin_t = tile(xmin, (nt, 1))
+    xmax_t = tile(xmax, (nt, 1))
+    if Pg0 is not None:
+        Pg0 = array(Pg0, float)[igen] / baseMVA
+        lim = find((rmp > 0) & isfinite(rmp))
+        xmin_t[0, iPg[lim]] = maximum(xmin[iPg[lim]], Pg0[lim] - rmp[lim])
+        xmax_t[0, iPg[lim]] = minimum(xmax[iPg[lim]], Pg0[lim] + rmp[lim])
+
+    ## ramping constraints between consecutive periods
+    lim = find((rmp > 0) & isfinite(rmp))
+    nr = len(lim)
+    D = sparse((r_[-ones(nt - 1), ones(nt - 1)],
+                (r_[arange(nt - 1), arange(nt - 1)],
+                 r_[arange(nt - 1), arange(1, nt)])), (nt - 1, nt))
+    S = sparse((ones(nr), (arange(nr), iPg[lim])), (nr, nx))
+    Ar = kron(D, S, 'csr')
+    lr = tile(-rmp[lim], nt - 1)
+    ur = tile(rmp[lim], nt - 1)
+
+    ## stacked QP
+    HHs = kron(identity(nt), HH, 'csr')
+    CCs = tile(CC, nt)
+    As = vstack([kron(identity(nt), A, 'csr'), Ar], 'csr')
+    ls = r_[ll_t.ravel(), lr]
+    us = r_[uu_t.ravel(), ur]
+
+    x, f, info, output, lmbda = qps_pypower(HHs, CCs, As, ls, us,
+                                            xmin_t.ravel(), xmax_t.ravel(),
+                                            tile(x0, nt), opt)
+    success = (info == 1)
+
+    ## solution for each period in external order
+    X = x.reshape((nt, nx))
+    Va = zeros((nt, nb0))
+    Pg = zeros((nt, ng0))
+    Pf = zeros((nt, nl0))
+    lam_P = zeros((nt, nb0))
+    mu_ramp = zeros((nt, ng0))
+    cost = zeros(nt)
+    if not any(isnan(x)):
+        Bf = om.userdata('Bf')
+        Pfinj = om.userdata('Pfinj')
+        Va[:, ibus] = X[:, iVa] * 180 / pi
+        Pg[:, igen] = X[:, iPg] * baseMVA
+        Pf[:, ibr] = ((Bf * X[:, iVa].T).T + Pfinj) * baseMVA
+        cost = 0.5 * (HH * X.T * X.T).sum(0) + X.dot(CC) + C0
+        f = f + nt * C0
+
+    mu = (lmbda['mu_u'] - lmbda['mu_l']) / baseMVA
+    lam_P[:, ibus] = mu[:nt * nA].reshape((nt, nA))[:, iPmis]
+    mu_r = zeros((nt, ng))
+    mu_r[1:, lim] = mu[nt * nA:].reshape((nt - 1, nr))
+    if Pg0 is not None:
+        ## bound of the first period set by the ramp from Pg0
+        i = iPg[lim]
+        mu_r[0, lim] = \
+            lmbda['upper'][i] / baseMVA * (xmax_t[0, i] < xmax[i]) - \
+            lmbda['lower'][i] / baseMVA * (xmin_t[0, i] > xmin[i])
+    mu_ramp[:, igen] = mu_r
+
+    et = time() - t0
+    if verbose:
+        stdout.write('Multi-period DC OPF of %d periods %s '
+                     '(%.2f seconds).\n' %
+                     (nt, 'converged' if success else 'did not converge', et))
+
+    return {'Va': Va, 'Pg': Pg, 'Pf': Pf, 'lam_P': lam_P,
+            'mu_ramp': mu_ramp, 'cost': cost, 'f': f, 'success': success,
+            'raw': {'x': x, 'info': info, 'output': output, 'lmbda': lmbda},
+            'et': et}
@@ -24,9 +24,11 @@ from pypower.makeSbus import makeSbus
 from pypower.dcpf import dcpf
 from pypower.makeYbus import makeYbus
 from pypower.newtonpf import newtonpf
+from pypower.newtonpf_I_cart import newtonpf_I_cart
 from pypower.fdpf import fdpf
 from pypower.gausspf import gausspf
-from pypower.makeB import makeB
+from pypower.fdpf_factors import fdpf_factors
+from pypower.pplinsolve import krylov_solver
 from pypower.pfsoln import pfsoln
 from pypower.printpf import printpf
 from pypower.savecase import savecase
@@ -91,7 +93,7 @@ def runpf(casedata=None, ppopt=None, fname='', solvedcase=''):
                                   QT - ppc["branch"].shape[1] + 1))]
 
     ## convert to internal indexing
-    ppc = ext2int(ppc)
+    ppc = ext2int(ppc, copy=False)
     baseMVA, bus, gen, branch = \
         ppc["baseMVA"], ppc["bus"], ppc["gen"], ppc["branch"]
 
@@ -153,6 +155,8 @@ def runpf(casedata=None, ppopt=None, fname='', solvedcase=''):
                 solver = 'fast-decoupled, BX'
             elif alg == 4:
                 solver = 'Gauss-Seidel'
+            elif alg == 5:
+                solver = 'Newton, current injection, cartesian'
             else:
                 solver = 'unknown'
             print(' -- AC Power Flow (%s)\n' % solver)
@@ -174,6 +178,11 @@ def runpf(casedata=None, ppopt=None, fname='', solvedcase=''):
         ## build admittance matrices
         Ybus, Yf, Yt = makeYbus(baseMVA, bus, branch)
 
+        ## factors of FDPF matrices, reused across Q limit iterations
+        fd = ppopt['PF_FD_FACTORS']
+        if fd is None:
+            fd = fdpf_factors()
+
         repeat = True
         while repeat:
             ## compute complex bus power injections [generation - load]
@@ -182,12 +191,20 @@ def runpf(casedata=None, ppopt=None, fname='', solvedcase=''):
             ## run the power flow
             alg = ppopt["PF_ALG"]
             if alg == 1:
+                lin_solver = ppopt['PF_LIN_SOLVER_NR']
+                if isinstance(lin_solver, krylov_solver) and \
+                        lin_solver.precond == 'fdpf':
+                    lin_solver.set_fdpf(baseMVA, bus, branch, pv, pq)
                 V, success, _ = newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppopt)
             elif alg == 2 or alg == 3:
-                Bp, Bpp = makeB(baseMVA, bus, branch, alg)
-                V, success, _ = fdpf(Ybus, Sbus, V0, Bp, Bpp, ref, pv, pq, ppopt)
+                factors = fd.factor(baseMVA, bus, branch, alg, pv, pq)
+                V, success, _ = fdpf(Ybus, Sbus, V0, fd.Bp, fd.Bpp, ref, pv,
+                                     pq, ppopt, factors)
             elif alg == 4:
                 V, success, _ = gausspf(Ybus, Sbus, V0, ref, pv, pq, ppopt)
+            elif alg == 5:
+                V, success, _ = newtonpf_I_cart(Ybus, Sbus, V0, ref, pv, pq,
+                                                ppopt)
             else:
                 stderr.write('Only Newton''s method, fast-decoupled, and '
                              'Gauss-Seidel power flow algorithms currently '
@@ -208,10 +225,12 @@ def runpf(casedata=None, ppopt=None, fname='', solvedcase=''):
                 if len(mx) > 0 or len(mn) > 0:  ## we have some Q limit violations
                     # first check for INFEASIBILITY (all remaining gens violating)
                     infeas = union1d(mx, mn)
-                    remaining = find( gen_status & 
-                                     (bus[gen[:, GEN_BUS], BUS_TYPE] == PV | 
-                                      bus[gen[:, GEN_BUS], BUS_TYPE] == REF))
-                    if len(infeas) == len(remaining) or all(infeas == remaining):
+                    gen_bus_type = bus[gen[:, GEN_BUS].astype(int), BUS_TYPE]
+                    remaining = find( gen_status &
+                                     ((gen_bus_type == PV) |
+                                      (gen_bus_type == REF)))
+                    if len(infeas) == len(remaining) and \
+                            all(infeas == remaining):
                         if verbose:
                             print('All %d remaining gens exceed to their Q limits: INFEASIBLE PROBLEM\n' % len(infeas))
                         
@@ -249,7 +268,9 @@ def runpf(casedata=None, ppopt=None, fname='', solvedcase=''):
                         bi = gen[mx[i], GEN_BUS].astype(int)   ## adjust load accordingly,
                         bus[bi, [PD, QD]] = (bus[bi, [PD, QD]] - gen[mx[i], [PG, QG]])
                     
-                    if len(ref) > 1 and any(bus[gen[mx, GEN_BUS], BUS_TYPE] == REF):
+                    if len(ref) > 1 and \
+                            any(bus[gen[mx, GEN_BUS].astype(int),
+                                    BUS_TYPE] == REF):
                         raise ValueError('Sorry, PYPOWER cannot enforce Q '
                                          'limits for slack buses in systems '
                                          'with multiple slacks.')
@@ -279,7 +300,7 @@ def runpf(casedata=None, ppopt=None, fname='', solvedcase=''):
             ## restore injections from limited gens [those at Q limits]
             gen[limited, QG] = fixedQg[limited]    ## restore Qg value,
             for i in range(len(limited)):               ## [one at a time, since they may be at same bus]
-                bi = gen[limited[i], GEN_BUS]           ## re-adjust load,
+                bi = gen[limited[i], GEN_BUS].astype(int)   ## re-adjust load,
                 bus[bi, [PD, QD]] = bus[bi, [PD, QD]] + gen[limited[i], [PG, QG]]
                 gen[limited[i], GEN_STATUS] = 1           ## and turn gen back on
             
@@ -293,7 +314,7 @@ def runpf(casedata=None, ppopt=None, fname='', solvedcase=''):
     ##-----  output results  -----
     ## convert back to original bus numbering & print results
     ppc["bus"], ppc["gen"], ppc["branch"] = bus, gen, branch
-    results = int2ext(ppc)
+    results = int2ext(ppc, copy=False)
 
     ## zero out result fields of out-of-service gens & branches
     if len(results["order"]["gen"]["status"]["off"]) > 0:
@@ -0,0 +1,136 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Runs a batch of AC power flows on a fixed network.
+"""
+
+from sys import stdout
+
+from time import time
+
+from numpy import atleast_2d, zeros, ones, exp, pi, conj
+from numpy import flatnonzero as find
+
+from pypower.bustypes import bustypes
+from pypower.ext2int import ext2int
+from pypower.loadcase import loadcase
+from pypower.ppoption import ppoption
+from pypower.makeYbus import makeYbus
+from pypower.newtonpf import newtonpf
+from pypower.pfjac import pfjac
+from pypower.pplinsolve import splu_solver, krylov_solver
+
+from pypower.idx_bus import VM, VA
+from pypower.idx_brch import F_BUS, T_BUS
+from pypower.idx_gen import GEN_BUS, GEN_STATUS, VG
+
+
+def runpf_batch(casedata, Sbus, ppopt=None):
+    """Runs a batch of AC power flows on a fixed network.
+
+    Solves one Newton power flow for each row of C{Sbus}, an
+    C{nscen x nb} array of complex bus power injections (generation minus
+    load) in per unit, whose columns follow the rows of the C{bus} matrix
+    of C{casedata}. A 1-D C{Sbus} is treated as a single scenario.
+
+    The case is loaded and converted to internal indexing once, and the
+    admittance matrices, bus types, initial voltages and the sparsity
+    pattern of the Jacobian (see L{pfjac}) are shared by all scenarios.
+    Unless C{PF_LIN_SOLVER_NR} selects another solver, a single
+    L{splu_solver} is also shared so the ordering of the Jacobian is
+    computed only once. Likewise, with C{'gmres'} or C{'bicgstab'} a single
+    L{krylov_solver} shares its preconditioner across scenarios. Each
+    scenario starts from the voltages of the case, with generator voltage
+    set points applied. Generator reactive power limits are not enforced.
+
+    Returns a dict with the following keys, where C{nl} is the number of
+    rows in the C{branch} matrix of the case:
+        - C{V} - C{nscen x nb} complex bus voltages, zero at isolated buses
+        - C{Sf} - C{nscen x nl} complex power (MVA) injected at the "from"
+        end of each branch, zero for out-of-service branches
+        - C{St} - C{nscen x nl} complex power (MVA) injected at the "to"
+        end of each branch, zero for out-of-service branches
+        - C{success} - boolean convergence flag for each scenario
+        - C{iterations} - number of Newton iterations for each scenario
+        - C{reason} - reason for which the Newton iterations stopped for
+        each scenario, one of the C{NR_*} codes of L{newtonpf}
+        - C{et} - elapsed time in seconds
+
+    Example::
+
+        Sbus = tile(makeSbus(baseMVA, bus, gen), (96, 1)) * load_profile
+        r = runpf_batch(ppc, Sbus)
+
+    @see: L{runpf}, L{newtonpf}
+    """
+    ppopt = ppoption(ppopt)
+    verbose = ppopt['VERBOSE']
+    lin_solver = ppopt['PF_LIN_SOLVER_NR']
+    if lin_solver in ('', 'splu'):
+        lin_solver = splu_solver()
+    elif lin_solver in ('gmres', 'bicgstab'):
+        lin_solver = krylov_solver(lin_solver)
+    ppopt = ppoption(ppopt, VERBOSE=0, PF_LIN_SOLVER_NR=lin_solver)
+
+    Sbus = atleast_2d(Sbus)
+    nscen = Sbus.shape[0]
+
+    ## read data and convert to internal indexing
+    ppc = ext2int(loadcase(casedata), copy=False)
+    baseMVA, bus, gen, branch = \
+        ppc["baseMVA"], ppc["bus"], ppc["gen"], ppc["branch"]
+    ibus = ppc["order"]["bus"]["status"]["on"]
+    ibr = ppc["order"]["branch"]["status"]["on"]
+    nb0 = ppc["order"]["ext"]["bus"].shape[0]
+    nl0 = ppc["order"]["ext"]["branch"].shape[0]
+
+    t0 = time()
+
+    ## get bus index lists of each type of bus
+    ref, pv, pq = bustypes(bus, gen)
+
+    ## initial state, with generator voltage set points
+    on = find(gen[:, GEN_STATUS] > 0)
+    gbus = gen[on, GEN_BUS].astype(int)
+    V0 = bus[:, VM] * exp(1j * pi/180 * bus[:, VA])
+    vcb = ones(V0.shape)
+    vcb[pq] = 0
+    k = find(vcb[gbus])
+    V0[gbus[k]] = gen[on[k], VG] / abs(V0[gbus[k]]) * V0[gbus[k]]
+
+    ## network matrices and Jacobian pattern shared by all scenarios
+    Ybus, Yf, Yt = makeYbus(baseMVA, bus, branch)
+    jac = pfjac(Ybus, pv, pq)
+    if isinstance(lin_solver, krylov_solver) and lin_solver.precond == 'fdpf':
+        lin_solver.set_fdpf(baseMVA, bus, branch, pv, pq)
+
+    V = zeros((nscen, bus.shape[0]), complex)
+    success = zeros(nscen, bool)
+    iterations = zeros(nscen, int)
+    reason = zeros(nscen, int)
+    info = {}
+    for s in range(nscen):
+        V[s], success[s], iterations[s] = \
+            newtonpf(Ybus, Sbus[s, ibus], V0, ref, pv, pq, ppopt, jac, info)
+        reason[s] = info['reason']
+
+    ## branch flows for all scenarios
+    f = branch[:, F_BUS].astype(int)
+    t = branch[:, T_BUS].astype(int)
+    Sf = zeros((nscen, nl0), complex)
+    St = zeros((nscen, nl0), complex)
+    Sf[:, ibr] = V[:, f] * conj((Yf * V.T).T) * baseMVA
+    St[:, ibr] = V[:, t] * conj((Yt * V.T).T) * baseMVA
+
+    ## bus voltages in external bus order
+    Vext = zeros((nscen, nb0), complex)
+    Vext[:, ibus] = V
+
+    et = time() - t0
+    if verbose:
+        stdout.write('Batch power flow converged in %d of %d scenarios '
+                     '(%.2f seconds).\n' % (success.sum(), nscen, et))
+
+    return {'V': Vext, 'Sf': Sf, 'St': St, 'success': success,
+            'iterations': iterations, 'reason': reason, 'et': et}
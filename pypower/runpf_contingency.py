@@ -0,0 +1,276 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Runs an AC branch contingency analysis.
+"""
+
+from sys import stdout
+
+from time import time
+
+from os import cpu_count
+
+from concurrent.futures import ProcessPoolExecutor
+
+from numpy import array, zeros, ones, exp, pi, conj, ndarray, maximum, \
+    arange
+from numpy import flatnonzero as find
+
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from pypower.bustypes import bustypes
+from pypower.ext2int import ext2int
+from pypower.loadcase import loadcase
+from pypower.ppoption import ppoption
+from pypower.makeYbus import makeYbus
+from pypower.makeSbus import makeSbus
+from pypower.newtonpf import newtonpf
+from pypower.updateYbus import updateYbus
+
+from pypower.idx_bus import VM, VA, VMIN, VMAX
+from pypower.idx_brch import F_BUS, T_BUS, BR_STATUS, RATE_A
+from pypower.idx_gen import GEN_BUS, GEN_STATUS, VG
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:     ## Python < 3.8
+    SharedMemory = None
+
+
+#: dtype of the rows of the violation table returned by L{runpf_contingency}
+VIOLATION = [
+    ('outage', int),    ## index into the list of outages
+    ('type', 'U6'),     ## 'branch', 'vmin' or 'vmax'
+    ('index', int),     ## row of the branch or bus matrix of the case
+    ('value', float),   ## MVA flow or voltage magnitude (p.u.)
+    ('limit', float)    ## RATE_A (MVA) or VMIN / VMAX (p.u.)
+]
+
+## case data held by each worker process
+_case = {}
+
+
+def runpf_contingency(casedata, outages=None, ppopt=None, nprocs=None):
+    """Runs an AC branch contingency analysis.
+
+    Solves a Newton power flow for each outage in C{outages}, a list of
+    row indices into the C{branch} matrix of C{casedata}, or of tuples of
+    such indices for multiple simultaneous outages (e.g. N-2). By default
+    every in-service branch is taken out in turn (N-1). Each outage is
+    applied to the base case admittance matrices as a low-rank update
+    (see L{updateYbus}) and warm-started from the base case voltages.
+
+    Outages are distributed over a pool of C{nprocs} worker processes
+    (default is the number of CPUs). The bus and branch matrices, bus
+    injections and base case voltages are placed in shared memory, where
+    available, and sent to each worker once. With C{nprocs=1} the outages
+    are solved serially in the calling process.
+
+    If the base case power flow does not converge, no outage is solved
+    and all of them are marked as failed.
+
+    Outages which split the network into islands are not solved and are
+    flagged in C{islanded}. Branch flows are checked against C{RATE_A}
+    (zero means unlimited) and voltage magnitudes against C{VMIN} and
+    C{VMAX}.
+
+    Returns a dict with the following keys:
+        - C{outages} - list of tuples of outaged branch indices
+        - C{success} - boolean convergence flag for each outage
+        - C{islanded} - C{True} for outages which create islands
+        - C{iterations} - number of Newton iterations for each outage
+        - C{reason} - reason for which the Newton iterations stopped for
+        each outage, one of the C{NR_*} codes of L{newtonpf}, or zero for
+        islanded outages and when the base case did not converge
+        - C{violations} - record array of limit violations of converged
+        outages, with fields given by L{VIOLATION}
+        - C{base} - convergence flag of the base case
+        - C{et} - elapsed time in seconds
+
+    @see: L{runpf}
+    """
+    ppopt = ppoption(ppopt)
+    verbose = ppopt['VERBOSE']
+    if nprocs is None:
+        nprocs = cpu_count() or 1
+
+    t0 = time()
+
+    ## read data and convert to internal indexing
+    ppc = ext2int(loadcase(casedata), copy=False)
+    baseMVA, bus, gen, branch = \
+        ppc["baseMVA"], ppc["bus"], ppc["gen"], ppc["branch"]
+    ibus = ppc["order"]["bus"]["status"]["on"]
+    ibr = ppc["order"]["branch"]["status"]["on"]
+    nl0 = ppc["order"]["ext"]["branch"].shape[0]
+
+    ## map external branch rows to internal indices
+    br_e2i = -ones(nl0, int)
+    br_e2i[ibr] = arange(len(ibr))
+
+    ## list of outages
+    if outages is None:
+        outages = [(k,) for k in ibr]
+    else:
+        outages = [tuple(k) if isinstance(k, (tuple, list, ndarray)) else (k,)
+                   for k in outages]
+    cont = [br_e2i[list(k)] for k in outages]
+    cont = [k[k >= 0] for k in cont]    ## ignore out-of-service branches
+
+    ## solve the base case
+    ref, pv, pq = bustypes(bus, gen)
+    on = find(gen[:, GEN_STATUS] > 0)
+    gbus = gen[on, GEN_BUS].astype(int)
+    V0 = bus[:, VM] * exp(1j * pi/180 * bus[:, VA])
+    vcb = ones(V0.shape)
+    vcb[pq] = 0
+    k = find(vcb[gbus])
+    V0[gbus[k]] = gen[on[k], VG] / abs(V0[gbus[k]]) * V0[gbus[k]]
+
+    Ybus, _, _ = makeYbus(baseMVA, bus, branch)
+    Sbus = makeSbus(baseMVA, bus, gen)
+    ppopt = ppoption(ppopt, VERBOSE=0)
+    V0, base, _ = newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppopt)
+
+    ## arrays shared with the workers
+    arrays = {'bus': bus, 'branch': branch, 'V0': V0, 'Sbus': Sbus}
+    args = (baseMVA, ref, pv, pq, ppopt)
+
+    n = len(cont)
+    if not base:
+        ## no base case voltages to start from, all outages fail
+        if verbose:
+            stdout.write('Contingency analysis: base case power flow did '
+                         'not converge.\n')
+        res = [(False, False, 0, 0, [])] * n
+    elif nprocs == 1 or n < 2:
+        _init_worker(arrays, *args)
+        res = [_solve_outage(c) for c in cont]
+    else:
+        shm = []
+        try:
+            if SharedMemory is not None:
+                shared = {}
+                for name, a in arrays.items():
+                    s = SharedMemory(create=True, size=max(a.nbytes, 1))
+                    ndarray(a.shape, a.dtype, buffer=s.buf)[...] = a
+                    shared[name] = (s.name, a.shape, a.dtype.str)
+                    shm.append(s)
+                arrays = shared
+            with ProcessPoolExecutor(max_workers=nprocs,
+                                     initializer=_init_worker,
+                                     initargs=(arrays,) + args) as ex:
+                chunksize = max(1, n // (4 * nprocs))
+                res = list(ex.map(_solve_outage, cont, chunksize=chunksize))
+        finally:
+            for s in shm:
+                s.close()
+                s.unlink()
+
+    ## assemble results
+    success = zeros(n, bool)
+    islanded = zeros(n, bool)
+    iterations = zeros(n, int)
+    reason = zeros(n, int)
+    violations = []
+    for c, (converged, island, its, why, viol) in enumerate(res):
+        success[c], islanded[c], iterations[c] = converged, island, its
+        reason[c] = why
+        for kind, idx, value, limit in viol:
+            ext = ibr[idx] if kind == 'branch' else ibus[idx]
+            violations.append((c, kind, ext, value, limit))
+    violations = array(violations, dtype=VIOLATION)
+
+    et = time() - t0
+    if verbose:
+        stdout.write('Contingency analysis of %d outages: %d converged, '
+                     '%d islanded, %d violations (%.2f seconds).\n' %
+                     (n, success.sum(), islanded.sum(), len(violations), et))
+
+    return {'outages': outages, 'success': success, 'islanded': islanded,
+            'iterations': iterations, 'reason': reason,
+            'violations': violations,
+            'base': bool(base), 'et': et}
+
+
+def _init_worker(arrays, baseMVA, ref, pv, pq, ppopt):
+    """Stores the base case in the worker process.
+    """
+    _case.clear()
+    for name, a in arrays.items():
+        if isinstance(a, tuple):    ## attach to shared memory block
+            s = SharedMemory(name=a[0])
+            _case['shm_' + name] = s
+            a = ndarray(a[1], a[2], buffer=s.buf)
+        _case[name] = a
+    _case.update(baseMVA=baseMVA, ref=ref, pv=pv, pq=pq, ppopt=ppopt)
+
+    ## private copy of branch, whose status is changed for each outage,
+    ## the base case admittance matrices, updated in place for each outage,
+    ## and their pristine data, restored after each outage
+    _case['branch'] = _case['branch'].copy()
+    _case['Y'] = makeYbus(baseMVA, _case['bus'], _case['branch'])
+    for A in _case['Y']:
+        A.sum_duplicates()
+    _case['Y0'] = [A.data.copy() for A in _case['Y']]
+
+
+def _solve_outage(k):
+    """Solves the power flow with the branches C{k} out of service.
+
+    Returns the convergence and islanding flags, the number of iterations,
+    the reason for which they stopped and a list of
+    C{(type, index, value, limit)} violations, using internal indexing.
+    """
+    bus, br, V0, Sbus = \
+        _case['bus'], _case['branch'], _case['V0'], _case['Sbus']
+    baseMVA, ref, pv, pq, ppopt = _case['baseMVA'], _case['ref'], \
+        _case['pv'], _case['pq'], _case['ppopt']
+    nb = bus.shape[0]
+
+    ## check for islands
+    on = br[:, BR_STATUS] > 0
+    on[k] = False
+    on = find(on)
+    f = br[on, F_BUS].astype(int)
+    t = br[on, T_BUS].astype(int)
+    adj = csr_matrix((ones(len(on)), (f, t)), (nb, nb))
+    if connected_components(adj, directed=False)[0] > 1:
+        return False, True, 0, 0, []
+
+    ## take the branches out as a low-rank update of the base case matrices
+    status = br[k, BR_STATUS].copy()
+    Ybus, Yf, Yt, _, _ = updateYbus(br, *(_case['Y'] + (k, 0)))
+    try:
+        ## run the power flow, warm-started from the base case
+        info = {}
+        V, success, its = newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppopt,
+                                   info=info)
+        if not success:
+            return False, False, its, info['reason'], []
+
+        ## check limits
+        viol = []
+        f = br[:, F_BUS].astype(int)
+        t = br[:, T_BUS].astype(int)
+        Sf = abs(V[f] * conj(Yf * V)) * baseMVA
+        St = abs(V[t] * conj(Yt * V)) * baseMVA
+        S = maximum(Sf, St)
+        rate = br[:, RATE_A]
+        for i in find((rate > 0) & (S > rate)):
+            viol.append(('branch', i, S[i], rate[i]))
+        Vm = abs(V)
+        for i in find(Vm < bus[:, VMIN]):
+            viol.append(('vmin', i, Vm[i], bus[i, VMIN]))
+        for i in find(Vm > bus[:, VMAX]):
+            viol.append(('vmax', i, Vm[i], bus[i, VMAX]))
+    finally:
+        ## reinstate the branches, restoring the base case data rather than
+        ## adding the branches back, which would accumulate roundoff
+        br[k, BR_STATUS] = status
+        for A, data in zip(_case['Y'], _case['Y0']):
+            A.data[:] = data
+
+    return True, False, its, info['reason'], viol
@@ -9,8 +9,9 @@ from sys import stderr
 
 from os.path import basename
 
-from numpy import array, c_, r_, any
+from numpy import array, asarray, c_, r_, any, savez
 from scipy.io import savemat
+from scipy.sparse import issparse
 
 from pypower._compat import PY2
 from pypower.run_userfcn import run_userfcn
@@ -41,6 +42,13 @@ def savecase(fname, ppc, comment=None, version='2'):
     optional C{version} argument is '1' it will modify the data matrices to
     version 1 format before saving.
 
+    If C{fname} has the extension '.npz', the case is saved in binary form
+    as an uncompressed NumPy '.npz' file, with one array for each field,
+    which L{loadcase} opens memory-mapped. Nested dicts (e.g. the C{order}
+    and C{mu} fields of results) and sparse matrices are stored as several
+    arrays. Fields which are not numeric or string data (e.g. C{userfcn}
+    and C{om}) are not saved.
+
     @author: Carlos E. Murillo-Sanchez (PSERC Cornell & Universidad
     Autonoma de Manizales)
     @author: Ray Zimmerman (PSERC Cornell)
@@ -87,6 +95,9 @@ def savecase(fname, ppc, comment=None, version='2'):
             if fname[-4:] == ".mat":
                 rootname = fname[:-4]
                 extension = ".mat"
+            elif fname[-4:] == ".npz":
+                rootname = fname[:-4]
+                extension = ".npz"
 
     if not rootname:
         rootname = fname
@@ -141,6 +152,10 @@ def savecase(fname, ppc, comment=None, version='2'):
                 ppc_mat[key] = array(ppc[key])
 
         savemat(fname, ppc_mat)
+    elif extension == ".npz":   ## NumPy binary file
+        arrays = {}
+        npz_arrays(arrays, ppc)
+        savez(fname, **arrays)
     else:                       ## Python file
         try:
             fd = open(fname, writemode)
@@ -363,6 +378,32 @@ def savecase(fname, ppc, comment=None, version='2'):
     return fname
 
 
+def npz_arrays(arrays, d, prefix=''):
+    """Adds the arrays to save in a '.npz' file for the dict C{d}.
+
+    Each array is stored under the key of the field, prefixed by the keys
+    of the enclosing dicts separated by '/'. A sparse matrix is stored as
+    the C{data}, C{indices}, C{indptr} and C{shape} of its CSR form,
+    along with C{__sparse__ = 'csr'}, under its key.
+    """
+    for key, val in d.items():
+        name = prefix + str(key)
+        if isinstance(val, dict):
+            npz_arrays(arrays, val, name + '/')
+        elif issparse(val):
+            val = val.tocsr()
+            npz_arrays(arrays, {'__sparse__': 'csr', 'data': val.data,
+                                'indices': val.indices, 'indptr': val.indptr,
+                                'shape': val.shape}, name + '/')
+        elif val is not None:
+            try:
+                v = asarray(val)
+            except ValueError:      ## e.g. ragged lists
+                continue
+            if not v.dtype.hasobject:
+                arrays[name] = v
+
+
 def print_sparse(fd, varname, A):
     A = A.tocoo()
     i, j, s = A.row, A.col, A.data
@@ -0,0 +1,57 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Solves a low-rank modified system using a factorization of the original.
+"""
+
+from numpy import eye, zeros, dot, asarray
+from numpy.linalg import solve as dense_solve
+
+
+def smwsolve(solve, b, rows, M, cols):
+    """Solves a low-rank modified system using a factorization of the original.
+
+    Solves::
+
+        (A + E_r * M * E_c.T) * x = b
+
+    where C{E_r} and C{E_c} are the columns C{rows} and C{cols} of the
+    identity matrix, using the Sherman-Morrison-Woodbury formula::
+
+        Z = A^-1 * E_r
+        x = A^-1 * b - Z * (I + M * E_c.T * Z)^-1 * M * E_c.T * A^-1 * b
+
+    C{solve} is a function returning C{A^-1 * B} for a vector or matrix
+    C{B}, such as the C{solve} method of a factorization from
+    C{scipy.sparse.linalg.splu}. Each call does two solves with the
+    existing factors (one with C{len(rows)} right-hand sides) and one
+    dense solve of size C{len(rows)}, so the modified matrix is never
+    formed or factored. Raises C{numpy.linalg.LinAlgError} if the
+    modified matrix is singular, e.g. for a branch outage which islands
+    part of the network.
+
+    Example::
+
+        lu = splu(Ybus.tocsc())              ## base case factorization
+        Ybus, Yf, Yt, idx, dY = updateYbus(branch, Ybus, Yf, Yt, k)
+        x = smwsolve(lu.solve, b, idx, dY, idx)   ## x = Ybus^-1 * b
+
+    @see: L{updateYbus}, L{pfjac.dJ}
+    """
+    M = asarray(M)
+    n = len(b)
+    r = len(rows)
+
+    y = solve(b)
+    if r == 0:
+        return y
+
+    Er = zeros((n, r))
+    Er[rows, range(r)] = 1
+    Z = solve(Er).reshape(n, r)
+
+    S = eye(r) + dot(M, Z[cols, :])
+    w = dense_solve(S, dot(M, y[cols]))
+
+    return y - dot(Z, w)
@@ -0,0 +1,77 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for C{dcscreen}.
+"""
+
+from numpy import argsort, array_equal, isin, sort
+
+from pypower.ppoption import ppoption
+from pypower.rundcpf import rundcpf
+from pypower.dcscreen import dcscreen
+from pypower.case30 import case30
+
+from pypower.idx_brch import BR_STATUS, PF, RATE_A
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_dcscreen(quiet=False):
+    """Tests for C{dcscreen}.
+    """
+    t_begin(13, quiet)
+
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0)
+    ppc = case30()
+    r0, _ = rundcpf(ppc, ppopt)
+    ppc['branch'][:, RATE_A] = abs(r0['branch'][:, PF]) * 1.2 + 1
+
+    r = dcscreen(ppc, topk=3, ppopt=ppopt)
+    t_ok(array_equal(r['islanded'].nonzero()[0], [12, 15, 33]), 'islanded')
+    t_is(r['F0'], r0['branch'][:, PF], 8, 'base case flows')
+
+    ## compare with DC power flows for some outages
+    for k in [0, 4, 26]:
+        c = case30()
+        c['branch'][k, BR_STATUS] = 0
+        rk, _ = rundcpf(c, ppopt)
+        F = rk['branch'][:, PF]
+        load = abs(F) / ppc['branch'][:, RATE_A]
+        top = argsort(-load)[:3]
+        top = top[load[top] > 1]
+        o = r['overloads'][r['overloads']['outage'] == k]
+        t_ok(array_equal(o['branch'], top), 'outage %d : overloads' % k)
+        t_is(o['flow'], F[top], 8, 'outage %d : flows' % k)
+
+    ## chunks, threads and subsets
+    r2 = dcscreen(ppc, topk=3, ppopt=ppopt, chunksize=7, nthreads=2)
+    t_ok(array_equal(r2['overloads'][['outage', 'branch']],
+                     r['overloads'][['outage', 'branch']]), 'chunks')
+
+    nl = ppc['branch'].shape[0]
+    ra = dcscreen(ppc, topk=nl, ppopt=ppopt)
+    outages = [26, 4, 12, 0, 15]
+    monitored = [0, 1, 2, 5, 6, 9, 20, 25, 35]
+    rs = dcscreen(ppc, outages, monitored, topk=nl, ppopt=ppopt,
+                  chunksize=2, nthreads=2)
+    o = ra['overloads']
+    o = o[isin(o['outage'], outages) & isin(o['branch'], monitored)]
+    t_ok(len(rs['overloads']) > 0, 'subsets : overloads found')
+    t_ok(array_equal(sort(rs['overloads'], order=['outage', 'branch']),
+                     sort(o, order=['outage', 'branch'])), 'subsets')
+    t_ok(array_equal(rs['islanded'], r['islanded'][outages]),
+         'subsets : islanded')
+
+    rs = dcscreen(ppc, outages, [], ppopt=ppopt)
+    t_ok(array_equal(rs['islanded'], r['islanded'][outages]) and
+         len(rs['overloads']) == 0, 'no monitored branches : islanded')
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_dcscreen(quiet=False)
@@ -0,0 +1,65 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests C{ext2int} and C{int2ext} without copy.
+"""
+
+from copy import deepcopy
+
+from numpy import shares_memory
+
+from pypower.loadcase import loadcase
+from pypower.ext2int import ext2int
+from pypower.int2ext import int2ext
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_end import t_end
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+
+from pypower.t.t_case_ext import t_case_ext
+from pypower.t.t_case_int import t_case_int
+
+
+def t_ext2int_copy(quiet=False):
+    """Tests C{ext2int} and C{int2ext} without copy.
+    """
+    fields = ['bus', 'branch', 'gen', 'gencost', 'areas', 'A', 'N']
+
+    t_begin(4 * len(fields) + 6, quiet)
+
+    ppce = loadcase(t_case_ext())
+    ppci = loadcase(t_case_int())
+    ppce0 = deepcopy(ppce)
+
+    t = 'ppc = ext2int(ppc, copy=False) : '
+    ppc = ext2int(ppce, copy=False)
+    for f in fields:
+        t_is(ppc[f], ppci[f], 12, t + f)
+    for f in fields:
+        t_is(ppce[f], ppce0[f], 12, t + 'input ' + f)
+    t_ok(ppc['order']['ext']['bus'] is ppce['bus'], t + 'ext bus shared')
+    t_ok(not shares_memory(ppc['bus'], ppce['bus']), t + 'bus not shared')
+    t_ok(ppc['order']['state'] == 'i', t + 'state')
+
+    t = 'ppc = int2ext(ppc, copy=False) : '
+    ppc1 = deepcopy(ppc)
+    ppc2 = int2ext(ppc, copy=False)
+    for f in fields:
+        t_is(ppc2[f], ppce0[f], 12, t + f)
+    for f in fields:
+        t_is(ppc[f], ppc1[f], 12, t + 'input ' + f)
+    t_ok(ppc['order']['state'] == 'i' and 'ext' in ppc['order'],
+         t + 'input order')
+    t_ok(ppc2['order']['state'] == 'e', t + 'state')
+
+    t = 'ext2int(int2ext(ppc)) : '
+    ppc3 = ext2int(ppc2, copy=False)
+    t_is(ppc3['bus'], ppci['bus'], 12, t + 'bus')
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_ext2int_copy(quiet=False)
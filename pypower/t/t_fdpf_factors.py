@@ -0,0 +1,113 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for C{fdpf_factors}.
+"""
+
+from numpy import array, ones, r_
+
+from pypower.ppoption import ppoption
+from pypower.runpf import runpf
+from pypower.ext2int import ext2int
+from pypower.bustypes import bustypes
+from pypower.fdpf_factors import fdpf_factors
+from pypower.case30 import case30
+
+from pypower.idx_bus import BUS_TYPE, PQ, PD, VM, VA, BS
+from pypower.idx_brch import BR_X
+from pypower.idx_gen import QG, QMAX
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_fdpf_factors(quiet=False):
+    """Tests for C{fdpf_factors}.
+    """
+    t_begin(18, quiet)
+
+    ppc = ext2int(case30())
+    baseMVA, bus, gen, branch = \
+        ppc['baseMVA'], ppc['bus'], ppc['gen'], ppc['branch']
+    ref, pv, pq = bustypes(bus, gen)
+
+    t = 'factor : '
+    fd = fdpf_factors()
+    lu = fd.factor(baseMVA, bus, branch, 2, pv, pq)
+    Bp, Bp_lu, Bpp_lu = fd.Bp, fd.Bp_lu, fd.Bpp_lu
+    pvpq = r_[pv, pq]
+    x = lu[0].solve(ones(len(pvpq)))
+    t_is(fd.Bp[array([pvpq]).T, pvpq] * x, ones(len(pvpq)), 12, [t, 'B prime'])
+    x = lu[1].solve(ones(len(pq)))
+    t_is(fd.Bpp[array([pq]).T, pq] * x, ones(len(pq)), 12,
+         [t, 'B double prime'])
+    fd.factor(baseMVA, bus, branch, 2, pv, pq)
+    t_ok(fd.Bp_lu is Bp_lu and fd.Bpp_lu is Bpp_lu, [t, 'same data'])
+
+    ## load change does not change the factors
+    bus2 = bus.copy()
+    bus2[:, PD] = 1.1 * bus2[:, PD]
+    bus2[:, [VM, VA]] = 0
+    fd.factor(baseMVA, bus2, branch, 2, pv, pq)
+    t_ok(fd.Bp_lu is Bp_lu and fd.Bpp_lu is Bpp_lu, [t, 'load change'])
+
+    ## PV -> PQ refactors only B double prime
+    bus2 = bus.copy()
+    bus2[pv[0], BUS_TYPE] = PQ
+    ref2, pv2, pq2 = bustypes(bus2, gen)
+    lu = fd.factor(baseMVA, bus2, branch, 2, pv2, pq2)
+    t_ok(fd.Bp_lu is Bp_lu, [t, 'bus type change : B prime'])
+    t_ok(fd.Bpp_lu is not Bpp_lu, [t, 'bus type change : B double prime'])
+    t_ok(fd.Bp is Bp, [t, 'bus type change : not rebuilt'])
+    pvpq = r_[pv2, pq2]
+    x = lu[0].solve(ones(len(pvpq)))
+    t_is(fd.Bp[array([pvpq]).T, pvpq] * x, ones(len(pvpq)), 12,
+         [t, 'bus type change : B prime solve'])
+
+    ## network changes rebuild the matrices
+    branch2 = branch.copy()
+    branch2[3, BR_X] = 2 * branch2[3, BR_X]
+    lu = fd.factor(baseMVA, bus, branch2, 2, pv, pq)
+    t_ok(fd.Bp is not Bp and fd.Bp_lu is not Bp_lu, [t, 'branch change'])
+    bus2 = bus.copy()
+    bus2[4, BS] = 10
+    Bp = fd.Bp
+    fd.factor(baseMVA, bus2, branch2, 2, pv, pq)
+    t_ok(fd.Bp is not Bp, [t, 'shunt change'])
+    Bp = fd.Bp
+    fd.factor(baseMVA, bus2, branch2, 3, pv, pq)
+    t_ok(fd.Bp is not Bp, [t, 'algorithm change'])
+
+    ## shared across runpf calls
+    for alg in [2, 3]:
+        t = 'runpf (alg = %d) : ' % alg
+        ppopt = ppoption(VERBOSE=0, OUT_ALL=0, PF_ALG=alg)
+        r0, success0 = runpf(case30(), ppopt)
+        fd = fdpf_factors()
+        ppopt = ppoption(ppopt, PF_FD_FACTORS=fd)
+        r1, success1 = runpf(case30(), ppopt)
+        Bp_lu = fd.Bp_lu
+        r2, success2 = runpf(case30(), ppopt)
+        t_ok(success1 and success2 and fd.Bp_lu is Bp_lu, [t, 'reused'])
+        t_is(r2['bus'], r0['bus'], 10, [t, 'bus'])
+
+    ## Q limits
+    t = 'runpf with Q limits : '
+    ppc = case30()
+    ppc['gen'][1, QMAX] = 20
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0, PF_ALG=2, ENFORCE_Q_LIMS=1)
+    r0, _ = runpf(ppc, ppoption(ppopt, PF_ALG=1))
+    fd = fdpf_factors()
+    r1, success = runpf(ppc, ppoption(ppopt, PF_FD_FACTORS=fd))
+    t_ok(success, [t, 'success'])
+    t_is(r1['bus'][:, [VM, VA]], r0['bus'][:, [VM, VA]], 6, [t, 'V'])
+    t_is(r1['gen'][1, QG], 20, 6, [t, 'Qg at limit'])
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_fdpf_factors(quiet=False)
@@ -5,7 +5,7 @@
 """Numerical tests of partial derivative code.
 """
 
-from numpy import ones, conj, eye, exp, pi, array
+from numpy import ones, conj, eye, exp, pi, array, hstack, r_, ix_
 
 from pypower.case30 import case30
 from pypower.ppoption import ppoption
@@ -14,6 +14,9 @@ from pypower.ext2int import ext2int1
 from pypower.runpf import runpf
 from pypower.makeYbus import makeYbus
 from pypower.dSbus_dV import dSbus_dV
+from pypower.bustypes import bustypes
+from pypower.pfjac import pfjac
+from pypower.brjac import brjac
 from pypower.dSbr_dV import dSbr_dV
 from pypower.dAbr_dV import dAbr_dV
 from pypower.dIbr_dV import dIbr_dV
@@ -24,6 +27,7 @@ from pypower.idx_brch import F_BUS, T_BUS
 from pypower.t.t_begin import t_begin
 from pypower.t.t_end import t_end
 from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
 
 
 def t_jacobian(quiet=False):
@@ -31,7 +35,7 @@ def t_jacobian(quiet=False):
 
     @author: Ray Zimmerman (PSERC Cornell)
     """
-    t_begin(28, quiet)
+    t_begin(36, quiet)
 
     ## run powerflow to get solved case
     ppopt = ppoption(VERBOSE=0, OUT_ALL=0)
@@ -80,6 +84,19 @@ def t_jacobian(quiet=False):
     t_is(dSbus_dVm_full, num_dSbus_dVm, 5, 'dSbus_dVm (full)')
     t_is(dSbus_dVa_full, num_dSbus_dVa, 5, 'dSbus_dVa (full)')
 
+    ##-----  check pfjac code  -----
+    _, pv, pq = bustypes(bus, gen)
+    pvpq = r_[pv, pq]
+    jac = pfjac(Ybus, pv, pq)
+    J = jac.update(V).todense()
+    J11 = dSbus_dVa_sp[ix_(pvpq, pvpq)].real
+    J12 = dSbus_dVm_sp[ix_(pvpq, pq)].real
+    J21 = dSbus_dVa_sp[ix_(pq, pvpq)].imag
+    J22 = dSbus_dVm_sp[ix_(pq, pq)].imag
+    npvpq = len(pvpq)
+    t_is(J[:npvpq, :], r_['1', J11, J12], 12, 'pfjac dP')
+    t_is(J[npvpq:, :], r_['1', J21, J22], 12, 'pfjac dQ')
+
     ##-----  check dSbr_dV code  -----
     ## full matrices
     dSf_dVa_full, dSf_dVm_full, dSt_dVa_full, dSt_dVm_full, _, _ = \
@@ -172,6 +189,25 @@ def t_jacobian(quiet=False):
     t_is(dIt_dVm_full, num_dIt_dVm, 5, 'dIt_dVm (full)')
     t_is(dIt_dVa_full, num_dIt_dVa, 5, 'dIt_dVa (full)')
 
+    ##-----  check brjac code  -----
+    jac = brjac(branch, Yf, Yt)
+    V2 = 0.98 * V * exp(0.01j)
+    dS = jac.dSbr(V2)
+    dI = jac.dIbr(V2)
+    t_is(hstack([A.todense() for A in dS[:4]]),
+         hstack(dSbr_dV(branch, Yf_full, Yt_full, V2)[:4]), 12,
+         'brjac dSbr')
+    t_is(r_[dS[4], dS[5]], r_[Sf, St] * 0.98**2, 12, 'brjac Sf, St')
+    t_is(hstack([A.todense() for A in dI[:4]]),
+         hstack(dIbr_dV(branch, Yf_full, Yt_full, V2)[:4]), 12,
+         'brjac dIbr')
+
+    ## data refreshed in place
+    dS2 = jac.dSbr(V)
+    t_ok(all(a is b for a, b in zip(dS2[:4], dS[:4])), 'brjac in place')
+    t_is(dS2[0].todense(), dSf_dVa_sp, 12, 'brjac dSf_dVa refreshed')
+    t_is(jac.dIbr(V)[3].todense(), dIt_dVm_sp, 12, 'brjac dIt_dVm refreshed')
+
     t_end()
 
 
@@ -7,7 +7,7 @@
 
 from os.path import dirname, join
 
-from numpy import arange, r_
+from numpy import arange, array_equal, r_, ix_, hstack
 
 from pypower.loadcase import loadcase
 from pypower.ppoption import ppoption
@@ -15,12 +15,14 @@ from pypower.rundcopf import rundcopf
 from pypower.ext2int import ext2int1
 from pypower.makePTDF import makePTDF
 from pypower.makeLODF import makeLODF
+from pypower.lodf import lodf
 from pypower.rundcpf import rundcpf
 
 from pypower.idx_brch import BR_STATUS, PF
 
 from pypower.t.t_begin import t_begin
 from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
 from pypower.t.t_end import t_end
 
 
@@ -29,7 +31,7 @@ def t_makeLODF(quiet=False):
 
     @author: Ray Zimmerman (PSERC Cornell)
     """
-    ntests = 31
+    ntests = 35
     t_begin(ntests, quiet)
 
     tdir = dirname(__file__)
@@ -71,6 +73,20 @@ def t_makeLODF(quiet=False):
 
         t_is(LODF[:, k], (F - F0) / F0[k], 6, 'LODF[:, %d]' % k)
 
+    ## columns computed on demand
+    L = lodf(baseMVA, bus, branch0)
+    mon = [0, 5, 12, 20]
+    t_is(L.columns(outages), LODF[:, outages], 8, 'lodf columns')
+    Lm = hstack([Lk for _, Lk in L.iter_columns(outages, mon, 5)])
+    t_is(Lm, LODF[ix_(mon, outages)], 8, 'lodf iter_columns')
+    island = [12, 15, 18, 20, 21, 22, 23, 33]
+    t_ok(all(L.islanding(island)) and not any(L.islanding(outages)),
+         'lodf islanding')
+    k = r_[outages[:3], island[:3]]
+    Lk, isl = L.columns_islanding(k, [])
+    t_ok(Lk.shape == (0, 6) and array_equal(isl, L.islanding(k)),
+         'lodf columns_islanding')
+
     t_end()
 
 
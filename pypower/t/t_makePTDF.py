@@ -7,7 +7,8 @@
 
 from os.path import dirname, join
 
-from numpy import ones, zeros, eye, arange, dot, matrix, flatnonzero as find
+from numpy import ones, zeros, eye, arange, dot, matrix, ix_, \
+    flatnonzero as find
 
 from scipy.sparse import csr_matrix as sparse
 
@@ -15,6 +16,7 @@ from pypower.ppoption import ppoption
 from pypower.rundcopf import rundcopf
 from pypower.ext2int import ext2int1
 from pypower.makePTDF import makePTDF
+from pypower.ptdf import ptdf
 from pypower.idx_gen import GEN_BUS, PG
 from pypower.idx_bus import PD
 from pypower.idx_brch import PF
@@ -29,7 +31,7 @@ def t_makePTDF(quiet=False):
 
     @author: Ray Zimmerman (PSERC Cornell)
     """
-    ntests = 24
+    ntests = 30
     t_begin(ntests, quiet)
 
     tdir = dirname(__file__)
@@ -100,6 +102,22 @@ def t_makePTDF(quiet=False):
     t_is(zeros(nbr),  dot(Hg, (-Pd)),  3,  'zeros == Hg  * (-Pd)')
     t_is(zeros(nbr),  dot(Hd, Pg),  3,  'zeros == Hd  * Pg')
 
+    ## subsets of rows and columns
+    ib = [1, 4, 8]
+    il = [0, 5]
+    t_is(makePTDF(baseMVA, bus, branch, 3, ib), H4[:, ib], 8, 'H4 bus_idx')
+    t_is(makePTDF(baseMVA, bus, branch, 3, branch_idx=il), H4[il, :], 8,
+         'H4 branch_idx')
+    t_is(makePTDF(baseMVA, bus, branch, Pd, ib, il), Hg[ix_(il, ib)], 8,
+         'Hg bus_idx, branch_idx')
+    t_is(makePTDF(baseMVA, bus, branch, Deq, ib), Heq[:, ib], 8,
+         'Heq bus_idx (slack matrix)')
+
+    ## rows computed on demand
+    H = ptdf(baseMVA, bus, branch, Pd, maxsize=1)
+    t_is(H[il], Hg[il, :], 8, 'ptdf rows')
+    t_is(H[5], Hg[5, :], 8, 'ptdf cached row')
+
     t_end()
 
 
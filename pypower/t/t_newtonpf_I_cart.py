@@ -0,0 +1,79 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for C{newtonpf_I_cart}.
+"""
+
+from numpy import exp, pi
+
+from pypower.ppoption import ppoption
+from pypower.runpf import runpf
+from pypower.ext2int import ext2int
+from pypower.bustypes import bustypes
+from pypower.makeYbus import makeYbus
+from pypower.makeSbus import makeSbus
+from pypower.newtonpf import newtonpf
+from pypower.newtonpf_I_cart import newtonpf_I_cart
+from pypower.case9 import case9
+from pypower.case30 import case30
+from pypower.case118 import case118
+
+from pypower.idx_bus import VM, VA
+from pypower.idx_gen import PG, QG
+from pypower.idx_brch import PF, QF, PT, QT
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_newtonpf_I_cart(quiet=False):
+    """Tests for C{newtonpf_I_cart}.
+    """
+    t_begin(22, quiet)
+
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0)
+
+    ## same solution as Newton's method in polar coordinates
+    for case, qlim in [(case9, 0), (case30, 0), (case30, 1), (case118, 1)]:
+        t = '%s (ENFORCE_Q_LIMS = %d) : ' % (case.__name__, qlim)
+        opt = ppoption(ppopt, ENFORCE_Q_LIMS=qlim)
+        r1, _ = runpf(case(), opt)
+        r5, success = runpf(case(), ppoption(opt, PF_ALG=5))
+        t_ok(success, t + 'success')
+        t_is(r5['bus'][:, [VM, VA]], r1['bus'][:, [VM, VA]], 6, t + 'V')
+        t_is(r5['gen'][:, [PG, QG]], r1['gen'][:, [PG, QG]], 4, t + 'Pg, Qg')
+        t_is(r5['branch'][:, [PF, QF, PT, QT]],
+             r1['branch'][:, [PF, QF, PT, QT]], 4, t + 'branch flows')
+
+    ## direct call
+    ppc = ext2int(case118())
+    baseMVA, bus, gen = ppc['baseMVA'], ppc['bus'], ppc['gen']
+    Ybus, _, _ = makeYbus(baseMVA, bus, ppc['branch'])
+    Sbus = makeSbus(baseMVA, bus, gen)
+    ref, pv, pq = bustypes(bus, gen)
+    V0 = bus[:, VM] * exp(1j * pi / 180 * bus[:, VA])
+    V1, _, _ = newtonpf(Ybus, Sbus, V0, ref, pv, pq, ppopt)
+    V, success, it = newtonpf_I_cart(Ybus, Sbus, V0, ref, pv, pq, ppopt)
+    t_ok(success, 'newtonpf_I_cart : success')
+    t_ok(it <= 5, 'newtonpf_I_cart : iterations')
+    t_is(V, V1, 8, 'newtonpf_I_cart : V')
+    t_is(abs(V[pv]), abs(V0[pv]), 12, 'newtonpf_I_cart : PV voltages')
+
+    ## sparse LU with the ordering reused across iterations
+    V, success, _ = newtonpf_I_cart(Ybus, Sbus, V0, ref, pv, pq,
+                                    ppoption(ppopt, PF_LIN_SOLVER_NR='splu'))
+    t_is(V, V1, 8, 'newtonpf_I_cart : splu')
+
+    ## hitting the iteration limit
+    _, success, it = newtonpf_I_cart(Ybus, Sbus, V0, ref, pv, pq,
+                                     ppoption(ppopt, PF_MAX_IT=1))
+    t_ok(not success and it == 1, 'newtonpf_I_cart : PF_MAX_IT')
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_newtonpf_I_cart(quiet=False)
@@ -0,0 +1,74 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Numerical tests of the OPF constraint Jacobians.
+"""
+
+from numpy import zeros, random, shares_memory, flatnonzero as find
+
+from pypower.case30 import case30
+from pypower.ppoption import ppoption
+from pypower.ext2int import ext2int
+from pypower.makeYbus import makeYbus
+from pypower.opf_setup import opf_setup
+from pypower.opf_consfcn import opf_consfcn
+
+from pypower.idx_brch import RATE_A
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_opf_consfcn(quiet=False):
+    """Numerical tests of the OPF constraint Jacobians.
+    """
+    t_begin(8, quiet)
+
+    ppc = ext2int(case30())
+    Ybus, Yf, Yt = makeYbus(ppc['baseMVA'], ppc['bus'], ppc['branch'])
+    il = find((ppc['branch'][:, RATE_A] != 0) &
+              (ppc['branch'][:, RATE_A] < 1e10))
+    Yf, Yt = Yf[il, :], Yt[il, :]
+    pert = 1e-8
+
+    random.seed(1)
+    for lim, name in [(0, 'S'), (1, 'P'), (2, 'I')]:
+        t = 'OPF_FLOW_LIM = %d (%s) : ' % (lim, name)
+        ppopt = ppoption(OPF_FLOW_LIM=lim)
+        om = opf_setup(ppc, ppopt)
+        vv, _, _, _ = om.get_idx()
+        x = om.getv()[0]
+        x[vv['i1']['Va']:vv['iN']['Va']] = 0.1 * random.rand(vv['N']['Va'])
+        x[vv['i1']['Vm']:vv['iN']['Vm']] = \
+            1 + 0.05 * random.rand(vv['N']['Vm'])
+        h, g, dh, dg = opf_consfcn(x, om, Ybus, Yf, Yt, ppopt, il)
+
+        ## finite differences
+        nx = len(x)
+        num_dh = zeros((nx, len(h)))
+        num_dg = zeros((nx, len(g)))
+        for j in range(nx):
+            xp = x.copy()
+            xp[j] += pert
+            hp, gp, _, _ = opf_consfcn(xp, om, Ybus, Yf, Yt, ppopt, il)
+            num_dh[j, :] = (hp - h) / pert
+            num_dg[j, :] = (gp - g) / pert
+
+        t_is(dg.toarray(), num_dg, 5, [t, 'dg'])
+        t_is(dh.toarray(), num_dh, 4, [t, 'dh'])
+
+    t = 'cached pattern : '
+    jac = om.cache['consfcn']
+    h2, g2, dh2, dg2 = opf_consfcn(x, om, Ybus, Yf, Yt, ppopt, il)
+    t_ok(om.cache['consfcn'] is jac, [t, 'reused'])
+    t_ok(shares_memory(dh2.indices, dh.indices) and
+         not shares_memory(dh2.data, dh.data), [t, 'new data, same pattern'])
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_opf_consfcn(quiet=False)
@@ -0,0 +1,91 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Numerical tests of the Hessian of the OPF Lagrangian.
+"""
+
+from numpy import zeros, random, shares_memory, flatnonzero as find
+
+from pypower.case30 import case30
+from pypower.ppoption import ppoption
+from pypower.ext2int import ext2int
+from pypower.makeYbus import makeYbus
+from pypower.opf_setup import opf_setup
+from pypower.opf_costfcn import opf_costfcn
+from pypower.opf_consfcn import opf_consfcn
+from pypower.opf_hessfcn import opf_hessfcn
+
+from pypower.idx_brch import RATE_A
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_opf_hessfcn(quiet=False):
+    """Numerical tests of the Hessian of the OPF Lagrangian.
+    """
+    t_begin(6, quiet)
+
+    ppc = ext2int(case30())
+    Ybus, Yf, Yt = makeYbus(ppc['baseMVA'], ppc['bus'], ppc['branch'])
+    il = find((ppc['branch'][:, RATE_A] != 0) &
+              (ppc['branch'][:, RATE_A] < 1e10))
+    Yf, Yt = Yf[il, :], Yt[il, :]
+    nb = ppc['bus'].shape[0]
+    cost_mult = 2.0
+    pert = 1e-6
+
+    random.seed(1)
+    for lim, name in [(0, 'S'), (1, 'P'), (2, 'I')]:
+        t = 'OPF_FLOW_LIM = %d (%s) : ' % (lim, name)
+        ppopt = ppoption(OPF_FLOW_LIM=lim)
+        om = opf_setup(ppc, ppopt)
+        om.build_cost_params()
+        vv, _, _, _ = om.get_idx()
+        x = om.getv()[0]
+        x[vv['i1']['Va']:vv['iN']['Va']] = 0.1 * random.rand(vv['N']['Va'])
+        x[vv['i1']['Vm']:vv['iN']['Vm']] = \
+            1 + 0.05 * random.rand(vv['N']['Vm'])
+        x[vv['i1']['Pg']:vv['iN']['Pg']] = random.rand(vv['N']['Pg'])
+        lmbda = {'eqnonlin': random.randn(2 * nb),
+                 'ineqnonlin': random.rand(2 * len(il))}
+        Lxx = opf_hessfcn(x, lmbda, om, Ybus, Yf, Yt, ppopt, il, cost_mult)
+
+        ## central differences of the gradient of the Lagrangian
+        def Lx(x):
+            _, df = opf_costfcn(x, om)
+            _, _, dh, dg = opf_consfcn(x, om, Ybus, Yf, Yt, ppopt, il)
+            return cost_mult * df + dg * lmbda['eqnonlin'] + \
+                dh * lmbda['ineqnonlin']
+
+        nx = len(x)
+        num_Lxx = zeros((nx, nx))
+        for j in range(nx):
+            xp = x.copy()
+            xm = x.copy()
+            xp[j] += pert / 2
+            xm[j] -= pert / 2
+            num_Lxx[:, j] = (Lx(xp) - Lx(xm)) / pert
+
+        scale = abs(num_Lxx).max()
+        t_is(Lxx.toarray() / scale, num_Lxx / scale, 6, [t, 'Lxx'])
+
+    t = 'cached pattern : '
+    hess = om.cache['hessfcn']
+    Lxx2 = opf_hessfcn(x, lmbda, om, Ybus, Yf, Yt, ppopt, il, cost_mult)
+    t_ok(om.cache['hessfcn'] is hess, [t, 'reused'])
+    t_ok(shares_memory(Lxx2.indices, Lxx.indices) and
+         not shares_memory(Lxx2.data, Lxx.data), [t, 'new data, same pattern'])
+
+    t = 'new Ybus : '
+    opf_hessfcn(x, lmbda, om, Ybus.copy(), Yf, Yt, ppopt, il, cost_mult)
+    t_ok(om.cache['hessfcn'] is not hess, [t, 'pattern rebuilt'])
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_opf_hessfcn(quiet=False)
@@ -0,0 +1,97 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for C{opf_model} linear constraints.
+"""
+
+from numpy import array, array_equal, zeros, inf, r_
+
+from scipy.sparse import csr_matrix as sparse
+
+from pypower.opf_model import opf_model
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_opf_model(quiet=False):
+    """Tests for C{opf_model} linear constraints.
+    """
+    t_begin(19, quiet)
+
+    om = opf_model({})
+    om.add_vars('Va', 3)
+    om.add_vars('Pg', 2)
+    om.add_vars('y', 1)
+
+    A1 = array([[1, 0, 2, 0, 0],
+                [0, 0, 0, 3, 0]])
+    A2 = array([[4, 5, 0],
+                [0, 0, 6]])
+    om.add_constraints('c1', sparse(A1), array([0, 0]), array([1, 1]),
+                       ['Pg', 'Va'])
+    om.add_constraints('c2', sparse(A2), array([-1, -2]), array([]),
+                       ['y', 'Pg'])
+
+    ## dense reference
+    Ad = zeros((4, 6))
+    Ad[0:2, 3:5] = A1[:, 0:2]
+    Ad[0:2, 0:3] = A1[:, 2:5]
+    Ad[2:4, 5] = A2[:, 0]
+    Ad[2:4, 3:5] = A2[:, 1:3]
+
+    t = 'linear_constraints : '
+    A, l, u = om.linear_constraints()
+    t_is(A.toarray(), Ad, 12, [t, 'A'])
+    t_is(l, [0, 0, -1, -2], 12, [t, 'l'])
+    t_ok(array_equal(u, [1, 1, inf, inf]), [t, 'u'])
+    t_ok(om.linear_constraints()[0] is A, [t, 'cached'])
+
+    t = 'update_constraints : '
+    om.update_constraints('c2', l=array([-3, -4]))
+    A2_, l2, u2 = om.linear_constraints()
+    t_ok(A2_ is A, [t, 'bounds only, A kept'])
+    t_is(l2, [0, 0, -3, -4], 12, [t, 'l'])
+    t_is(l, [0, 0, -1, -2], 12, [t, 'earlier l unchanged'])
+    om.update_constraints('c1', A=sparse(2 * A1), u=array([5, 6]))
+    A3, l3, u3 = om.linear_constraints()
+    t_ok(A3 is not A, [t, 'A rebuilt'])
+    Ad[0:2, :] = 2 * Ad[0:2, :]
+    t_is(A3.toarray(), Ad, 12, [t, 'A'])
+    t_ok(array_equal(u3, [5, 6, inf, inf]), [t, 'u'])
+    Ac1 = om.lin['data']['A']['c1']
+    om.clear_dirty()
+    om.update_constraints('c1', A=sparse(A2), l=array([7, 8]))
+    t_ok(om.lin['data']['A']['c1'] is Ac1 and
+         om.linear_constraints()[0] is A3, [t, 'wrong size, A unchanged'])
+    t_is(om.linear_constraints()[1], l3, 12, [t, 'wrong size, l unchanged'])
+    t_ok(not om.is_dirty('lin', 'c1'), [t, 'wrong size, clean'])
+
+    t = 'add_constraints : '
+    om.add_constraints('c3', sparse(array([[0, 7]])), array([1]), array([2]),
+                       ['Pg'])
+    A4, l4, u4 = om.linear_constraints()
+    t_ok(A4 is not A3, [t, 'cache cleared'])
+    t_is(A4.toarray(), r_[Ad, [[0, 0, 0, 0, 7, 0]]], 12, [t, 'A'])
+    t_is(l4, [0, 0, -3, -4, 1], 12, [t, 'l'])
+
+    t = 'add_vars : '
+    om.add_vars('z', 2)
+    A5, _, _ = om.linear_constraints()
+    t_is(A5.shape, [5, 8], 12, [t, 'size'])
+    t_is(A5.toarray()[:, :6], A4.toarray(), 12, [t, 'A'])
+
+    t = 'no constraints : '
+    om = opf_model({})
+    om.add_vars('x', 2)
+    A, l, u = om.linear_constraints()
+    t_ok(A is None and len(l) == 0 and len(u) == 0, [t, 'empty'])
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_opf_model(quiet=False)
@@ -0,0 +1,166 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for repeatedly solving an OPF problem with updated data.
+"""
+
+from os.path import dirname, join
+
+from numpy import array
+
+from pypower.case30 import case30
+from pypower.loadcase import loadcase
+from pypower.ppoption import ppoption
+from pypower.runopf import runopf
+from pypower.rundcopf import rundcopf
+from pypower.opf_problem import opf_problem
+
+from pypower.idx_bus import PD, QD, VM, VMAX
+from pypower.idx_gen import PG, QG, PMIN, PMAX, QMIN, QMAX
+from pypower.idx_brch import RATE_A
+from pypower.idx_cost import MODEL, COST
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_opf_problem(quiet=False):
+    """Tests for repeatedly solving an OPF problem with updated data.
+    """
+    t_begin(41, quiet)
+
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0)
+
+    ## AC OPF
+    t = 'AC : '
+    prob = opf_problem(case30(), ppopt)
+    r1 = prob.solve()
+    r0 = runopf(case30(), ppopt)
+    t_ok(r1['success'], [t, 'success'])
+    t_is(r1['f'], r0['f'], 6, [t, 'f'])
+    Pg1 = r1['gen'][:, PG].copy()
+    jac = prob.om.cache['consfcn']
+
+    ppc = case30()
+    ppc['bus'][:, [PD, QD]] *= 1.03
+    ppc['gen'][1, PMAX] = 50
+    ppc['gencost'][:, COST] *= 1.1
+    prob.set_load(ppc['bus'][:, PD], ppc['bus'][:, QD])
+    prob.set_gen_limits(Pmax=50, idx=[1])
+    prob.set_gencost(ppc['gencost'])
+    om = prob.om
+    t_ok(om.is_dirty('ppc', 'load'), [t, 'load dirty'])
+    t_ok(om.is_dirty('var', 'Pg') and om.is_dirty('var', 'Qg'),
+         [t, 'Pg, Qg dirty'])
+    t_ok(om.is_dirty('ppc', 'gencost'), [t, 'gencost dirty'])
+    t_ok(not om.is_dirty('var', 'Vm') and not om.is_dirty('lin'),
+         [t, 'others clean'])
+
+    r2 = prob.solve()
+    r = runopf(ppc, ppopt)
+    t_ok(r2['success'], [t, 'success'])
+    t_is(r2['f'], r['f'], 5, [t, 'f'])
+    t_is(r2['gen'][:, PG], r['gen'][:, PG], 4, [t, 'Pg'])
+    t_is(r2['bus'][:, VM], r['bus'][:, VM], 5, [t, 'Vm'])
+    t_is(r2['bus'][:, PD], ppc['bus'][:, PD], 12, [t, 'Pd in results'])
+    t_ok(len(om.dirty) == 0, [t, 'clean after solve'])
+    t_is(r1['gen'][:, PG], Pg1, 12, [t, 'previous results unchanged'])
+    t_ok(om.cache['consfcn'] is jac, [t, 'derivative patterns kept'])
+
+    t = 'AC warm start : '
+    ppc['bus'][:, VMAX] = 1.07
+    prob.set_voltage_limits(Vmax=1.07)
+    t_ok(om.is_dirty('var', 'Vm'), [t, 'Vm dirty'])
+    r3 = prob.solve(warm_start=True)
+    r = runopf(ppc, ppopt)
+    t_ok(r3['success'], [t, 'success'])
+    t_is(r3['f'] / r['f'], 1, 6, [t, 'f'])
+    t_is(r3['bus'][:, VM], r['bus'][:, VM], 4, [t, 'Vm'])
+    t_ok(r3['raw']['output']['iterations'] <
+         r['raw']['output']['iterations'], [t, 'fewer iterations'])
+
+    t = 'AC rejected change : '
+    ppc = case30()
+    ppc['gen'][1, QG] = ppc['gen'][1, PG] / 3    ## power factor of the load
+    r1 = runopf(ppc, ppopt)
+    prob = opf_problem(ppc, ppopt)
+    try:    ## gen 1 as a dispatchable load, adding a 'vl' constraint
+        prob.set_gen_limits(Pmin=-30, Pmax=0, Qmin=-10, Qmax=0, idx=[1])
+        t_ok(0, [t, 'change of dispatchable loads'])
+    except ValueError:
+        t_ok(1, [t, 'change of dispatchable loads'])
+    t_is(prob.ppc['order']['ext']['gen'][1, [PMIN, PMAX, QMIN, QMAX]],
+         ppc['gen'][1, [PMIN, PMAX, QMIN, QMAX]], 12, [t, 'gen unchanged'])
+    t_ok(not prob.om.is_dirty('var', 'Pg'), [t, 'Pg clean'])
+    r2 = prob.solve()
+    t_ok(r2['success'], [t, 'success'])
+    t_is(r2['f'] / r1['f'], 1, 6, [t, 'f'])
+    t_is(r2['gen'][:, PG], r1['gen'][:, PG], 4, [t, 'Pg'])
+
+    ## piece-wise linear costs
+    t = 'AC pwl costs : '
+    casefile = join(dirname(__file__), 't_case9_opf')
+    prob = opf_problem(casefile, ppopt)
+    prob.solve()
+    ppc = loadcase(casefile)
+    ppc['gencost'][0, COST + 5] = 6000
+    ppc['gencost'][0, COST + 7] = 8000
+    prob.set_gencost(ppc['gencost'])
+    t_ok(prob.om.is_dirty('lin', 'ycon'), [t, 'ycon dirty'])
+    r2 = prob.solve()
+    r = runopf(ppc, ppopt)
+    t_ok(r2['success'], [t, 'success'])
+    t_is(r2['f'], r['f'], 4, [t, 'f'])
+    t_is(r2['gen'][:, PG], r['gen'][:, PG], 3, [t, 'Pg'])
+
+    gencost = ppc['gencost'].copy()
+    gencost[1, MODEL] = 1
+    try:
+        prob.set_gencost(gencost)
+        t_ok(0, [t, 'different cost model'])
+    except ValueError:
+        t_ok(1, [t, 'different cost model'])
+
+    ## DC OPF
+    t = 'DC : '
+    ppopt = ppoption(ppopt, PF_DC=1)
+    prob = opf_problem(case30(), ppopt)
+    prob.solve()
+    ppc = case30()
+    ppc['bus'][:, PD] *= 1.1
+    ppc['branch'][[5, 8], RATE_A] = [50, 30]
+    prob.set_load(ppc['bus'][:, PD])
+    prob.set_branch_rating(array([50, 30]), idx=[5, 8])
+    t_ok(prob.om.is_dirty('lin', 'Pmis') and
+         prob.om.is_dirty('lin', 'Pf') and prob.om.is_dirty('lin', 'Pt'),
+         [t, 'Pmis, Pf, Pt dirty'])
+    r2 = prob.solve()
+    r = rundcopf(ppc, ppopt)
+    t_ok(r2['success'], [t, 'success'])
+    t_is(r2['f'], r['f'], 6, [t, 'f'])
+    t_is(r2['gen'][:, PG], r['gen'][:, PG], 5, [t, 'Pg'])
+    t_is(r2['branch'][:, RATE_A], ppc['branch'][:, RATE_A], 12,
+         [t, 'RATE_A in results'])
+
+    try:
+        prob.set_branch_rating(0, idx=[5])
+        t_ok(0, [t, 'change of limited branches'])
+    except ValueError:
+        t_ok(1, [t, 'change of limited branches'])
+    t_is(prob.ppc['order']['ext']['branch'][:, RATE_A],
+         ppc['branch'][:, RATE_A], 12, [t, 'RATE_A unchanged'])
+    t_ok(not prob.om.is_dirty('ppc', 'rate'), [t, 'rate clean'])
+    r3 = prob.solve()
+    t_ok(r3['success'], [t, 'success after rejected change'])
+    t_is(r3['f'], r2['f'], 6, [t, 'f after rejected change'])
+    t_is(r3['gen'][:, PG], r2['gen'][:, PG], 5,
+         [t, 'Pg after rejected change'])
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_opf_problem(quiet=False)
@@ -0,0 +1,73 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for warm starting the PIPS-based AC optimal power flow.
+"""
+
+from numpy import random
+
+from pypower.case30 import case30
+from pypower.case118 import case118
+from pypower.ppoption import ppoption
+from pypower.runopf import runopf
+
+from pypower.idx_bus import PD, QD, VM, LAM_P
+from pypower.idx_gen import PG
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_opf_warm_start(quiet=False):
+    """Tests for warm starting the PIPS-based AC optimal power flow.
+    """
+    t_begin(24, quiet)
+
+    random.seed(1)
+    for alg, name in [(560, 'PIPS'), (565, 'PIPS-sc')]:
+        ppopt = ppoption(OPF_ALG=alg, VERBOSE=0, OUT_ALL=0)
+        for case in [case30, case118]:
+            t = '%s %s : ' % (name, case.__name__)
+            r0 = runopf(case(), ppopt)
+
+            ## perturb the loads
+            ppc = case()
+            nb = ppc['bus'].shape[0]
+            ppc['bus'][:, [PD, QD]] *= 1 + 0.02 * random.randn(nb, 1)
+
+            cold = runopf(ppc, ppopt)
+            warm = runopf(ppc, ppoption(ppopt, PDIPM_WARM_START=r0))
+            t_ok(warm['success'], [t, 'success'])
+            t_is(warm['f'] / cold['f'], 1, 6, [t, 'f'])
+            t_is(warm['gen'][:, PG], cold['gen'][:, PG], 0, [t, 'Pg'])
+            t_is(warm['bus'][:, LAM_P], cold['bus'][:, LAM_P], 2,
+                 [t, 'lam_P'])
+            t_ok(warm['raw']['output']['iterations'] <
+                 cold['raw']['output']['iterations'], [t, 'fewer iterations'])
+
+    ## chained warm starts over a load profile
+    t = 'rolling dispatch : '
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0)
+    base = case30()
+    r = runopf(base, ppopt)
+    its = []
+    for scale in [1.01, 1.02, 1.015]:
+        ppc = case30()
+        ppc['bus'][:, [PD, QD]] *= scale
+        r = runopf(ppc, ppoption(ppopt, PDIPM_WARM_START=r))
+        its.append(r['raw']['output']['iterations'])
+    cold = runopf(ppc, ppopt)
+    t_ok(r['success'], [t, 'success'])
+    t_is(r['bus'][:, VM], cold['bus'][:, VM], 4, [t, 'Vm'])
+    t_is(r['f'] / cold['f'], 1, 6, [t, 'f'])
+    t_ok(max(its) < cold['raw']['output']['iterations'],
+         [t, 'fewer iterations'])
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_opf_warm_start(quiet=False)
@@ -36,7 +36,7 @@ def t_pf(quiet=False):
 
     @author: Ray Zimmerman (PSERC Cornell)
     """
-    t_begin(33, quiet)
+    t_begin(41, quiet)
 
     tdir = dirname(__file__)
     casefile = join(tdir, 't_case9_pf')
@@ -91,6 +91,18 @@ def t_pf(quiet=False):
     t_is(gen, gen_soln, 5, [t, 'gen'])
     t_is(branch, branch_soln, 5, [t, 'branch'])
 
+    ## run Gauss-Seidel PF, vectorized update orders
+    for order in ['redblack', 'jacobi']:
+        t = 'Gauss-Seidel (%s) PF : ' % order
+        ppopt = ppoption(ppopt, PF_ALG=4, PF_GS_ORDER=order)
+        results, success = runpf(casefile, ppopt)
+        bus, gen, branch = results['bus'], results['gen'], results['branch']
+        t_ok(success, [t, 'success'])
+        t_is(bus, bus_soln, 5, [t, 'bus'])
+        t_is(gen, gen_soln, 5, [t, 'gen'])
+        t_is(branch, branch_soln, 5, [t, 'branch'])
+    ppopt = ppoption(ppopt, PF_GS_ORDER='natural')
+
     ## get solved AC power flow case from MAT-file
     ## defines bus_soln, gen_soln, branch_soln
     soln9_dcpf = loadmat(join(tdir, 'soln9_dcpf.mat'), struct_as_record=False)
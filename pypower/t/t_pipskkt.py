@@ -0,0 +1,79 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for C{pipskkt}.
+"""
+
+from numpy import diag
+from numpy.random import RandomState
+
+from scipy.sparse import random as sprandom, csr_matrix, bmat
+
+from pypower.pipskkt import pipskkt
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_pipskkt(quiet=False):
+    """Tests for C{pipskkt}.
+    """
+    t_begin(9, quiet)
+
+    rs = RandomState(42)
+    nx, niq, neq = 20, 15, 5
+    L = sprandom(nx, nx, 0.2, random_state=rs)
+    Lxx = (L + L.T).tocsr()
+    dh = sprandom(nx, niq, 0.2, random_state=rs).tocsc()
+    dg = sprandom(nx, neq, 0.3, random_state=rs).tocsc()
+
+    def kkt(Lxx, dh, d, dg):
+        M = Lxx.toarray()
+        if dh is not None:
+            M = M + dh.toarray().dot(diag(d)).dot(dh.toarray().T)
+        if dg is None:
+            return M
+        return bmat([[csr_matrix(M), dg], [dg.T, None]]).toarray()
+
+    t = 'assemble : '
+    K = pipskkt()
+    d = rs.rand(niq)
+    A = K.assemble(Lxx, dh, d, dg)
+    t_is(A.toarray(), kkt(Lxx, dh, d, dg), 12, [t, 'KKT'])
+    indices = K.indices
+
+    ## new values, same patterns
+    Lxx.data = rs.rand(Lxx.nnz)
+    dh.data = rs.rand(dh.nnz)
+    dg.data = rs.rand(dg.nnz)
+    d = rs.rand(niq)
+    A = K.assemble(Lxx, dh, d, dg)
+    t_is(A.toarray(), kkt(Lxx, dh, d, dg), 12, [t, 'new values'])
+    t_ok(K.indices is indices, [t, 'pattern reused'])
+
+    ## input given as COO
+    A = K.assemble(Lxx.tocoo(), dh.tocoo(), d, dg.tocoo())
+    t_is(A.toarray(), kkt(Lxx, dh, d, dg), 12, [t, 'COO input'])
+
+    ## pattern change
+    dh2 = sprandom(nx, niq, 0.3, random_state=rs).tocsc()
+    A = K.assemble(Lxx, dh2, d, dg)
+    t_ok(K.indices is not indices, [t, 'pattern rebuilt'])
+    t_is(A.toarray(), kkt(Lxx, dh2, d, dg), 12, [t, 'changed pattern'])
+
+    ## missing blocks
+    A = pipskkt().assemble(Lxx, None, None, dg)
+    t_is(A.toarray(), kkt(Lxx, None, None, dg), 12, [t, 'no inequalities'])
+    A = pipskkt().assemble(Lxx, dh, d, None)
+    t_is(A.toarray(), kkt(Lxx, dh, d, None), 12, [t, 'no equalities'])
+    A = pipskkt().assemble(Lxx, None, None, None)
+    t_is(A.toarray(), Lxx.toarray(), 12, [t, 'Lxx only'])
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_pipskkt(quiet=False)
@@ -0,0 +1,97 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for C{pplinsolve}.
+"""
+
+from numpy import arange, ones
+from numpy.linalg import solve
+
+from scipy.sparse import random, eye
+
+from pypower.ppoption import ppoption
+from pypower.runpf import runpf
+from pypower.runpf_batch import runpf_batch
+from pypower.makeSbus import makeSbus
+from pypower.case30 import case30
+from pypower.pplinsolve import pplinsolve, splu_solver, krylov_solver
+
+from pypower.idx_bus import VM, VA
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_pplinsolve(quiet=False):
+    """Tests for C{pplinsolve}.
+    """
+    t_begin(26, quiet)
+
+    n = 40
+    A = (random(n, n, 0.1, random_state=0) + 10 * eye(n)).tocsc()
+    b = arange(n, dtype=float)
+    x = solve(A.toarray(), b)
+
+    t_is(pplinsolve(A, b), x, 12, 'spsolve')
+    t_is(pplinsolve(A, b, 'splu'), x, 12, 'splu')
+
+    solver = splu_solver()
+    t_is(solver.solve(A, b), x, 12, 'splu_solver : CSC')
+    t_is(solver.solve(A.tocsr(), b), x, 12, 'splu_solver : CSR')
+    t_is(solver.solve(A.tocsr() * 2, b), x / 2, 12,
+         'splu_solver : CSR refactor')
+
+    A2 = A.copy()
+    A2.data = A2.data * 2
+    t_is(pplinsolve(A2, b, solver), x / 2, 12, 'splu_solver : new values')
+    t_ok(solver.same_pattern(A2), 'splu_solver : pattern reused')
+    t_is(solver.solve(A, b), x, 12, 'splu_solver : CSC refactor')
+
+    A3 = (A + eye(n, k=1)).tocsc()
+    t_is(solver.solve(A3, ones(n)), solve(A3.toarray(), ones(n)), 12,
+         'splu_solver : new pattern')
+    t_ok(not solver.same_pattern(A), 'splu_solver : pattern updated')
+
+    ## Newton power flow using a shared solver
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0)
+    r0, _ = runpf(case30(), ppopt)
+    ppopt = ppoption(ppopt, PF_LIN_SOLVER_NR=splu_solver())
+    r1, success = runpf(case30(), ppopt)
+    t_ok(success, 'runpf : success')
+    t_is(r1['bus'][:, [VM, VA]], r0['bus'][:, [VM, VA]], 10, 'runpf : bus')
+
+    ## Krylov solvers
+    for method in ['gmres', 'bicgstab']:
+        t = 'krylov_solver(\'%s\') : ' % method
+        t_is(pplinsolve(A, b, method), x, 5, [t, 'pplinsolve'])
+        solver = krylov_solver(method, tol=1e-10)
+        t_is(solver.solve(A, b), x, 8, [t, 'ILU'])
+        t_is(solver.solve(A2, b), x / 2, 8, [t, 'new values'])
+        t_is(solver.nfactor, 1, 12, [t, 'preconditioner reused'])
+
+    ## Newton-Krylov power flow, sharing the preconditioner across runs
+    for precond in ['ilu', 'fdpf']:
+        t = 'runpf : Newton-Krylov (%s) : ' % precond
+        solver = krylov_solver('gmres', precond)
+        ppopt = ppoption(ppopt, PF_LIN_SOLVER_NR=solver)
+        r1, success = runpf(case30(), ppopt)
+        t_ok(success, [t, 'success'])
+        t_is(r1['bus'][:, [VM, VA]], r0['bus'][:, [VM, VA]], 8, [t, 'bus'])
+
+    ## scenarios of runpf_batch share the ILU factors of the first Jacobian
+    ppc = case30()
+    Sbus = makeSbus(ppc['baseMVA'], ppc['bus'], ppc['gen'])
+    solver = krylov_solver('bicgstab')
+    r = runpf_batch(ppc, [Sbus, 1.05 * Sbus],
+                    ppoption(ppopt, PF_LIN_SOLVER_NR=solver))
+    t_ok(all(r['success']), 'runpf_batch : Newton-Krylov : success')
+    t_is(solver.nfactor, 1, 12, 'runpf_batch : Newton-Krylov : factored once')
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_pplinsolve(quiet=False)
@@ -0,0 +1,96 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for C{results_writer} and C{results_reader}.
+"""
+
+import tempfile
+
+from shutil import rmtree
+
+from numpy import array, arange
+
+from pypower.ppoption import ppoption
+from pypower.runopf import runopf
+from pypower.results_writer import results_writer
+from pypower.results_reader import results_reader
+from pypower.case30 import case30
+
+from pypower.idx_bus import PD, VM, LAM_P
+from pypower.idx_gen import PG
+from pypower.idx_brch import PF
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_results_writer(quiet=False):
+    """Tests for C{results_writer} and C{results_reader}.
+    """
+    t_begin(14, quiet)
+
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0)
+    ppc = case30()
+    Pd0 = ppc['bus'][:, PD].copy()
+    scale = array([0.8, 0.9, 1.0, 1.05, 0.95])
+    path = tempfile.mkdtemp()
+
+    t = 'results_writer : '
+    res = []
+    w = results_writer(path, chunksize=2)
+    for h, s in enumerate(scale):
+        ppc['bus'][:, PD] = s * Pd0
+        res.append(runopf(ppc, ppopt))
+        w.append(res[-1], 10 + h)
+        if h == 2:
+            t_is(len(results_reader(path)), 2, 12, t + 'complete chunks')
+    w.close()
+
+    r = results_reader(path)
+    t_is(len(r), 5, 12, t + 'number of snapshots')
+    t_is(r.column('bus', VM), array([x['bus'][:, VM] for x in res]), 12,
+         t + 'Vm')
+    t_is(r.column('bus', LAM_P), array([x['bus'][:, LAM_P] for x in res]),
+         12, t + 'lam_P')
+    t_is(r.column('gen', PG), array([x['gen'][:, PG] for x in res]), 12,
+         t + 'Pg')
+    t_is(r.column('branch', PF), array([x['branch'][:, PF] for x in res]),
+         12, t + 'Pf')
+    snap = r.snapshots()
+    t_is(snap['label'], 10 + arange(5), 12, t + 'label')
+    t_is(snap['f'], [x['f'] for x in res], 12, t + 'f')
+    t_ok(all(snap['success'] == [x['success'] for x in res]), t + 'success')
+    t_is([c['gen'].shape[1] for _, c in r.iter_chunks()], [2, 2, 1], 12,
+         t + 'chunks')
+
+    t = 'results_writer : append : '
+    with results_writer(path, chunksize=2) as w:
+        w.append(res[0])
+    snap = results_reader(path).snapshots()
+    t_is(len(snap), 6, 12, t + 'number of snapshots')
+    t_is(snap['label'][-1], 5, 12, t + 'default label')
+
+    try:
+        results_writer(path, columns={'bus': [VM], 'gen': [PG],
+                                      'branch': [PF]})
+        t_ok(False, t + 'other columns')
+    except ValueError:
+        t_ok(True, t + 'other columns')
+    try:
+        w = results_writer(path)
+        w.append({'bus': res[0]['bus'][:-1], 'gen': res[0]['gen'],
+                  'branch': res[0]['branch']})
+        t_ok(False, t + 'other dimensions')
+    except ValueError:
+        t_ok(True, t + 'other dimensions')
+
+    rmtree(path)
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_results_writer(quiet=False)
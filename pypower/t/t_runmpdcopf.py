@@ -0,0 +1,72 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for C{runmpdcopf}.
+"""
+
+from numpy import array, outer, diff, inf
+
+from pypower.ppoption import ppoption
+from pypower.rundcopf import rundcopf
+from pypower.runmpdcopf import runmpdcopf
+from pypower.case30 import case30
+
+from pypower.idx_bus import PD, LAM_P
+from pypower.idx_gen import PG
+from pypower.idx_brch import PF
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_runmpdcopf(quiet=False):
+    """Tests for C{runmpdcopf}.
+    """
+    t_begin(24, quiet)
+
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0, OPF_ALG_DC=200)
+    ppc = case30()
+    scale = array([0.8, 1.0, 1.15, 0.9])
+    Pd = outer(scale, ppc['bus'][:, PD])
+
+    ## without ramping limits, same as one DC OPF per period
+    r = runmpdcopf(ppc, Pd, ppopt, ramp=inf)
+    t_ok(r['success'], 'no ramp limits : success')
+    t_is(r['Pg'].shape, (4, 6), 12, 'no ramp limits : Pg shape')
+    t_is(r['Pf'].shape, (4, 41), 12, 'no ramp limits : Pf shape')
+    t_is(r['f'], sum(r['cost']), 8, 'no ramp limits : f')
+    for t in range(len(scale)):
+        c = case30()
+        c['bus'][:, PD] = Pd[t]
+        r1 = rundcopf(c, ppopt)
+        t_is(r['cost'][t], r1['f'], 6, 'no ramp limits : cost %d' % t)
+        t_is(r['Pg'][t], r1['gen'][:, PG], 5, 'no ramp limits : Pg %d' % t)
+        t_is(r['lam_P'][t], r1['bus'][:, LAM_P], 5,
+             'no ramp limits : lam_P %d' % t)
+        t_is(r['Pf'][t], r1['branch'][:, PF], 5, 'no ramp limits : Pf %d' % t)
+
+    ## ramping limits, also from the dispatch before the first period
+    f0 = r['f']
+    Pg0 = 0.5 * r['Pg'][0]
+    r = runmpdcopf(ppc, Pd, ppopt, ramp=15, Pg0=Pg0)
+    t_ok(r['success'], 'ramp limits : success')
+    t_ok(max(abs(diff(r['Pg'], axis=0)).max(),
+             abs(r['Pg'][0] - Pg0).max()) <= 15 + 1e-6,
+         'ramp limits : Pg')
+    t_ok(r['f'] > f0 and abs(r['mu_ramp']).max() > 0,
+         'ramp limits : binding')
+
+    ## sensitivity of the cost to the ramp limit
+    d = 1e-3
+    r2 = runmpdcopf(ppc, Pd, ppopt, ramp=15 + d, Pg0=Pg0)
+    t_is((r2['f'] - r['f']) / d, -abs(r['mu_ramp']).sum(), 2,
+         'ramp limits : mu_ramp')
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_runmpdcopf(quiet=False)
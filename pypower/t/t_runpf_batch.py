@@ -0,0 +1,84 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for C{runpf_batch}.
+"""
+
+from numpy import array, ones, outer
+
+from pypower.ppoption import ppoption
+from pypower.runpf import runpf
+from pypower.runpf_batch import runpf_batch
+from pypower.newtonpf import NR_CONVERGED, NR_MAX_IT, NR_DIVERGED, \
+    NR_COLLAPSE, NR_STALLED
+from pypower.case30 import case30
+from pypower.ext2int import ext2int
+from pypower.makeSbus import makeSbus
+
+from pypower.idx_bus import PD, QD, VM
+from pypower.idx_brch import PF, QF, PT, QT
+from pypower.idx_gen import PG, QG
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_runpf_batch(quiet=False):
+    """Tests for C{runpf_batch}.
+    """
+    t_begin(18, quiet)
+
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0)
+    ppc = case30()
+    ppci = ext2int(ppc)
+    Sbus = makeSbus(ppci['baseMVA'], ppci['bus'], ppci['gen'])
+    scale = array([0.9, 1.0, 1.1])
+
+    r = runpf_batch(ppc, outer(scale, ones(len(Sbus))) * Sbus, ppopt)
+    t_ok(all(r['success']), 'success')
+    t_is(r['V'].shape, (3, 30), 12, 'V shape')
+    t_is(r['Sf'].shape, (3, 41), 12, 'Sf shape')
+
+    for s, t in enumerate(scale):
+        c = case30()
+        c['bus'][:, [PD, QD]] = c['bus'][:, [PD, QD]] * t
+        c['gen'][:, [PG, QG]] = c['gen'][:, [PG, QG]] * t
+        r1, _ = runpf(c, ppopt)
+        t_is(abs(r['V'][s]), r1['bus'][:, VM], 10,
+             'Vm : scenario %d' % s)
+        t_is(r['Sf'][s], r1['branch'][:, PF] + 1j * r1['branch'][:, QF], 8,
+             'Sf : scenario %d' % s)
+    t_is(r['St'][2], r1['branch'][:, PT] + 1j * r1['branch'][:, QT], 8,
+         'St')
+    t_is(r['reason'], [NR_CONVERGED] * 3, 12, 'reason')
+
+    ## Iwamoto multiplier and divergence detection, on a heavily loaded
+    ## and an infeasible scenario
+    Sbus2 = outer([3.0, 6.0], Sbus)
+    r0 = runpf_batch(ppc, Sbus2, ppopt)
+    t_is(r0['reason'], [NR_CONVERGED, NR_MAX_IT], 12, 'Newton : reason')
+    t_ok(r0['iterations'][1] == ppopt['PF_MAX_IT'], 'Newton : iterations')
+
+    r = runpf_batch(ppc, Sbus2, ppoption(ppopt, PF_NR_IWAMOTO=True))
+    t_is(r['V'][0], r0['V'][0], 10, 'Iwamoto : V')
+    t_ok(r['iterations'][0] <= r0['iterations'][0], 'Iwamoto : iterations')
+
+    r = runpf_batch(ppc, Sbus2, ppoption(ppopt, PF_NR_DIV_IT=2))
+    t_is(r['V'][0], r0['V'][0], 12, 'divergence : converged V')
+    t_ok(r['reason'][1] in (NR_DIVERGED, NR_COLLAPSE) and
+         r['iterations'][1] < ppopt['PF_MAX_IT'], 'divergence : stopped early')
+
+    r = runpf_batch(ppc, Sbus2, ppoption(ppopt, PF_NR_IWAMOTO=True,
+                                         PF_NR_DIV_IT=2))
+    t_ok(r['reason'][1] in (NR_DIVERGED, NR_COLLAPSE, NR_STALLED) and
+         r['iterations'][1] < ppopt['PF_MAX_IT'],
+         'Iwamoto, divergence : stopped early')
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_runpf_batch(quiet=False)
@@ -0,0 +1,86 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for C{runpf_contingency}.
+"""
+
+from numpy import maximum, sqrt, array_equal
+
+from pypower.ppoption import ppoption
+from pypower.runpf import runpf
+from pypower.runpf_contingency import runpf_contingency, _case
+from pypower.ext2int import ext2int
+from pypower.makeYbus import makeYbus
+from pypower.newtonpf import NR_CONVERGED
+from pypower.case30 import case30
+
+from pypower.idx_bus import VM, VMIN
+from pypower.idx_brch import BR_STATUS, RATE_A, PF, QF, PT, QT
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_runpf_contingency(quiet=False):
+    """Tests for C{runpf_contingency}.
+    """
+    t_begin(12, quiet)
+
+    ppopt = ppoption(VERBOSE=0, OUT_ALL=0)
+    ppc = case30()
+    nl = ppc['branch'].shape[0]
+
+    r = runpf_contingency(ppc, ppopt=ppopt, nprocs=1)
+    t_ok(r['base'], 'base case')
+    t_is(len(r['outages']), nl, 12, 'N-1 outages')
+    t_ok(array_equal(r['islanded'].nonzero()[0], [12, 15, 33]), 'islanded')
+    t_ok(all(r['success'] | r['islanded']), 'success')
+    t_ok(all(r['reason'][r['success']] == NR_CONVERGED) and
+         all(r['reason'][r['islanded']] == 0), 'reason')
+    c = ext2int(case30())
+    Y0 = makeYbus(c['baseMVA'], c['bus'], c['branch'])
+    t_ok(all(abs(Y - Yk).max() == 0 for Y, Yk in zip(Y0, _case['Y'])) and
+         all(_case['branch'][:, BR_STATUS] == 1),
+         'base case matrices restored exactly')
+
+    ## compare with runpf for one outage
+    k = 4
+    c = case30()
+    c['branch'][k, BR_STATUS] = 0
+    r1, _ = runpf(c, ppopt)
+    br = r1['branch']
+    S = maximum(sqrt(br[:, PF]**2 + br[:, QF]**2),
+                sqrt(br[:, PT]**2 + br[:, QT]**2))
+    over = ((br[:, RATE_A] > 0) & (S > br[:, RATE_A])).nonzero()[0]
+    v = r['violations'][r['violations']['outage'] == k]
+    vb = v[v['type'] == 'branch']
+    t_ok(array_equal(vb['index'], over), 'branch violations')
+    t_is(vb['value'], S[over], 6, 'branch flows')
+    low = (r1['bus'][:, VM] < r1['bus'][:, VMIN]).nonzero()[0]
+    t_ok(array_equal(v[v['type'] == 'vmin']['index'], low),
+         'voltage violations')
+
+    ## process pool and N-2 outages
+    r2 = runpf_contingency(ppc, ppopt=ppopt, nprocs=2)
+    t_ok(array_equal(r2['violations'][['outage', 'type', 'index']],
+                     r['violations'][['outage', 'type', 'index']]) and
+         abs(r2['violations']['value'] - r['violations']['value']).max()
+         < 1e-8, 'process pool')
+    r3 = runpf_contingency(ppc, [(0, 1), (2, 3)], ppopt, nprocs=2)
+    t_ok(r3['islanded'][0] and r3['success'][1], 'N-2')
+
+    ## base case which does not converge
+    r4 = runpf_contingency(ppc, [0, 4], ppoption(ppopt, PF_MAX_IT=1),
+                           nprocs=2)
+    t_ok(not r4['base'] and not any(r4['success']) and
+         all(r4['iterations'] == 0) and len(r4['violations']) == 0,
+         'base case not converged')
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_runpf_contingency(quiet=False)
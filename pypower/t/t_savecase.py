@@ -15,6 +15,8 @@ import numpy as np
 
 from numpy import array
 
+from scipy.sparse import csr_matrix
+
 from pypower.api import case24_ieee_rts
 
 from pypower.loadcase import loadcase
@@ -25,16 +27,19 @@ from pypower.savecase import savecase
 
 from pypower.t.t_begin import t_begin
 from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
 
 
 def t_savecase(quiet=False):
-    """Tests that C{savecase} saves case files in MAT and PY file formats."""
+    """Tests that C{savecase} saves case files in MAT, PY and NPZ file
+    formats."""
 
-    t_begin(12, quiet)
+    t_begin(24, quiet)
 
     MATCASE = 'test_savedcase.mat'
     PYCASE = 'test_savedcase.py'
-    file_formats = [MATCASE, PYCASE]
+    NPZCASE = 'test_savedcase.npz'
+    file_formats = [MATCASE, PYCASE, NPZCASE]
 
     pf_case = {'case': case24_ieee_rts(),
                'run_func': runpf,
@@ -86,11 +91,40 @@ def t_savecase(quiet=False):
                 saved_case_matches_ppc = verify_saved_case(loaded_case, ppc)
                 t_ok(saved_case_matches_ppc, msg_prefix + msg_desc)
 
+                del loaded_case
                 os.remove(path)
             finally:
                 os.umask(saved_umask)
+
+    ## NPZ files, with nested dicts and sparse matrices of results
+    t = 'Savecase: npz format - '
+    path = join(tmpdir, NPZCASE)
+    ppc = runopf(case24_ieee_rts(), ppoption(VERBOSE=0, OUT_ALL=0))
+    ppc['A'] = csr_matrix(np.eye(3, 24 * 2 + 33 * 2))
+    savecase(path, ppc)
+    loaded_case = loadcase(path[:-4])
+    t_ok(isinstance(loaded_case['bus'], np.memmap), t + 'memory-mapped')
+    t_ok(np.array_equal(loaded_case['bus'], ppc['bus']) and
+         np.array_equal(loaded_case['order']['gen']['e2i'],
+                        ppc['order']['gen']['e2i']) and
+         np.array_equal(loaded_case['mu']['var']['l'], ppc['mu']['var']['l']),
+         t + 'nested dicts')
+    t_ok(isinstance(loaded_case['A'], csr_matrix) and
+         np.array_equal(loaded_case['A'].toarray(), ppc['A'].toarray()),
+         t + 'sparse matrix')
+    t_ok(loaded_case['f'] == ppc['f'] and loaded_case['success'] is True and
+         loaded_case['version'] == '2', t + 'scalars')
+    t_ok('om' not in loaded_case, t + 'om not saved')
+    loaded_case['bus'][:, 0] = 0
+    t_ok(np.array_equal(loadcase(path)['bus'], ppc['bus']),
+         t + 'file not modified')
+    del loaded_case
+    os.remove(path)
+
     os.rmdir(tmpdir)
 
+    t_end()
+
 
 def save_format(file):
     """Return 'mat' or 'py' based on file name extension."""
@@ -5,9 +5,12 @@
 """Tests for code in C{totcost}.
 """
 
-from numpy import array
+from numpy import array, linspace, r_
 
 from pypower.totcost import totcost
+from pypower.polycost import polycost
+from pypower.poly2pwl import poly2pwl
+from pypower.idx_cost import MODEL, NCOST, COST, PW_LINEAR
 
 from pypower.t.t_begin import t_begin
 from pypower.t.t_is import t_is
@@ -19,7 +22,7 @@ def t_totcost(quiet=False):
 
     @author: Ray Zimmerman (PSERC Cornell)
     """
-    n_tests = 22
+    n_tests = 31
 
     t_begin(n_tests, quiet)
 
@@ -63,6 +66,35 @@ def t_totcost(quiet=False):
     t_is(totcost(gencost, array([0, 0, 0, -30])), [1, 2, 0, -2400], 8, t)
     t_is(totcost(gencost, array([0, 0, 0, -35])), [1, 2, 0, -2700], 8, t)
 
+    t = 'totcost - scenarios x gens'
+    Pg = array([
+        [0, 0, -10,   0],
+        [1, 1,   5, -15],
+        [2, 2,  25,  10],
+        [2, 0,  35, -35]
+    ])
+    f = totcost(gencost, Pg)
+    t_is(f.shape, Pg.shape, 12, [t, ' : shape'])
+    t_is(f, [totcost(gencost, Pg[k]) for k in range(4)], 12, t)
+    t_is(f[:, 2:], [[-200, 0], [100, -1400], [900, 1000], [1500, -2700]],
+         8, [t, ' : pwl'])
+
+    t = 'polycost - scenarios x gens'
+    pc = gencost[:2, :]
+    for der in range(3):
+        t_is(polycost(pc, Pg[:, :2], der),
+             [polycost(pc, Pg[k, :2], der) for k in range(4)], 12,
+             [t, ' : der = %d' % der])
+
+    t = 'poly2pwl'
+    pwl = poly2pwl(gencost[:2, :], array([0, 10]), array([30, 40]), 4)
+    t_is(pwl[:, [MODEL, NCOST]], [[PW_LINEAR, 4], [PW_LINEAR, 4]], 12,
+         [t, ' : MODEL, NCOST'])
+    x = array([linspace(0, 30, 4), r_[0, linspace(10, 40, 3)]])
+    t_is(pwl[:, COST:COST + 8:2], x, 12, [t, ' : breakpoints'])
+    t_is(pwl[:, COST + 1:COST + 8:2], totcost(gencost[:2, :], x.T).T, 12,
+         [t, ' : costs'])
+
     t_end()
 
 
@@ -0,0 +1,78 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Tests for C{updateYbus} and C{smwsolve}.
+"""
+
+from numpy import arange, ones, exp, pi
+
+from scipy.sparse.linalg import splu
+
+from pypower.case30 import case30
+from pypower.ext2int import ext2int
+from pypower.bustypes import bustypes
+from pypower.makeYbus import makeYbus
+from pypower.pfjac import pfjac
+from pypower.updateYbus import updateYbus
+from pypower.smwsolve import smwsolve
+
+from pypower.idx_bus import VM, VA
+from pypower.idx_brch import BR_STATUS
+
+from pypower.t.t_begin import t_begin
+from pypower.t.t_is import t_is
+from pypower.t.t_ok import t_ok
+from pypower.t.t_end import t_end
+
+
+def t_updateYbus(quiet=False):
+    """Tests for C{updateYbus} and C{smwsolve}.
+    """
+    t_begin(13, quiet)
+
+    ppc = ext2int(case30())
+    baseMVA, bus, gen, branch = \
+        ppc['baseMVA'], ppc['bus'], ppc['gen'], ppc['branch']
+    _, pv, pq = bustypes(bus, gen)
+    V = bus[:, VM] * exp(1j * pi / 180 * bus[:, VA])
+
+    Ybus0, Yf0, Yt0 = makeYbus(baseMVA, bus, branch)
+    jac = pfjac(Ybus0, pv, pq)
+    lu = splu(jac.update(V).tocsc())
+    Ylu = splu(Ybus0.tocsc())
+
+    for k in [4, [2, 7]]:
+        s = 'k = %s : ' % k
+        br = branch.copy()
+        Ybus, Yf, Yt, idx, dY = \
+            updateYbus(br, Ybus0.copy(), Yf0.copy(), Yt0.copy(), k)
+        t_ok((br[k, BR_STATUS] == 0).all(), s + 'status')
+
+        br2 = branch.copy()
+        br2[k, BR_STATUS] = 0
+        Ybus2, Yf2, Yt2 = makeYbus(baseMVA, bus, br2)
+        t_is(Ybus.todense(), Ybus2.todense(), 12, s + 'Ybus')
+        t_is(Yf.todense(), Yf2.todense(), 12, s + 'Yf')
+        t_is(Yt.todense(), Yt2.todense(), 12, s + 'Yt')
+
+        ## solve with the modified Jacobian using the base factorization
+        b = arange(lu.shape[0], dtype=float)
+        rows, M, cols = jac.dJ(idx, dY, V)
+        x = smwsolve(lu.solve, b, rows, M, cols)
+        t_is(pfjac(Ybus2, pv, pq).update(V) * x, b, 8, s + 'smwsolve J')
+
+        ## and with the modified Ybus
+        b = ones(len(V), complex)
+        x = smwsolve(Ylu.solve, b, idx, dY, idx)
+        t_is(Ybus2 * x, b, 8, s + 'smwsolve Ybus')
+
+    ## reinstate
+    Ybus, _, _, _, _ = updateYbus(br, Ybus, Yf, Yt, [2, 7], 1)
+    t_is(Ybus.todense(), Ybus0.todense(), 12, 'reinstate')
+
+    t_end()
+
+
+if __name__ == '__main__':
+    t_updateYbus(quiet=False)
@@ -22,12 +22,24 @@ def test_pypower(verbose=False):
     ## PYPOWER base test
     tests.append('t_loadcase')
     # tests.append('t_ext2int2ext')
+    tests.append('t_ext2int_copy')
     tests.append('t_jacobian')
+    tests.append('t_pplinsolve')
+    tests.append('t_newtonpf_I_cart')
+    tests.append('t_runpf_batch')
+    tests.append('t_runpf_contingency')
+    tests.append('t_updateYbus')
+    tests.append('t_fdpf_factors')
     tests.append('t_hessian')
     tests.append('t_totcost')
     tests.append('t_modcost')
     tests.append('t_hasPQcap')
+    tests.append('t_opf_model')
+    tests.append('t_pipskkt')
+    tests.append('t_opf_consfcn')
+    tests.append('t_opf_hessfcn')
     tests.append('t_savecase')
+    tests.append('t_results_writer')
 
     # tests.append('t_pips')
 
@@ -39,6 +51,8 @@ def test_pypower(verbose=False):
 
     # tests.append('t_opf_pips')
     # tests.append('t_opf_pips_sc')
+    tests.append('t_opf_warm_start')
+    tests.append('t_opf_problem')
 
     if have_fcn('pyipopt'):
         tests.append('t_opf_ipopt')
@@ -46,6 +60,7 @@ def test_pypower(verbose=False):
 
     # tests.append('t_opf_dc_pips')
     # tests.append('t_opf_dc_pips_sc')
+    tests.append('t_runmpdcopf')
 
     if have_fcn('mosek'):
         tests.append('t_opf_dc_mosek')
@@ -71,8 +86,15 @@ def test_pf(verbose=False):
 
     tests.append('t_loadcase')
     tests.append('t_ext2int2ext')
+    tests.append('t_ext2int_copy')
     tests.append('t_jacobian')
+    tests.append('t_pplinsolve')
+    tests.append('t_newtonpf_I_cart')
     tests.append('t_pf')
+    tests.append('t_runpf_batch')
+    tests.append('t_runpf_contingency')
+    tests.append('t_updateYbus')
+    tests.append('t_fdpf_factors')
 
     return t_run_tests(tests, verbose)
 
@@ -82,10 +104,15 @@ def test_opf(verbose=False, *others):
 
     tests.append('t_loadcase')
     tests.append('t_ext2int2ext')
+    tests.append('t_ext2int_copy')
     tests.append('t_hessian')
     tests.append('t_totcost')
     tests.append('t_modcost')
     tests.append('t_hasPQcap')
+    tests.append('t_opf_model')
+    tests.append('t_pipskkt')
+    tests.append('t_opf_consfcn')
+    tests.append('t_opf_hessfcn')
 
     tests.append('t_qps_pypower')
 
@@ -94,11 +121,14 @@ def test_opf(verbose=False, *others):
 
     tests.append('t_opf_dc_pips')
     tests.append('t_opf_dc_pips_sc')
+    tests.append('t_runmpdcopf')
 
     tests.append('t_pips')
 
     tests.append('t_opf_pips')
     tests.append('t_opf_pips_sc')
+    tests.append('t_opf_warm_start')
+    tests.append('t_opf_problem')
 
     if have_fcn('pyipopt'):
         tests.append('t_opf_ipopt')
@@ -111,6 +141,7 @@ def test_opf(verbose=False, *others):
 
     tests.append('t_makePTDF')
     tests.append('t_makeLODF')
+    tests.append('t_dcscreen')
     tests.append('t_total_load')
     tests.append('t_scale_load')
 
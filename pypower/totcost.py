@@ -5,7 +5,7 @@
 """Computes total cost for generators at given output level.
 """
 
-from numpy import zeros, arange
+from numpy import asarray, zeros, arange
 from numpy import flatnonzero as find
 
 from pypower.polycost import polycost
@@ -16,38 +16,48 @@ def totcost(gencost, Pg):
     """Computes total cost for generators at given output level.
 
     Computes total cost for generators given a matrix in gencost format and
-    a column vector or matrix of generation levels. The return value has the
-    same dimensions as PG. Each row of C{gencost} is used to evaluate the
-    cost at the points specified in the corresponding row of C{Pg}.
+    a vector or matrix of generation levels. The return value has the same
+    dimensions as C{Pg}. Each row of C{gencost} is used to evaluate the
+    cost at the points specified in the corresponding column of C{Pg},
+    i.e. C{Pg} is a vector with one element per generator or an
+    C{nscen x ng} matrix with one row per scenario.
+
+    The evaluation is vectorized over generators and scenarios. Piece-wise
+    linear costs are evaluated on the segment found by counting the
+    breakpoints at or below each point (extrapolating the first and last
+    segments beyond the ends), polynomial costs by L{polycost}.
 
     @author: Ray Zimmerman (PSERC Cornell)
     @author: Carlos E. Murillo-Sanchez (PSERC Cornell & Universidad
     Autonoma de Manizales)
     """
+    Pg = asarray(Pg, float)
     ng, m = gencost.shape
-    totalcost = zeros(ng)
+    totalcost = zeros(Pg.shape)
 
     if len(gencost) > 0:
         ipwl = find(gencost[:, MODEL] == PW_LINEAR)
         ipol = find(gencost[:, MODEL] == POLYNOMIAL)
         if len(ipwl) > 0:
-            p = gencost[:, COST:(m-1):2]
-            c = gencost[:, (COST+1):m:2]
-
-            for i in ipwl:
-                ncost = gencost[i, NCOST]
-                for k in arange(ncost - 1,dtype=int):
-                    p1, p2 = p[i, k], p[i, k+1]
-                    c1, c2 = c[i, k], c[i, k+1]
-                    m = (c2 - c1) / (p2 - p1)
-                    b = c1 - m * p1
-                    Pgen = Pg[i]
-                    if Pgen < p2:
-                        totalcost[i] = m * Pgen + b
-                        break
-                    totalcost[i] = m * Pgen + b
+            ncost = gencost[ipwl, NCOST].astype(int)
+            p = gencost[ipwl, COST:(m-1):2]
+            c = gencost[ipwl, (COST+1):m:2]
+            x = Pg[..., ipwl]
+
+            ## segment of each point, the number of interior breakpoints
+            ## at or below it (a row-wise searchsorted)
+            k = zeros(x.shape, int)
+            for j in range(1, ncost.max() - 1):
+                k += (x >= p[:, j]) & (j < ncost - 1)
+
+            i = arange(len(ipwl))
+            p1, p2 = p[i, k], p[i, k + 1]
+            c1, c2 = c[i, k], c[i, k + 1]
+            m = (c2 - c1) / (p2 - p1)
+            b = c1 - m * p1
+            totalcost[..., ipwl] = m * x + b
 
         if len(ipol) > 0:
-            totalcost[ipol] = polycost(gencost[ipol, :], Pg[ipol])
+            totalcost[..., ipol] = polycost(gencost[ipol, :], Pg[..., ipol])
 
     return totalcost
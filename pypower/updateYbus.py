@@ -0,0 +1,108 @@
+# Copyright (c) 1996-2015 PSERC. All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Updates the admittance matrices for a change in branch status.
+"""
+
+from numpy import atleast_1d, ones, zeros, conj, exp, pi, unique, \
+    searchsorted, r_
+from scipy.sparse import csr_matrix
+
+from pypower.idx_brch import F_BUS, T_BUS, BR_R, BR_X, BR_B, BR_STATUS, \
+    SHIFT, TAP
+
+
+def updateYbus(branch, Ybus, Yf, Yt, k, stat=0):
+    """Updates the admittance matrices for a change in branch status.
+
+    Sets the status of the branches C{k} to C{stat} (0 for an outage,
+    1 to reinstate) and applies the change to the C{Ybus}, C{Yf} and
+    C{Yt} built by L{makeYbus} as a low-rank update, instead of rebuilding
+    them. The C{BR_STATUS} column of C{branch} is updated in place, as
+    are the C{data} arrays of the matrices, as long as they already hold
+    entries for the affected elements. Otherwise the changed elements are
+    added to new matrices.
+
+    Also returns the change in C{Ybus} as the dense matrix C{dY} on the
+    buses C{idx}, such that::
+
+        Ybus_new = Ybus_old + E * dY * E.T,    E = I[:, idx]
+
+    which has rank at most 2 per branch and can be used with L{smwsolve}
+    or L{pfjac.dJ}.
+
+    Example::
+
+        Ybus, Yf, Yt = makeYbus(baseMVA, bus, branch)
+        Ybus, Yf, Yt, idx, dY = updateYbus(branch, Ybus, Yf, Yt, 5)  ## outage
+        ...
+        Ybus, Yf, Yt, _, _ = updateYbus(branch, Ybus, Yf, Yt, 5, 1) ## restore
+
+    @see: L{makeYbus}, L{smwsolve}
+    """
+    k = atleast_1d(k)
+    nk = len(k)
+    br = branch[k, :]
+
+    ## change in status of each branch
+    ds = stat - br[:, BR_STATUS]
+    branch[k, BR_STATUS] = stat
+
+    ## branch admittances when in service, as in makeYbus
+    Ys = 1 / (br[:, BR_R] + 1j * br[:, BR_X])
+    Bc = br[:, BR_B]
+    tap = ones(nk)
+    i = br[:, TAP].nonzero()
+    tap[i] = br[i, TAP]
+    tap = tap * exp(1j * pi / 180 * br[:, SHIFT])
+
+    Ytt = Ys + 1j * Bc / 2
+    Yff = Ytt / (tap * conj(tap))
+    Yft = - Ys / conj(tap)
+    Ytf = - Ys / tap
+
+    f = br[:, F_BUS].astype(int)
+    t = br[:, T_BUS].astype(int)
+
+    ## branch admittance matrices
+    i = r_[k, k]
+    j = r_[f, t]
+    Yf = _add(Yf, i, j, r_[ds * Yff, ds * Yft])
+    Yt = _add(Yt, i, j, r_[ds * Ytf, ds * Ytt])
+
+    ## bus admittance matrix
+    idx = unique(r_[f, t])
+    fi = searchsorted(idx, f)
+    ti = searchsorted(idx, t)
+    dY = zeros((len(idx), len(idx)), complex)
+    for a, b, y in [(fi, fi, Yff), (fi, ti, Yft),
+                    (ti, fi, Ytf), (ti, ti, Ytt)]:
+        for n in range(nk):
+            dY[a[n], b[n]] += ds[n] * y[n]
+
+    ii, jj = dY.nonzero()
+    Ybus = _add(Ybus, idx[ii], idx[jj], dY[ii, jj])
+
+    return Ybus, Yf, Yt, idx, dY
+
+
+def _add(A, i, j, v):
+    """Adds C{v} to the elements C{(i, j)} of the CSR matrix C{A}.
+
+    Updates C{A.data} in place if all of the elements are stored,
+    otherwise returns a new matrix.
+    """
+    A.sum_duplicates()
+    pos = zeros(len(i), int)
+    for n in range(len(i)):
+        cols = A.indices[A.indptr[i[n]]:A.indptr[i[n] + 1]]
+        p = searchsorted(cols, j[n])
+        if p == len(cols) or cols[p] != j[n]:
+            return A + csr_matrix((v, (i, j)), A.shape)
+        pos[n] = A.indptr[i[n]] + p
+
+    for n in range(len(i)):     ## (i, j) may repeat
+        A.data[pos[n]] += v[n]
+
+    return A